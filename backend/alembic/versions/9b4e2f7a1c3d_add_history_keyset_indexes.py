@@ -0,0 +1,32 @@
+"""Add composite indexes for keyset pagination of analysis history
+
+Revision ID: 9b4e2f7a1c3d
+Revises: 3168533453e2
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4e2f7a1c3d'
+down_revision: Union[str, Sequence[str], None] = '3168533453e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ORDER_COLUMNS = ['created_at', 'overall_score', 'grammar_score', 'repetition_score', 'semantic_score']
+
+
+def upgrade() -> None:
+    """Add (user_id, order column, id) indexes used by the history cursor."""
+    for column in ORDER_COLUMNS:
+        op.create_index(f'ix_analyses_user_{column}_id', 'analyses', ['user_id', column, 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Remove the history cursor indexes."""
+    for column in ORDER_COLUMNS:
+        op.drop_index(f'ix_analyses_user_{column}_id', table_name='analyses')
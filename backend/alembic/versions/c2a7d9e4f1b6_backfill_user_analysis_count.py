@@ -0,0 +1,31 @@
+"""Backfill users.analysis_count, now maintained by AnalysisRepository
+
+Revision ID: c2a7d9e4f1b6
+Revises: 9b4e2f7a1c3d
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2a7d9e4f1b6'
+down_revision: Union[str, Sequence[str], None] = '9b4e2f7a1c3d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Set every user's analysis_count to the number of analyses they own."""
+    op.execute(
+        "UPDATE users SET analysis_count = "
+        "(SELECT COUNT(*) FROM analyses WHERE analyses.user_id = users.id)"
+    )
+
+
+def downgrade() -> None:
+    """Nothing to undo: the column existed before and is left as is."""
+    pass
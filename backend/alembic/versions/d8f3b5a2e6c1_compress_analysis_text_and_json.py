@@ -0,0 +1,103 @@
+"""Store analysis full_text and JSON details compressed
+
+Revision ID: d8f3b5a2e6c1
+Revises: c2a7d9e4f1b6
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.compression import CompressedJSON, CompressedText
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8f3b5a2e6c1'
+down_revision: Union[str, Sequence[str], None] = 'c2a7d9e4f1b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rows rewritten per round trip
+BATCH_SIZE = 500
+
+TEXT_COLUMNS = ('full_text',)
+JSON_COLUMNS = ('grammar_errors', 'repetition_errors', 'semantic_coherence', 'suggestions')
+
+
+def _copy_columns(source_types: dict, target_types: dict, source_suffix: str, target_suffix: str) -> None:
+    """Copy every row's columns from one set of columns to another, BATCH_SIZE rows at a time"""
+    columns = list(source_types)
+    analyses = sa.table(
+        'analyses',
+        sa.column('id', sa.String),
+        *[sa.column(name + source_suffix, source_types[name]) for name in columns],
+        *[sa.column(name + target_suffix, target_types[name]) for name in columns],
+    )
+    connection = op.get_bind()
+
+    last_id = ''
+    while True:
+        rows = connection.execute(
+            sa.select(analyses.c.id, *[analyses.c[name + source_suffix] for name in columns])
+            .where(analyses.c.id > last_id)
+            .order_by(analyses.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+
+        connection.execute(
+            analyses.update()
+            .where(analyses.c.id == sa.bindparam('row_id'))
+            .values({name + target_suffix: sa.bindparam('new_' + name) for name in columns}),
+            [
+                {'row_id': row[0], **{'new_' + name: value for name, value in zip(columns, row[1:])}}
+                for row in rows
+            ]
+        )
+        last_id = rows[-1][0]
+
+
+def _storage_type(column_type: sa.types.TypeEngine) -> sa.types.TypeEngine:
+    """Database type of a column type (the binary column behind a compressed type)"""
+    if isinstance(column_type, sa.types.TypeDecorator):
+        return column_type.impl_instance
+    return column_type
+
+
+def _swap_columns(old_types: dict, new_types: dict) -> None:
+    """Add *_new columns, copy into them, drop the old columns and take over their names"""
+    with op.batch_alter_table('analyses') as batch_op:
+        for name, column_type in new_types.items():
+            batch_op.add_column(sa.Column(name + '_new', _storage_type(column_type), nullable=True))
+
+    _copy_columns(old_types, new_types, '', '_new')
+
+    with op.batch_alter_table('analyses') as batch_op:
+        for name in new_types:
+            batch_op.drop_column(name)
+        for name, column_type in new_types.items():
+            batch_op.alter_column(
+                name + '_new',
+                new_column_name=name,
+                existing_type=_storage_type(column_type),
+                nullable=name not in TEXT_COLUMNS
+            )
+
+
+def upgrade() -> None:
+    """Rewrite full_text and the JSON detail columns as compressed binary."""
+    _swap_columns(
+        {**{name: sa.Text() for name in TEXT_COLUMNS}, **{name: sa.JSON() for name in JSON_COLUMNS}},
+        {**{name: CompressedText() for name in TEXT_COLUMNS}, **{name: CompressedJSON() for name in JSON_COLUMNS}},
+    )
+
+
+def downgrade() -> None:
+    """Decompress back into Text and JSON columns."""
+    _swap_columns(
+        {**{name: CompressedText() for name in TEXT_COLUMNS}, **{name: CompressedJSON() for name in JSON_COLUMNS}},
+        {**{name: sa.Text() for name in TEXT_COLUMNS}, **{name: sa.JSON() for name in JSON_COLUMNS}},
+    )
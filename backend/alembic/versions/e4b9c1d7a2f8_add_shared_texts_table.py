@@ -0,0 +1,134 @@
+"""Move analyzed texts into a content-addressed texts table
+
+Revision ID: e4b9c1d7a2f8
+Revises: d8f3b5a2e6c1
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+import hashlib
+from collections import Counter
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.db.compression import CompressedText
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b9c1d7a2f8'
+down_revision: Union[str, Sequence[str], None] = 'd8f3b5a2e6c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Analyses moved per round trip
+BATCH_SIZE = 500
+
+analyses = sa.table(
+    'analyses',
+    sa.column('id', sa.String),
+    sa.column('full_text', CompressedText()),
+    sa.column('text_hash', sa.String),
+)
+texts = sa.table(
+    'texts',
+    sa.column('hash', sa.String),
+    sa.column('content', CompressedText()),
+    sa.column('ref_count', sa.Integer),
+    sa.column('created_at', sa.DateTime),
+)
+
+
+def _batches(query):
+    """Rows of query (ordered by analyses.id) BATCH_SIZE at a time"""
+    connection = op.get_bind()
+    last_id = ''
+    while True:
+        rows = connection.execute(
+            query.where(analyses.c.id > last_id).order_by(analyses.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def upgrade() -> None:
+    """Create texts, point every analysis at its text and drop analyses.full_text."""
+    op.create_table(
+        'texts',
+        sa.Column('hash', sa.String(length=64), nullable=False),
+        sa.Column('content', sa.LargeBinary(), nullable=False),
+        sa.Column('ref_count', sa.Integer(), nullable=False),
+        sa.Column('result_key', sa.String(length=64), nullable=True),
+        sa.Column('result', sa.LargeBinary(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('hash')
+    )
+    op.add_column('analyses', sa.Column('text_hash', sa.String(length=64), nullable=True))
+
+    connection = op.get_bind()
+    for rows in _batches(sa.select(analyses.c.id, analyses.c.full_text)):
+        hashes = {row_id: hashlib.sha256(text.encode('utf-8')).hexdigest() for row_id, text in rows}
+        contents = {hashes[row_id]: text for row_id, text in rows}
+        counts = Counter(hashes.values())
+
+        existing = set(connection.execute(
+            sa.select(texts.c.hash).where(texts.c.hash.in_(list(counts)))
+        ).scalars())
+        for text_hash in existing:
+            connection.execute(
+                texts.update()
+                .where(texts.c.hash == text_hash)
+                .values(ref_count=texts.c.ref_count + counts[text_hash])
+            )
+        new_hashes = [text_hash for text_hash in counts if text_hash not in existing]
+        if new_hashes:
+            connection.execute(texts.insert(), [
+                {
+                    'hash': text_hash,
+                    'content': contents[text_hash],
+                    'ref_count': counts[text_hash],
+                    'created_at': datetime.utcnow(),
+                }
+                for text_hash in new_hashes
+            ])
+
+        connection.execute(
+            analyses.update()
+            .where(analyses.c.id == sa.bindparam('row_id'))
+            .values(text_hash=sa.bindparam('new_hash')),
+            [{'row_id': row_id, 'new_hash': text_hash} for row_id, text_hash in hashes.items()]
+        )
+
+    with op.batch_alter_table('analyses') as batch_op:
+        batch_op.drop_column('full_text')
+        batch_op.alter_column('text_hash', existing_type=sa.String(length=64), nullable=False)
+        batch_op.create_index('ix_analyses_text_hash', ['text_hash'])
+        batch_op.create_foreign_key('fk_analyses_text_hash_texts', 'texts', ['text_hash'], ['hash'])
+
+
+def downgrade() -> None:
+    """Copy texts back into analyses.full_text and drop the texts table."""
+    op.add_column('analyses', sa.Column('full_text', sa.LargeBinary(), nullable=True))
+
+    connection = op.get_bind()
+    query = (
+        sa.select(analyses.c.id, texts.c.content)
+        .select_from(analyses.join(texts, texts.c.hash == analyses.c.text_hash))
+    )
+    for rows in _batches(query):
+        connection.execute(
+            analyses.update()
+            .where(analyses.c.id == sa.bindparam('row_id'))
+            .values(full_text=sa.bindparam('new_text')),
+            [{'row_id': row_id, 'new_text': text} for row_id, text in rows]
+        )
+
+    with op.batch_alter_table('analyses') as batch_op:
+        batch_op.drop_constraint('fk_analyses_text_hash_texts', type_='foreignkey')
+        batch_op.drop_index('ix_analyses_text_hash')
+        batch_op.drop_column('text_hash')
+        batch_op.alter_column('full_text', existing_type=sa.LargeBinary(), nullable=False)
+    op.drop_table('texts')
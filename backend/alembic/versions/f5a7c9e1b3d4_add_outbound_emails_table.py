@@ -0,0 +1,46 @@
+"""Add outbound_emails queue for background email delivery
+
+Revision ID: f5a7c9e1b3d4
+Revises: e4b9c1d7a2f8
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5a7c9e1b3d4'
+down_revision: Union[str, Sequence[str], None] = 'e4b9c1d7a2f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create the outbound_emails table."""
+    op.create_table(
+        'outbound_emails',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('to_email', sa.String(length=255), nullable=False),
+        sa.Column('subject', sa.String(length=255), nullable=False),
+        sa.Column('html_content', sa.LargeBinary(), nullable=False),
+        sa.Column('status', sa.String(length=10), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_outbound_emails_status_next_attempt_at', 'outbound_emails',
+        ['status', 'next_attempt_at'], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Drop the outbound_emails table."""
+    op.drop_index('ix_outbound_emails_status_next_attempt_at', table_name='outbound_emails')
+    op.drop_table('outbound_emails')
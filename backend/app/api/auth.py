@@ -12,7 +12,8 @@ from pydantic import BaseModel, EmailStr
 
 from app.db.session import get_db
 from app.db.models import User
-from app.services.auth_service import AuthService
+from app.services.auth_service import AuthService, email_dispatcher, principal_cache
+from app.services.password_hasher import PasswordHasherBusyError, get_password_hasher
 from app.core.config import settings
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
@@ -76,6 +77,11 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    # Tokens seen recently were already verified and resolved
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+    
     payload = AuthService.verify_token(token)
     if payload is None:
         raise credentials_exception
@@ -85,17 +91,22 @@ async def get_current_user(
         raise credentials_exception
     
     # Get user from database
-    result = await db.execute(select(User).filter(User.id == user_id))
-    user = result.scalar_one_or_none()
+    generation = principal_cache.generation(user_id)
+    result = await db.execute(
+        select(User.id, User.email, User.first_name, User.last_name).filter(User.id == user_id)
+    )
+    user = result.one_or_none()
     if user is None:
         raise credentials_exception
     
-    return {
+    principal = {
         "sub": str(user.id),
         "email": user.email,
         "first_name": user.first_name,
         "last_name": user.last_name
     }
+    principal_cache.put(token, principal, payload.get("exp"), generation)
+    return principal
 
 
 @router.post("/register", response_model=dict)
@@ -116,6 +127,8 @@ async def register(
             "message": "User registered successfully. Please check your email for verification.",
             "user_id": str(user.id)
         }
+    except PasswordHasherBusyError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -129,7 +142,10 @@ async def login(
     db: AsyncSession = Depends(get_db)
 ):
     """Login user and return access token"""
-    user = await AuthService.authenticate_user(db, form_data.username, form_data.password)
+    try:
+        user = await AuthService.authenticate_user(db, form_data.username, form_data.password)
+    except PasswordHasherBusyError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -211,7 +227,10 @@ async def reset_password(
     db: AsyncSession = Depends(get_db)
 ):
     """Reset password with token"""
-    success = await AuthService.reset_password(db, reset_data.token, reset_data.new_password)
+    try:
+        success = await AuthService.reset_password(db, reset_data.token, reset_data.new_password)
+    except PasswordHasherBusyError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
     if not success:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -221,6 +240,24 @@ async def reset_password(
     return {"message": "Password reset successfully"}
 
 
+@router.get("/hashing/stats")
+async def get_password_hashing_stats():
+    """Load and queue metrics of the password hashing pool"""
+    return get_password_hasher().stats()
+
+
+@router.get("/email/stats")
+async def get_email_delivery_stats():
+    """Delivery counters of the background email dispatcher"""
+    return email_dispatcher.stats()
+
+
+@router.get("/principal-cache/stats")
+async def get_principal_cache_stats():
+    """Hit rate of the token -> principal cache used by get_current_user"""
+    return principal_cache.stats()
+
+
 @router.get("/me")
 async def get_current_user_info(
     current_user: dict = Depends(get_current_user),
@@ -291,6 +328,7 @@ async def update_profile(
         
         await db.commit()
         await db.refresh(user)
+        principal_cache.invalidate_user(user.id)
         
         return {
             "message": "Profile updated successfully",
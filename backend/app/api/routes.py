@@ -2,39 +2,155 @@
 API routes for NoteGuard
 """
 
-from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, Query
-from typing import Optional
+import asyncio
+import base64
+import json
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, Query, Response, Header
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import UUID
 
 from app.models.requests import AnalyzeRequest
-from app.models.responses import AnalyzeResponse, AnalysisResponse, AnalysisListResponse
+from app.models.responses import AnalyzeResponse, AnalysisResponse
 from app.models.database import FileResponse
 from app.services.analysis_service import AnalysisService
+from app.services.encoder_service import EncoderOverloadedError
+from app.services.inference_pool import inference_pool_stats
+from app.services.incremental_service import IncrementalAnalysisService
+from app.services.job_service import AnalysisJob, JobManager, JobQueueFullError
 from app.services.llm_service import LLMService
-from app.db.session import get_db_session
-from app.db.repository import AnalysisRepository, FileRepository
+from app.db.session import async_session_factory, get_db_session
+from app.db.repository import AnalysisRepository, TextRepository
+from app.db.unit_of_work import UnitOfWork
 from app.api.auth import get_current_user
+from app.core.config import settings
+from app.utils.file_utils import IngestedUpload, UploadTooLargeError, ingest_upload
 from sqlalchemy.ext.asyncio import AsyncSession
 
 router = APIRouter()
 
 # Initialize analysis service
 analysis_service = AnalysisService()
+incremental_service = IncrementalAnalysisService(
+    analysis_service, max_states=settings.INCREMENTAL_STATE_MAX_ENTRIES
+)
 llm_service = LLMService()
+job_manager = JobManager(
+    analysis_service,
+    async_session_factory,
+    workers=settings.JOB_WORKERS,
+    max_queued=settings.JOB_MAX_QUEUED,
+    max_jobs=settings.JOB_MAX_RETAINED,
+    retention_seconds=settings.JOB_RETENTION_SECONDS
+)
+
+
+class BatchDocument(BaseModel):
+    text: str = Field(..., min_length=settings.MIN_TEXT_LENGTH, max_length=settings.MAX_TEXT_LENGTH)
+    reference_topic: Optional[str] = Field(None, max_length=200)
+
+
+class BatchAnalyzeRequest(BaseModel):
+    documents: List[BatchDocument] = Field(..., min_length=1, max_length=settings.BATCH_MAX_DOCUMENTS)
+    reference_topic: Optional[str] = Field(None, max_length=200)  # default for documents without one
+
+
+class AnalysisSummary(BaseModel):
+    id: str
+    source_type: str
+    text_excerpt: str
+    reference_topic: Optional[str] = None
+    overall_score: float
+    grammar_score: float
+    repetition_score: float
+    semantic_score: float
+    processing_time: float
+    created_at: Optional[str] = None
+
+
+class AnalysisListItem(BaseModel):
+    """History row; only the fields selected with fields= are present"""
+    id: str
+    user_id: Optional[str] = None
+    source_type: Optional[str] = None
+    text_excerpt: Optional[str] = None
+    reference_topic: Optional[str] = None
+    overall_score: Optional[float] = None
+    grammar_score: Optional[float] = None
+    repetition_score: Optional[float] = None
+    semantic_score: Optional[float] = None
+    processing_time: Optional[float] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+
+
+class AnalysisSummaryListResponse(BaseModel):
+    analyses: List[AnalysisListItem]
+    total: int
+    limit: int
+    offset: int
+    has_more: bool
+
+
+class AnalysisPage(BaseModel):
+    analyses: List[AnalysisSummary]
+    limit: int
+    next_cursor: Optional[str] = None
+    has_more: bool
+
+
+class IncrementalAnalyzeRequest(BaseModel):
+    previous_analysis_id: UUID
+    text: str = Field(..., min_length=settings.MIN_TEXT_LENGTH, max_length=settings.MAX_TEXT_LENGTH)
+    reference_topic: Optional[str] = Field(None, max_length=200)
+
+
+async def _analyze_or_reuse(
+    text: str,
+    reference_topic: Optional[str],
+    db_session: AsyncSession,
+    on_stage=None
+) -> tuple:
+    """
+    Analyze text, serving the response stored with an identical text when it is still current
+
+    Args:
+        text: Text to analyze
+        reference_topic: Optional reference topic
+        db_session: Session used to look up the texts table
+        on_stage: Optional stage callback (see AnalysisService.analyze_text)
+
+    Returns:
+        (response, result key to store the response under)
+    """
+    result_key = analysis_service.result_key(text, reference_topic)
+    text_repo = TextRepository(db_session)
+    result = await analysis_service.analyze_text(
+        text=text,
+        reference_topic=reference_topic,
+        on_stage=on_stage,
+        stored_result=lambda key: text_repo.get_result(text, key),
+        cache_key=result_key
+    )
+    return result, result_key
 
 
 @router.post("/analyze/demo", response_model=AnalyzeResponse)
 async def analyze_text_demo(
-    request: AnalyzeRequest
+    request: AnalyzeRequest,
+    db_session: AsyncSession = Depends(get_db_session)
 ):
     """
     Demo endpoint for text analysis without authentication
     """
     try:
-        result = await analysis_service.analyze_text(
-            text=request.text,
-            reference_topic=request.reference_topic,
-        )
+        result, _ = await _analyze_or_reuse(request.text, request.reference_topic, db_session)
         
         # Debug: Print result information
         print(f"API Debug: Grammar errors count: {len(result.result.grammar_errors)}")
@@ -43,6 +159,8 @@ async def analyze_text_demo(
             print(f"API Debug: Error: {error.message}")
         
         return result
+    except EncoderOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -50,6 +168,7 @@ async def analyze_text_demo(
 @router.post("/analyze", response_model=AnalyzeResponse)
 async def analyze_text(
     request: AnalyzeRequest,
+    response: Response,
     db_session: AsyncSession = Depends(get_db_session),
     current_user: dict = Depends(get_current_user)
 ):
@@ -57,10 +176,7 @@ async def analyze_text(
     Analyze text for grammar, repetition, and semantic coherence
     """
     try:
-        result = await analysis_service.analyze_text(
-            text=request.text,
-            reference_topic=request.reference_topic,
-        )
+        result, result_key = await _analyze_or_reuse(request.text, request.reference_topic, db_session)
         
         # Debug: Print result information
         print(f"API Debug: Grammar errors count: {len(result.result.grammar_errors)}")
@@ -70,42 +186,273 @@ async def analyze_text(
         
         # Save to database
         analysis_repo = AnalysisRepository(db_session)
-        analysis_data = {
-            "user_id": current_user.get("sub"),
-            "source_type": "text",
-            "text_excerpt": request.text[:200] + ("..." if len(request.text) > 200 else ""),
-            "full_text": request.text,
-            "reference_topic": request.reference_topic,
-            "overall_score": result.result.overall_score,
-            "grammar_score": result.result.grammar_score,
-            "repetition_score": result.result.repetition_score,
-            "semantic_score": result.result.semantic_score.score * 100,  # Convert to percentage
-            "grammar_errors": [error.dict() for error in result.result.grammar_errors] if result.result.grammar_errors else None,
-            "repetition_errors": [error.dict() for error in result.result.repetition_errors] if result.result.repetition_errors else None,
-            "semantic_coherence": result.result.semantic_coherence.dict() if result.result.semantic_coherence else None,
-            "suggestions": result.result.suggestions if result.result.suggestions else None,
-            "processing_time": result.processing_time,
+        analysis_record = await analysis_repo.create_from_result(
+            result, request.text, request.reference_topic, current_user.get("sub"), "text", result_key
+        )
+        response.headers["X-Analysis-ID"] = str(analysis_record.id)
+        
+        return result
+    except EncoderOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/analyze/stream")
+async def analyze_text_stream(
+    request: AnalyzeRequest,
+    db_session: AsyncSession = Depends(get_db_session),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Analyze text and stream newline-delimited JSON as each stage finishes
+
+    Lines are {"type": "stage", "stage": ..., "data": {...}} with the finished part of
+    AnalysisResult (grammar and repetition usually arrive first), then one final
+    {"type": "result", "analysis_id": ..., "data": AnalyzeResponse} line, or
+    {"type": "error", "status_code": ..., "detail": ...} if the analysis failed.
+    """
+    events: asyncio.Queue = asyncio.Queue()
+    
+    async def on_stage(stage: str, payload: dict) -> None:
+        await events.put({"type": "stage", "stage": stage, "data": payload})
+    
+    async def run_analysis() -> None:
+        try:
+            result, result_key = await _analyze_or_reuse(
+                request.text, request.reference_topic, db_session, on_stage
+            )
+            
+            # Save to database
+            analysis_repo = AnalysisRepository(db_session)
+            analysis_record = await analysis_repo.create_from_result(
+                result, request.text, request.reference_topic, current_user.get("sub"), "text", result_key
+            )
+            
+            await events.put({"type": "result", "analysis_id": str(analysis_record.id), "data": result})
+        except EncoderOverloadedError as e:
+            await events.put({"type": "error", "status_code": 503, "detail": str(e)})
+        except Exception as e:
+            await events.put({"type": "error", "status_code": 500, "detail": str(e)})
+    
+    async def ndjson_lines():
+        task = asyncio.ensure_future(run_analysis())
+        try:
+            while True:
+                event = await events.get()
+                yield json.dumps(jsonable_encoder(event), ensure_ascii=False) + "\n"
+                if event["type"] != "stage":
+                    break
+        finally:
+            # Client went away: stop the analysis instead of finishing it for nobody
+            if not task.done():
+                task.cancel()
+    
+    return StreamingResponse(
+        ndjson_lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def _batch_lines(
+    items: List[tuple],
+    user_id: str,
+    source_type: str,
+    db_session: AsyncSession,
+    files_data: Optional[List[dict]] = None,
+    text_hashes: Optional[List[str]] = None
+):
+    """
+    NDJSON lines for a batch analysis: one per finished document, then a summary
+
+    Successful results (and the uploaded files) are stored in one transaction once
+    every document is done. Analysis ids are only sent in the summary, after that
+    commit; if it fails or the client goes away, the uploaded files are removed.
+    """
+    uow = UnitOfWork(db_session)
+    analysis_ids: List[Optional[str]] = [None] * len(items)
+    committed = False
+    try:
+        async for index, result in analysis_service.analyze_batch(items):
+            text, reference_topic = items[index]
+            line = {"type": "document", "index": index, "data": result}
+            if files_data:
+                line["filename"] = files_data[index]["filename"]
+            
+            if result.success:
+                analysis_ids[index] = uow.add_analysis(AnalysisRepository.record_from_result(
+                    result, text, reference_topic, user_id, source_type,
+                    analysis_service.result_key(text, reference_topic),
+                    text_hash=text_hashes[index] if text_hashes else None
+                ))
+            if files_data:
+                uow.add_file(files_data[index], analysis_ids[index])
+            
+            yield json.dumps(jsonable_encoder(line), ensure_ascii=False) + "\n"
+        
+        # Save to database
+        await uow.commit()
+        committed = True
+        
+        summary = {
+            "type": "summary",
+            "documents": len(items),
+            "stored": sum(analysis_id is not None for analysis_id in analysis_ids),
+            "analysis_ids": analysis_ids,
         }
+        yield json.dumps(summary) + "\n"
+    except EncoderOverloadedError as e:
+        yield json.dumps({"type": "error", "status_code": 503, "detail": str(e)}, ensure_ascii=False) + "\n"
+    except Exception as e:
+        yield json.dumps({"type": "error", "status_code": 500, "detail": str(e)}, ensure_ascii=False) + "\n"
+    finally:
+        # Nothing references the saved files unless the transaction committed
+        if not committed and files_data:
+            for file_data in files_data:
+                Path(file_data["file_path"]).unlink(missing_ok=True)
+
+
+@router.post("/analyze/batch")
+async def analyze_batch(
+    request: BatchAnalyzeRequest,
+    db_session: AsyncSession = Depends(get_db_session),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Analyze many texts in one request, streaming one NDJSON line per document as it finishes
+
+    Lines are {"type": "document", "index": ..., "data": AnalyzeResponse} in completion
+    order, then {"type": "summary", ..., "analysis_ids": [...]} once all results are stored
+    (ids in input order, null for documents that failed).
+    """
+    items = [
+        (document.text, document.reference_topic or request.reference_topic)
+        for document in request.documents
+    ]
+    
+    return StreamingResponse(
+        _batch_lines(items, current_user.get("sub"), "text", db_session),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/analyze/batch/files")
+async def analyze_batch_files(
+    files: List[UploadFile] = File(...),
+    reference_topic: Optional[str] = None,
+    db_session: AsyncSession = Depends(get_db_session),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Analyze many uploaded .txt/.docx files in one request (same stream format as /analyze/batch)
+    """
+    if len(files) > settings.BATCH_MAX_DOCUMENTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.BATCH_MAX_DOCUMENTS} files can be analyzed at once"
+        )
+    
+    items = []
+    files_data = []
+    text_hashes = []
+    try:
+        for file in files:
+            upload, file_data = await _ingest_upload(file, current_user.get("sub"))
+            items.append((upload.text, reference_topic))
+            files_data.append(file_data)
+            text_hashes.append(upload.text_hash)
+    except BaseException:
+        for file_data in files_data:
+            Path(file_data["file_path"]).unlink(missing_ok=True)
+        raise
+    
+    return StreamingResponse(
+        _batch_lines(items, current_user.get("sub"), "file", db_session, files_data, text_hashes),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/analyze/incremental", response_model=AnalyzeResponse)
+async def analyze_text_incremental(
+    request: IncrementalAnalyzeRequest,
+    response: Response,
+    db_session: AsyncSession = Depends(get_db_session),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Re-analyze an edited version of a previous analysis, only re-processing changed sentences
+    """
+    try:
+        analysis_repo = AnalysisRepository(db_session)
+        previous = await analysis_repo.get_by_id(request.previous_analysis_id)
+        
+        if not previous:
+            raise HTTPException(status_code=404, detail="Analysis not found")
         
-        await analysis_repo.create(analysis_data)
+        # Check if the analysis belongs to the current user
+        if previous.user_id != current_user.get("sub"):
+            raise HTTPException(status_code=403, detail="Access denied")
+        
+        result, state = await incremental_service.analyze_incremental(
+            previous, request.text, request.reference_topic
+        )
+        
+        analysis_record = await analysis_repo.create_from_result(
+            result, request.text, request.reference_topic, current_user.get("sub"), previous.source_type
+        )
+        
+        if state is not None:
+            incremental_service.remember(analysis_record.id, state)
+        response.headers["X-Analysis-ID"] = str(analysis_record.id)
         
         return result
+    except HTTPException:
+        raise
+    except EncoderOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/analyses", response_model=AnalysisListResponse)
+def _parse_fields(fields: Optional[str]) -> List[str]:
+    """Validate a comma-separated fields= selector against the list columns"""
+    if not fields:
+        return list(AnalysisRepository.LIST_COLUMNS)
+    selected = list(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+    unknown = [field for field in selected if field not in AnalysisRepository.LIST_COLUMNS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. "
+                   f"Allowed: {', '.join(AnalysisRepository.LIST_COLUMNS)} "
+                   "(details are available from /analyses/{analysis_id})"
+        )
+    return selected
+
+
+@router.get(
+    "/analyses",
+    response_model=AnalysisSummaryListResponse,
+    response_model_exclude_unset=True
+)
 async def get_analysis_history(
     limit: int = Query(50, ge=1, le=100),
     offset: int = Query(0, ge=0),
     order_by: str = Query("created_at", regex="^(created_at|overall_score|grammar_score|repetition_score|semantic_score)$"),
     order_desc: bool = Query(True),
+    fields: Optional[str] = Query(None, description="Comma-separated list fields to return (id is always included)"),
     db_session: AsyncSession = Depends(get_db_session),
     current_user: dict = Depends(get_current_user)
 ):
     """
-    Get analysis history for the current user
+    Get analysis history summaries for the current user
+    
+    Full text, errors and suggestions are not listed; fetch them from /analyses/{analysis_id}.
     """
+    selected = _parse_fields(fields)
     try:
         analysis_repo = AnalysisRepository(db_session)
         analyses = await analysis_repo.get_by_user_id(
@@ -113,36 +460,24 @@ async def get_analysis_history(
             limit=limit,
             offset=offset,
             order_by=order_by,
-            order_desc=order_desc
+            order_desc=order_desc,
+            fields=selected
         )
         
-        total = await analysis_repo.count_by_user_id(current_user.get("sub"))
+        total = await analysis_repo.get_user_total(current_user.get("sub"))
         
-        # Convert database models to response models
+        # Only the selected keys are set, so unselected ones are left out of the JSON
         analysis_responses = []
         for analysis in analyses:
-            analysis_dict = {
-                "id": str(analysis.id),
-                "user_id": analysis.user_id,
-                "source_type": analysis.source_type,
-                "text_excerpt": analysis.text_excerpt,
-                "full_text": analysis.full_text,
-                "reference_topic": analysis.reference_topic,
-                "overall_score": analysis.overall_score,
-                "grammar_score": analysis.grammar_score,
-                "repetition_score": analysis.repetition_score,
-                "semantic_score": analysis.semantic_score,
-                "grammar_errors": analysis.grammar_errors,
-                "repetition_errors": analysis.repetition_errors,
-                "semantic_coherence": analysis.semantic_coherence,
-                "suggestions": analysis.suggestions,
-                "processing_time": analysis.processing_time,
-                "created_at": analysis.created_at.isoformat() if analysis.created_at else None,
-                "updated_at": analysis.updated_at.isoformat() if analysis.updated_at else None,
-            }
-            analysis_responses.append(AnalysisResponse(**analysis_dict))
-        
-        return AnalysisListResponse(
+            item: Dict[str, Any] = {"id": str(analysis.id)}
+            for field in selected:
+                value = getattr(analysis, field)
+                if isinstance(value, datetime):
+                    value = value.isoformat()
+                item[field] = value
+            analysis_responses.append(AnalysisListItem(**item))
+        
+        return AnalysisSummaryListResponse(
             analyses=analysis_responses,
             total=total,
             limit=limit,
@@ -153,6 +488,73 @@ async def get_analysis_history(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _encode_cursor(order_by: str, order_desc: bool, row) -> str:
+    value = getattr(row, order_by)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([order_by, order_desc, value, row.id])
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str, order_by: str, order_desc: bool) -> tuple:
+    try:
+        cursor_order_by, cursor_order_desc, value, last_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if order_by == "created_at":
+            value = datetime.fromisoformat(value)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    
+    if cursor_order_by != order_by:
+        raise HTTPException(status_code=400, detail="Cursor was issued for a different order_by")
+    if cursor_order_desc != order_desc:
+        raise HTTPException(status_code=400, detail="Cursor was issued for a different order_desc")
+    
+    return value, last_id
+
+
+@router.get("/analyses/history", response_model=AnalysisPage)
+async def get_analysis_history_page(
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    order_by: str = Query("created_at", regex="^(created_at|overall_score|grammar_score|repetition_score|semantic_score)$"),
+    order_desc: bool = Query(True),
+    db_session: AsyncSession = Depends(get_db_session),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Cursor-paginated analysis history (summaries only); pass next_cursor to get the following page
+    """
+    after = _decode_cursor(cursor, order_by, order_desc) if cursor else None
+    
+    try:
+        analysis_repo = AnalysisRepository(db_session)
+        # One extra row tells whether another page exists
+        rows = await analysis_repo.get_page_by_user_id(
+            user_id=current_user.get("sub"),
+            limit=limit + 1,
+            order_by=order_by,
+            order_desc=order_desc,
+            after=after
+        )
+        
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        return AnalysisPage(
+            analyses=[
+                AnalysisSummary(
+                    **{**row._asdict(), "created_at": row.created_at.isoformat() if row.created_at else None}
+                )
+                for row in rows
+            ],
+            limit=limit,
+            next_cursor=_encode_cursor(order_by, order_desc, rows[-1]) if has_more else None,
+            has_more=has_more
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/analyses/{analysis_id}", response_model=AnalysisResponse)
 async def get_analysis_by_id(
     analysis_id: UUID,
@@ -353,6 +755,37 @@ async def analyze_writing_style(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _ingest_upload(file: UploadFile, user_id: str) -> Tuple[IngestedUpload, dict]:
+    """
+    Validate an uploaded .txt/.docx file, stream it to disk and extract its text
+
+    Returns:
+        Tuple of (saved upload with its text, file record data without analysis_id)
+    """
+    # Validate file type
+    if not file.filename.endswith(('.txt', '.docx')):
+        raise HTTPException(
+            status_code=400,
+            detail="Only .txt and .docx files are supported"
+        )
+    
+    try:
+        upload = await ingest_upload(file, settings.UPLOAD_DIR, settings.MAX_UPLOAD_SIZE)
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # File metadata
+    return upload, {
+        "user_id": user_id,
+        "filename": file.filename,
+        "file_size": upload.size,
+        "mime_type": file.content_type or "application/octet-stream",
+        "file_path": str(upload.path),
+    }
+
+
 @router.post("/analyze/file", response_model=AnalyzeResponse)
 async def analyze_file(
     file: UploadFile = File(...),
@@ -363,84 +796,147 @@ async def analyze_file(
     """
     Analyze uploaded file for grammar, repetition, and semantic coherence
     """
+    upload, file_data = await _ingest_upload(file, current_user.get("sub"))
+    stored = False
     try:
-        # Validate file type
-        if not file.filename.endswith(('.txt', '.docx')):
-            raise HTTPException(
-                status_code=400,
-                detail="Only .txt and .docx files are supported"
-            )
-        
-        # Read file content
-        content = await file.read()
+        result, result_key = await _analyze_or_reuse(upload.text, reference_topic, db_session)
         
-        if file.filename.endswith('.txt'):
-            text = content.decode('utf-8')
-        else:  # .docx
-            from app.utils.file_utils import extract_text_from_docx
-            text = extract_text_from_docx(content)
-        
-        result = await analysis_service.analyze_text(
-            text=text,
-            reference_topic=reference_topic,
-        )
-        
-        # Save file to disk
-        import os
-        from pathlib import Path
-        
-        # Create uploads directory if it doesn't exist
-        uploads_dir = Path("uploads")
-        uploads_dir.mkdir(exist_ok=True)
-        
-        # Generate unique filename
-        import uuid
-        file_extension = Path(file.filename).suffix
-        unique_filename = f"{uuid.uuid4()}{file_extension}"
-        file_path = uploads_dir / unique_filename
-        
-        # Save file
-        with open(file_path, "wb") as f:
-            f.write(content)
-        
-        # Save file metadata
-        file_repo = FileRepository(db_session)
-        file_data = {
-            "user_id": current_user.get("sub"),
-            "filename": file.filename,
-            "file_size": len(content),
-            "mime_type": file.content_type or "application/octet-stream",
-            "file_path": str(file_path),
-        }
-        file_record = await file_repo.create(file_data)
-        
-        # Save analysis to database
-        analysis_repo = AnalysisRepository(db_session)
-        analysis_data = {
-            "user_id": current_user.get("sub"),
-            "source_type": "file",
-            "text_excerpt": text[:200] + ("..." if len(text) > 200 else ""),
-            "full_text": text,
-            "reference_topic": reference_topic,
-            "overall_score": result.result.overall_score,
-            "grammar_score": result.result.grammar_score,
-            "repetition_score": result.result.repetition_score,
-            "semantic_score": result.result.semantic_score.score * 100,  # Convert to percentage
-            "grammar_errors": [error.dict() for error in result.result.grammar_errors] if result.result.grammar_errors else None,
-            "repetition_errors": [error.dict() for error in result.result.repetition_errors] if result.result.repetition_errors else None,
-            "semantic_coherence": result.result.semantic_coherence.dict() if result.result.semantic_coherence else None,
-            "suggestions": result.result.suggestions if result.result.suggestions else None,
-            "processing_time": result.processing_time,
-        }
-        
-        analysis_record = await analysis_repo.create(analysis_data)
-        
-        # Link file to analysis
-        await file_repo.update_analysis_id(file_record.id, analysis_record.id)
+        # Save the analysis and the linked file record in one transaction
+        async with UnitOfWork(db_session) as uow:
+            analysis_id = uow.add_analysis(AnalysisRepository.record_from_result(
+                result, upload.text, reference_topic, current_user.get("sub"), "file", result_key,
+                text_hash=upload.text_hash
+            ))
+            uow.add_file(file_data, analysis_id)
+        stored = True
         
         return result
+    except HTTPException:
+        raise
+    except EncoderOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        # Nothing references the saved file unless the transaction committed
+        if not stored:
+            upload.path.unlink(missing_ok=True)
+
+
+def _job_accepted(job: AnalysisJob) -> dict:
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": f"{settings.API_V1_STR}/jobs/{job.id}",
+        "events_url": f"{settings.API_V1_STR}/jobs/{job.id}/events",
+    }
+
+
+def _get_owned_job(job_id: str, current_user: dict) -> AnalysisJob:
+    job = job_manager.get(job_id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    # Check if the job belongs to the current user
+    if job.user_id != current_user.get("sub"):
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    return job
+
+
+@router.post("/jobs/analyze", status_code=202)
+async def submit_analysis_job(
+    request: AnalyzeRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Queue a text analysis and return immediately; poll the status URL or follow the events URL
+    """
+    try:
+        job = job_manager.submit(current_user.get("sub"), request.text, request.reference_topic, "text")
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    
+    return _job_accepted(job)
+
+
+@router.post("/jobs/analyze/file", status_code=202)
+async def submit_file_analysis_job(
+    file: UploadFile = File(...),
+    reference_topic: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Save an uploaded file and queue its analysis (the file record is stored with the result)
+    """
+    upload, file_data = await _ingest_upload(file, current_user.get("sub"))
+    
+    try:
+        job = job_manager.submit(current_user.get("sub"), upload.text, reference_topic, "file", file_data=file_data)
+    except JobQueueFullError as e:
+        Path(file_data["file_path"]).unlink(missing_ok=True)
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    
+    return _job_accepted(job)
+
+
+@router.get("/jobs/{job_id}")
+async def get_analysis_job(
+    job_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Status, progress and (once completed) result of an analysis job
+    """
+    return _get_owned_job(job_id, current_user).to_dict()
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_analysis_job_events(
+    job_id: str,
+    last_event_id: Optional[int] = Header(None),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Server-sent events for an analysis job: queued, started, one per finished stage, then completed or failed
+    """
+    job = _get_owned_job(job_id, current_user)
+    
+    async def event_stream():
+        async for event in job.stream_events(after=last_event_id or 0):
+            data = json.dumps(jsonable_encoder(event["data"]))
+            yield f"id: {event['id']}\nevent: {event['event']}\ndata: {data}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/analyze/cache/stats")
+async def get_analysis_cache_stats():
+    """
+    Hit/miss counters for the analysis result cache
+    """
+    if analysis_service.result_cache is None:
+        return {"enabled": False}
+    
+    return {"enabled": True, **await asyncio.to_thread(analysis_service.result_cache.stats)}
+
+
+@router.get("/analyze/batching/stats")
+async def get_batching_stats():
+    """
+    Queue depth and batch-size histograms of the inference micro-batchers, plus inference pool load
+    """
+    encoder = analysis_service.semantic_service.encoder
+    return {
+        "sentiment": analysis_service.llm_service.sentiment_batcher.stats(),
+        "encoder": encoder.stats() if encoder is not None else None,
+        "pools": inference_pool_stats(),
+    }
 
 
 @router.get("/health")
@@ -29,14 +29,87 @@ class Settings(BaseSettings):
     DB_ECHO: bool = True  # Enable for debugging
     DB_POOL_SIZE: int = 10
     
+    # Storage Compression Configuration (stored texts and analysis JSON columns)
+    STORAGE_COMPRESSION_LEVEL: int = 6  # zlib level 1-9
+    STORAGE_COMPRESSION_MIN_BYTES: int = 64  # shorter values are stored uncompressed
+    
     # Text Analysis Configuration
     MAX_TEXT_LENGTH: int = 50000  # 50KB
     MIN_TEXT_LENGTH: int = 10
     
+    # File Upload Configuration
+    UPLOAD_DIR: str = "uploads"
+    MAX_UPLOAD_SIZE: int = 5 * 1024 * 1024  # bytes; larger uploads are refused while reading
+    
+    # Analysis Result Cache Configuration
+    ANALYSIS_CACHE_ENABLED: bool = True
+    ANALYSIS_CACHE_MAX_ENTRIES: int = 256
+    ANALYSIS_CACHE_DB_PATH: str = ""  # e.g. "./analysis_cache.db"; empty disables the disk tier
+    ANALYSIS_CACHE_MAX_DISK_ENTRIES: int = 10000
+    ANALYSIS_CACHE_TOUCH_INTERVAL_SECONDS: float = 60.0  # disk hits write their access times at most this often
+    
+    # Sentence Embedding Store Configuration
+    EMBEDDING_STORE_DIR: str = ""  # e.g. "./embedding_store"; empty disables the store
+    EMBEDDING_STORE_DTYPE: str = "float32"  # "float32" or "float16"
+    
+    # Sentiment Micro-Batching Configuration
+    SENTIMENT_BATCH_MAX_SIZE: int = 16
+    SENTIMENT_BATCH_MAX_WAIT_MS: float = 10.0  # how long a batch waits to fill up
+    SENTIMENT_QUEUE_MAX_SIZE: int = 256  # pending texts before callers wait for room
+    
+    # Sentence Encoder Batching Configuration
+    ENCODER_BATCH_MAX_SENTENCES: int = 64
+    ENCODER_BATCH_MAX_TOKENS: int = 8192  # padded tokens (longest sentence x batch size)
+    ENCODER_BATCH_MAX_WAIT_MS: float = 5.0
+    ENCODER_MAX_PENDING_SENTENCES: int = 4096  # beyond this, requests wait and then get 503
+    ENCODER_ADMISSION_TIMEOUT_MS: float = 1000.0
+    
+    # Inference Pool Configuration (one pool per model family)
+    INFERENCE_POOL_MODE: str = "thread"  # "thread" or "process" (models loaded once per worker process)
+    # torch threads are a process-wide setting: in thread mode every pool shares this one value,
+    # set once at startup (0 keeps the torch default)
+    INFERENCE_TORCH_THREADS: int = 0
+    # Per-family *_TORCH_THREADS only apply to pools running in process mode (one value per worker process)
+    INFERENCE_ENCODER_WORKERS: int = 1
+    INFERENCE_ENCODER_TORCH_THREADS: int = 2  # 0 keeps the torch default
+    INFERENCE_SENTIMENT_WORKERS: int = 1
+    INFERENCE_SENTIMENT_TORCH_THREADS: int = 1
+    INFERENCE_ZERO_SHOT_WORKERS: int = 1
+    INFERENCE_ZERO_SHOT_TORCH_THREADS: int = 1
+    INFERENCE_GENERATION_WORKERS: int = 1
+    INFERENCE_GENERATION_TORCH_THREADS: int = 2
+    INFERENCE_RULES_MODE: str = "process"  # grammar rule checks of /analyze/batch, spread across cores
+    INFERENCE_RULES_WORKERS: int = 4
+    INFERENCE_RULES_TORCH_THREADS: int = 0
+    
+    # Repetition Analysis Configuration
+    REPETITION_MAX_PHRASE_WORDS: int = 5  # longest repeated phrase reported, 0 for no limit
+    REPETITION_MAXIMAL_PHRASES_ONLY: bool = False  # skip phrases contained in a longer repeat with the same occurrences
+
+    # Incremental Analysis Configuration
+    INCREMENTAL_STATE_MAX_ENTRIES: int = 128  # per-sentence states kept for /analyze/incremental
+    
+    # Batch Analysis Configuration
+    BATCH_MAX_DOCUMENTS: int = 200
+
+    # Analysis Job Configuration (in-process queue for /jobs endpoints)
+    JOB_WORKERS: int = 2
+    JOB_MAX_QUEUED: int = 100  # beyond this, submissions get 503
+    JOB_MAX_RETAINED: int = 1000  # finished jobs kept for status queries
+    JOB_RETENTION_SECONDS: int = 3600
+
     # Authentication Configuration
     SECRET_KEY: str = "your-secret-key-here-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60.0  # how long get_current_user trusts a token without reading the user, 0 disables
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+
+    # Password Hashing Configuration (dedicated pool, keeps hashing off the event loop)
+    PASSWORD_HASH_ROUNDS: int = 535000  # sha256_crypt work factor; weaker hashes are upgraded on login
+    PASSWORD_HASH_POOL_MODE: str = "process"  # "thread" or "process" (the crypt backend holds the GIL)
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUED: int = 64  # beyond this, auth requests get 503
     
     # Email Configuration
     SMTP_SERVER: str = "smtp.gmail.com"
@@ -45,6 +118,22 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: str = "your-app-password"
     FROM_EMAIL: str = "noreply@noteguard.com"
     APP_URL: str = "http://localhost:5173"
+    SMTP_USE_TLS: bool = True
+    SMTP_TIMEOUT_SECONDS: float = 30.0
+    SMTP_IDLE_SECONDS: float = 60.0  # the shared SMTP session is closed after this long unused
+
+    # Email Template Configuration (Jinja templates, compiled once and cached)
+    EMAIL_TEMPLATE_DIR: str = ""  # empty uses app/templates/email
+    EMAIL_TEMPLATE_AUTO_RELOAD: bool = True  # recompile a template when its file changes
+    EMAIL_TEMPLATE_BYTECODE_CACHE: bool = True  # keep compiled templates on disk for new processes
+    EMAIL_TEMPLATE_BYTECODE_CACHE_DIR: str = ""  # empty uses Jinja's default temp folder
+
+    # Email Delivery Configuration (outbound_emails queue, sent by a background task)
+    EMAIL_BATCH_SIZE: int = 20
+    EMAIL_POLL_INTERVAL_SECONDS: float = 10.0  # picks up retries and emails queued by other processes
+    EMAIL_MAX_ATTEMPTS: int = 5
+    EMAIL_RETRY_BASE_SECONDS: float = 30.0  # doubled after each failed attempt
+    EMAIL_RETRY_MAX_SECONDS: float = 3600.0
     
     # User Limits
     FREE_ANALYSIS_LIMIT: int = 10
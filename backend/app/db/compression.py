@@ -0,0 +1,133 @@
+"""
+Compressed column types for large analysis text and JSON
+
+Values are stored as one format byte followed by the payload:
+    0x00  raw UTF-8 (short values, where compression would not pay off)
+    0x01  raw deflate stream primed with DICTIONARY_V1
+
+The format byte keeps old rows readable when the dictionary is retrained:
+add a new format byte and dictionary, never change an existing one.
+"""
+
+import json
+import zlib
+from typing import Any, Optional
+
+from sqlalchemy.types import LargeBinary, TypeDecorator
+
+from app.core.config import settings
+
+FORMAT_RAW = 0
+FORMAT_DEFLATE_V1 = 1
+
+# Preset dictionary shared by all rows: common Turkish prose plus the keys and
+# messages that recur in stored error JSON. Deflate matches against the last
+# 32 KB, and nearer matches are cheaper, so the most frequent strings go last.
+DICTIONARY_V1 = (
+    # Grammar rule messages and suggestions
+    'Birden fazla boşluk kullanılmamalı. Noktalama işaretlerinden önce boşluk olmamalı. '
+    'Noktalama işaretinden sonra boşluk olmalı. "de" bağlacı ayrı yazılmalı. '
+    '"da" bağlacı ayrı yazılmalı. "ki" bağlacı ayrı yazılmalı. Yazım hatası: '
+    'Türkçe karakter hatası: " → "'
+    'Cümle başlarında büyük harf kullanın. Özel isimlerde büyük harf kullanın. '
+    'Yazım hatalarını düzeltin. TDK yazım kılavuzunu kontrol edin. '
+    'Metninizde önemli tekrarlar bulunmuyor. kelime tekrarı azaltılmalı. '
+    'ifade tekrarı azaltılmalı. Metninizde çok sayıda tekrar var. Çeşitliliği artırın. '
+    'ifadesini farklı şekillerde ifade edin. kelimesini farklı kelimelerle değiştirin. '
+    # Stored JSON keys (stored compact, without spaces)
+    '{"has_issues":false,"issue_count":0,"total_sentences":,"off_topic_sentences":[],'
+    '"flow_disruptions":[],"sentence_index":,"similarity":,"explanation":"",'
+    '"score":,"reference_topic":null,'
+    '{"word":"","count":,"positions":[],"suggestion":"'
+    '{"message":"","offset":,"length":,"rule_id":"","suggestion":null},'
+    # Frequent Turkish words and suffixed forms
+    'Bu nedenle, ancak, ayrıca, özellikle, sonuç olarak, örneğin, bununla birlikte, '
+    'günümüzde, toplumun, insanların, önemli bir, büyük bir, olarak, olduğu, olduğunu, '
+    'olmasına, olan, olarak da, gibi, kadar, daha, çok, her, şey, kendi, yeni, '
+    'ilgili, tarafından, arasında, üzerinde, içinde, sonra, önce, nasıl, neden, '
+    'değildir, gerekir, gerekmektedir, etmektedir, olmaktadır, bulunmaktadır, '
+    'yapılan, yapılması, edilmesi, edilen, sağlamak, sağlar, ile, için, veya, ve '
+    'bir, bu, da, de, ki, mi, ne, o, şu, en, hem, ya, ise, ama, fakat, çünkü, '
+    'lar, ler, ları, leri, ların, lerin, dır, dir, tır, tir, dur, dür, mak, mek, '
+    'ması, mesi, sı, si, nın, nin, ın, in, dan, den, tan, ten, da, de, ta, te. '
+).encode('utf-8')
+
+_DICTIONARIES = {
+    FORMAT_DEFLATE_V1: DICTIONARY_V1,
+}
+
+
+def compress_text(text: str) -> bytes:
+    """
+    Encode text in the stored format
+
+    Args:
+        text: Text to store
+
+    Returns:
+        Format byte followed by the (possibly compressed) UTF-8 payload
+    """
+    data = text.encode('utf-8')
+    if len(data) >= settings.STORAGE_COMPRESSION_MIN_BYTES:
+        compressor = zlib.compressobj(
+            settings.STORAGE_COMPRESSION_LEVEL, zlib.DEFLATED, -15, zdict=DICTIONARY_V1
+        )
+        compressed = compressor.compress(data) + compressor.flush()
+        if len(compressed) < len(data):
+            return bytes((FORMAT_DEFLATE_V1,)) + compressed
+    return bytes((FORMAT_RAW,)) + data
+
+
+def decompress_text(value: bytes) -> str:
+    """
+    Decode a stored value back to text
+
+    Args:
+        value: Bytes written by compress_text
+
+    Returns:
+        Original text
+    """
+    value = bytes(value)  # memoryview from some drivers
+    format_id, payload = value[0], value[1:]
+    if format_id == FORMAT_RAW:
+        return payload.decode('utf-8')
+    dictionary = _DICTIONARIES.get(format_id)
+    if dictionary is None:
+        raise ValueError(f"Unknown compressed storage format: {format_id}")
+    decompressor = zlib.decompressobj(-15, zdict=dictionary)
+    return (decompressor.decompress(payload) + decompressor.flush()).decode('utf-8')
+
+
+class CompressedText(TypeDecorator):
+    """Text column stored compressed in a binary column"""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: Optional[str], dialect) -> Optional[bytes]:
+        if value is None:
+            return None
+        return compress_text(value)
+
+    def process_result_value(self, value: Optional[bytes], dialect) -> Optional[str]:
+        if value is None:
+            return None
+        return decompress_text(value)
+
+
+class CompressedJSON(TypeDecorator):
+    """JSON column stored as compressed compact JSON text in a binary column"""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value: Any, dialect) -> Optional[bytes]:
+        if value is None:
+            return None
+        return compress_text(json.dumps(value, ensure_ascii=False, separators=(',', ':')))
+
+    def process_result_value(self, value: Optional[bytes], dialect) -> Any:
+        if value is None:
+            return None
+        return json.loads(decompress_text(value))
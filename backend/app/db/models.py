@@ -6,10 +6,12 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Column, String, Float, DateTime, Text, JSON, Enum, Boolean, ForeignKey, Integer
+from sqlalchemy import Column, String, Float, DateTime, Text, JSON, Enum, Boolean, ForeignKey, Integer, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
+from app.db.compression import CompressedJSON, CompressedText
+
 Base = declarative_base()
 
 
@@ -59,7 +61,7 @@ class Analysis(Base):
     user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
     source_type = Column(String(10), nullable=False)  # 'text' or 'file'
     text_excerpt = Column(Text, nullable=False)  # First 200 characters of analyzed text
-    full_text = Column(Text, nullable=False)  # Full analyzed text
+    text_hash = Column(String(64), ForeignKey("texts.hash"), nullable=False, index=True)  # SHA-256 of the UTF-8 text (key into texts)
     reference_topic = Column(String(200), nullable=True)
     
     # Scores
@@ -68,11 +70,11 @@ class Analysis(Base):
     repetition_score = Column(Float, nullable=False)
     semantic_score = Column(Float, nullable=False)
     
-    # Analysis details (JSON for better performance)
-    grammar_errors = Column(JSON, nullable=True)
-    repetition_errors = Column(JSON, nullable=True)
-    semantic_coherence = Column(JSON, nullable=True)
-    suggestions = Column(JSON, nullable=True)
+    # Analysis details (compressed JSON, only loaded for the detail view)
+    grammar_errors = Column(CompressedJSON, nullable=True)
+    repetition_errors = Column(CompressedJSON, nullable=True)
+    semantic_coherence = Column(CompressedJSON, nullable=True)
+    suggestions = Column(CompressedJSON, nullable=True)
     
     # Metadata
     processing_time = Column(Float, nullable=False)
@@ -87,6 +89,38 @@ class Analysis(Base):
     # Relationships
     user = relationship("User", back_populates="analyses")
     files = relationship("File", back_populates="analysis")
+    text = relationship("StoredText", lazy="raise")
+    
+    # Keyset pagination of a user's history: (user_id, order column, id)
+    __table_args__ = (
+        Index("ix_analyses_user_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_analyses_user_overall_score_id", "user_id", "overall_score", "id"),
+        Index("ix_analyses_user_grammar_score_id", "user_id", "grammar_score", "id"),
+        Index("ix_analyses_user_repetition_score_id", "user_id", "repetition_score", "id"),
+        Index("ix_analyses_user_semantic_score_id", "user_id", "semantic_score", "id"),
+    )
+    
+    @property
+    def full_text(self) -> str:
+        """Full analyzed text (load with joinedload(Analysis.text))"""
+        return self.text.content
+
+
+class StoredText(Base):
+    """Content-addressed analyzed text, shared by every analysis of the same text"""
+    
+    __tablename__ = "texts"
+    
+    hash = Column(String(64), primary_key=True)  # SHA-256 of the UTF-8 text
+    content = Column(CompressedText, nullable=False)
+    ref_count = Column(Integer, default=0, nullable=False)  # Analyses referencing this text
+    
+    # Latest complete AnalyzeResponse for this text, valid for result_key only
+    # (the analysis cache key: analysis version, language, reference topic and text)
+    result_key = Column(String(64), nullable=True)
+    result = Column(CompressedJSON, nullable=True)
+    
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
 
 class File(Base):
@@ -106,3 +140,28 @@ class File(Base):
     # Relationships
     user = relationship("User", back_populates="files")
     analysis = relationship("Analysis", back_populates="files")
+
+
+class OutboundEmail(Base):
+    """Email waiting to be (or already) delivered by the background email dispatcher"""
+    
+    __tablename__ = "outbound_emails"
+    
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    to_email = Column(String(255), nullable=False)
+    subject = Column(String(255), nullable=False)
+    html_content = Column(CompressedText, nullable=False)
+    
+    # Delivery state: 'pending', 'sending', 'sent' or 'failed'
+    status = Column(String(10), default="pending", nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    # Next delivery attempt; while 'sending' this is when the claim expires
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_error = Column(Text, nullable=True)
+    
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    sent_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        Index("ix_outbound_emails_status_next_attempt_at", "status", "next_attempt_at"),
+    )
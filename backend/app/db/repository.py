@@ -2,35 +2,179 @@
 Repository layer for database operations
 """
 
-from typing import List, Optional, Dict, Any
+import hashlib
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import List, Optional, Dict, Any, Iterable, Sequence, Tuple
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, update
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, insert, delete, update, tuple_, func
+from sqlalchemy.engine import Row
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import selectinload, load_only, joinedload
 
-from app.db.models import Analysis, File
-from app.models.responses import AnalysisResult
+from app.db.models import Analysis, File, OutboundEmail, StoredText, User
+from app.models.responses import AnalysisResult, AnalyzeResponse
 
 
 class AnalysisRepository:
     """Repository for Analysis model operations"""
     
+    # Columns of the history list view (no full text, no JSON details)
+    SUMMARY_COLUMNS = (
+        Analysis.id,
+        Analysis.source_type,
+        Analysis.text_excerpt,
+        Analysis.reference_topic,
+        Analysis.overall_score,
+        Analysis.grammar_score,
+        Analysis.repetition_score,
+        Analysis.semantic_score,
+        Analysis.processing_time,
+        Analysis.created_at,
+    )
+    
+    # Columns a history list may select (the heavy text/JSON columns are only served by get_by_id)
+    LIST_COLUMNS = {
+        column.key: column
+        for column in (*SUMMARY_COLUMNS, Analysis.user_id, Analysis.updated_at)
+    }
+    
+    # History orderings; each has a (user_id, column, id) index
+    ORDER_COLUMNS = {
+        "created_at": Analysis.created_at,
+        "overall_score": Analysis.overall_score,
+        "grammar_score": Analysis.grammar_score,
+        "repetition_score": Analysis.repetition_score,
+        "semantic_score": Analysis.semantic_score,
+    }
+    
     def __init__(self, session: AsyncSession):
         self.session = session
     
     async def create(self, analysis_data: Dict[str, Any]) -> Analysis:
         """Create a new analysis record"""
+        analysis_data, = await self._store_texts([analysis_data])
         analysis = Analysis(**analysis_data)
         self.session.add(analysis)
+        await self._adjust_user_counts({analysis_data["user_id"]: 1})
+        # Column defaults are filled in on flush, so there is nothing to refresh
         await self.session.commit()
-        await self.session.refresh(analysis)
         return analysis
     
+    async def create_from_result(
+        self,
+        result: AnalyzeResponse,
+        text: str,
+        reference_topic: Optional[str],
+        user_id: str,
+        source_type: str = "text",
+        result_key: Optional[str] = None
+    ) -> Analysis:
+        """Store an analysis response together with the analyzed text"""
+        return await self.create(
+            self.record_from_result(result, text, reference_topic, user_id, source_type, result_key)
+        )
+    
+    async def create_many(self, analyses_data: List[Dict[str, Any]]) -> List[str]:
+        """Create several analysis records with one bulk insert and a single commit"""
+        analysis_ids = await self.insert_many(analyses_data)
+        await self.session.commit()
+        return analysis_ids
+    
+    async def insert_many(self, analyses_data: List[Dict[str, Any]]) -> List[str]:
+        """
+        Bulk insert analysis records in the caller's transaction
+        
+        Rows go out as one executemany INSERT without building ORM objects or
+        reading anything back; ids are generated here unless given.
+        
+        Args:
+            analyses_data: Column values per analysis (see record_from_result)
+            
+        Returns:
+            Analysis id per entry
+        """
+        if not analyses_data:
+            return []
+        records = await self._store_texts(analyses_data)
+        for record in records:
+            record.setdefault("id", str(uuid.uuid4()))
+        await self.session.execute(insert(Analysis), records)
+        await self._adjust_user_counts(Counter(record["user_id"] for record in records))
+        return [record["id"] for record in records]
+    
+    async def _adjust_user_counts(self, deltas: Dict[str, int]) -> None:
+        """Keep users.analysis_count in step with inserted/deleted analyses (same transaction)"""
+        for user_id, delta in deltas.items():
+            if delta:
+                await self.session.execute(
+                    update(User)
+                    .where(User.id == user_id)
+                    # Keep updated_at: a new analysis is not a change to the account
+                    .values(analysis_count=User.analysis_count + delta, updated_at=User.updated_at)
+                )
+    
+    async def _store_texts(self, analyses_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Replace full_text (and stored_result) by a reference to the shared texts table"""
+        records = [dict(analysis_data) for analysis_data in analyses_data]
+        hashes = await TextRepository(self.session).acquire(
+            [record.pop("full_text") for record in records],
+            [record.pop("stored_result", None) for record in records],
+            [record.pop("text_hash", None) for record in records]
+        )
+        for record, text_hash in zip(records, hashes):
+            record["text_hash"] = text_hash
+        return records
+    
+    @staticmethod
+    def record_from_result(
+        result: AnalyzeResponse,
+        text: str,
+        reference_topic: Optional[str],
+        user_id: str,
+        source_type: str = "text",
+        result_key: Optional[str] = None,
+        text_hash: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Column values of an analysis record for an analysis response
+        
+        full_text goes to the texts table on create. With a result_key the whole
+        response is kept with the text, so identical texts can be served from it.
+        A text_hash computed while the text was read (TextRepository.hash_text)
+        saves hashing it again.
+        """
+        record = {
+            "user_id": user_id,
+            "source_type": source_type,
+            "text_excerpt": text[:200] + ("..." if len(text) > 200 else ""),
+            "full_text": text,
+            "reference_topic": reference_topic,
+            "overall_score": result.result.overall_score,
+            "grammar_score": result.result.grammar_score,
+            "repetition_score": result.result.repetition_score,
+            "semantic_score": result.result.semantic_score.score * 100,  # Convert to percentage
+            "grammar_errors": [error.dict() for error in result.result.grammar_errors] if result.result.grammar_errors else None,
+            "repetition_errors": [error.dict() for error in result.result.repetition_errors] if result.result.repetition_errors else None,
+            "semantic_coherence": result.result.semantic_coherence.dict() if result.result.semantic_coherence else None,
+            "suggestions": result.result.suggestions if result.result.suggestions else None,
+            "processing_time": result.processing_time,
+        }
+        if result_key is not None:
+            record["stored_result"] = (result_key, result.model_dump(mode="json"))
+        if text_hash is not None:
+            record["text_hash"] = text_hash
+        return record
+    
     async def get_by_id(self, analysis_id: UUID) -> Optional[Analysis]:
         """Get analysis by ID"""
         analysis_id_str = str(analysis_id)
         result = await self.session.execute(
-            select(Analysis).where(Analysis.id == analysis_id_str)
+            select(Analysis)
+            .options(joinedload(Analysis.text).load_only(StoredText.content))
+            .where(Analysis.id == analysis_id_str)
         )
         return result.scalar_one_or_none()
     
@@ -71,21 +215,28 @@ class AnalysisRepository:
         # Use UUID as-is for database lookup (keep dashes)
         analysis_id_str = str(analysis_id)
         result = await self.session.execute(
-            delete(Analysis).where(Analysis.id == analysis_id_str)
+            delete(Analysis)
+            .where(Analysis.id == analysis_id_str)
+            .returning(Analysis.user_id, Analysis.text_hash)
         )
+        deleted = result.all()
+        await self._adjust_user_counts(Counter({row.user_id: -1 for row in deleted}))
+        await TextRepository(self.session).release(row.text_hash for row in deleted)
         await self.session.commit()
-        return result.rowcount > 0
+        return len(deleted) > 0
     
     async def delete_all(self) -> int:
         """Delete all analysis records (with guard)"""
         result = await self.session.execute(delete(Analysis))
+        await self.session.execute(delete(StoredText))
+        await self.session.execute(update(User).values(analysis_count=0, updated_at=User.updated_at))
         await self.session.commit()
         return result.rowcount
     
     async def count(self) -> int:
         """Get total count of analyses"""
-        result = await self.session.execute(select(Analysis.id))
-        return len(result.scalars().all())
+        result = await self.session.execute(select(func.count()).select_from(Analysis))
+        return result.scalar_one()
     
     async def get_by_user_id(
         self, 
@@ -93,10 +244,29 @@ class AnalysisRepository:
         limit: int = 50, 
         offset: int = 0,
         order_by: str = "created_at",
-        order_desc: bool = True
+        order_desc: bool = True,
+        fields: Optional[Sequence[str]] = None
     ) -> List[Analysis]:
-        """Get analyses by user ID with pagination and ordering"""
-        query = select(Analysis).where(Analysis.user_id == user_id)
+        """
+        Get analyses by user ID with pagination and ordering
+        
+        Only list columns are loaded; full_text and the error/coherence JSON
+        stay unloaded and must not be accessed on the returned objects.
+        
+        Args:
+            user_id: Owner of the analyses
+            limit: Maximum rows returned
+            offset: Rows skipped
+            order_by: Key of ORDER_COLUMNS
+            order_desc: Newest/highest first
+            fields: Keys of LIST_COLUMNS to load (all of them if None); id is always loaded
+        """
+        columns = [self.LIST_COLUMNS[field] for field in (fields or self.LIST_COLUMNS)]
+        query = (
+            select(Analysis)
+            .options(load_only(Analysis.id, *columns, raiseload=True))
+            .where(Analysis.user_id == user_id)
+        )
         
         # Add ordering
         if order_by == "created_at":
@@ -116,12 +286,59 @@ class AnalysisRepository:
         result = await self.session.execute(query)
         return result.scalars().all()
     
+    async def get_page_by_user_id(
+        self,
+        user_id: str,
+        limit: int = 50,
+        order_by: str = "created_at",
+        order_desc: bool = True,
+        after: Optional[Tuple[Any, str]] = None
+    ) -> List[Row]:
+        """
+        Keyset-paginated history summaries of a user
+        
+        Args:
+            user_id: Owner of the analyses
+            limit: Maximum rows returned
+            order_by: Key of ORDER_COLUMNS
+            order_desc: Newest/highest first
+            after: (order value, id) of the last row of the previous page
+            
+        Returns:
+            Rows with SUMMARY_COLUMNS, ordered by (order column, id)
+        """
+        column = self.ORDER_COLUMNS[order_by]
+        query = select(*self.SUMMARY_COLUMNS).where(Analysis.user_id == user_id)
+        
+        # Seek past the previous page instead of counting skipped rows
+        if after is not None:
+            key = tuple_(column, Analysis.id)
+            query = query.where(key < tuple_(*after) if order_desc else key > tuple_(*after))
+        
+        if order_desc:
+            query = query.order_by(column.desc(), Analysis.id.desc())
+        else:
+            query = query.order_by(column.asc(), Analysis.id.asc())
+        
+        result = await self.session.execute(query.limit(limit))
+        return result.all()
+    
     async def count_by_user_id(self, user_id: str) -> int:
         """Get total count of analyses for a specific user"""
         result = await self.session.execute(
-            select(Analysis.id).where(Analysis.user_id == user_id)
+            select(func.count()).select_from(Analysis).where(Analysis.user_id == user_id)
         )
-        return len(result.scalars().all())
+        return result.scalar_one()
+    
+    async def get_user_total(self, user_id: str) -> int:
+        """Total analyses of a user from the maintained users.analysis_count (one primary-key lookup)"""
+        result = await self.session.execute(
+            select(User.analysis_count).where(User.id == user_id)
+        )
+        total = result.scalar_one_or_none()
+        if total is None:
+            return await self.count_by_user_id(user_id)
+        return total
 
 
 class FileRepository:
@@ -135,9 +352,30 @@ class FileRepository:
         file_record = File(**file_data)
         self.session.add(file_record)
         await self.session.commit()
-        await self.session.refresh(file_record)
         return file_record
     
+    async def create_many(self, files_data: List[Dict[str, Any]]) -> List[str]:
+        """Create several file records with one bulk insert and a single commit"""
+        file_ids = await self.insert_many(files_data)
+        await self.session.commit()
+        return file_ids
+    
+    async def insert_many(self, files_data: List[Dict[str, Any]]) -> List[str]:
+        """
+        Bulk insert file records in the caller's transaction (ids generated here unless given)
+        
+        Returns:
+            File id per entry
+        """
+        if not files_data:
+            return []
+        records = [dict(file_data) for file_data in files_data]
+        for record in records:
+            record.setdefault("id", str(uuid.uuid4()))
+            record.setdefault("analysis_id", None)
+        await self.session.execute(insert(File), records)
+        return [record["id"] for record in records]
+    
     async def get_by_id(self, file_id: UUID) -> Optional[File]:
         """Get file by ID"""
         result = await self.session.execute(
@@ -161,3 +399,243 @@ class FileRepository:
         )
         await self.session.commit()
         return await self.get_by_id(file_id)
+
+
+class TextRepository:
+    """Repository for the content-addressed texts shared by analyses"""
+    
+    # Inserts that can merge a concurrently inserted text into its reference count
+    UPSERT_INSERTS = {
+        "postgresql": postgresql.insert,
+        "sqlite": sqlite.insert,
+    }
+    
+    def __init__(self, session: AsyncSession):
+        self.session = session
+    
+    @staticmethod
+    def hash_text(text: str) -> str:
+        """Key of a text in the texts table"""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+    
+    async def acquire(
+        self,
+        texts: List[str],
+        results: Optional[List[Optional[Tuple[str, Dict[str, Any]]]]] = None,
+        known_hashes: Optional[List[Optional[str]]] = None
+    ) -> List[str]:
+        """
+        Add one reference per text, storing texts that are new (in the caller's transaction)
+        
+        Args:
+            texts: Analyzed text of each new analysis
+            results: Optional (result key, AnalyzeResponse dict) per text to keep with it
+            known_hashes: Optional hash_text() per text, where already computed
+            
+        Returns:
+            Text hash per entry of texts
+        """
+        hashes = [
+            known or self.hash_text(text)
+            for text, known in zip(texts, known_hashes or [None] * len(texts))
+        ]
+        counts = Counter(hashes)
+        contents = dict(zip(hashes, texts))
+        latest = {
+            text_hash: stored
+            for text_hash, stored in zip(hashes, results or [])
+            if stored is not None
+        }
+        
+        # Texts stored already only gain references
+        acquired = set()
+        for count, group in _group_by_count(counts).items():
+            result = await self.session.execute(
+                update(StoredText)
+                .where(StoredText.hash.in_(group))
+                .values(ref_count=StoredText.ref_count + count)
+                .returning(StoredText.hash)
+            )
+            acquired.update(result.scalars().all())
+        for text_hash in acquired & latest.keys():
+            result_key, payload = latest[text_hash]
+            await self.session.execute(
+                update(StoredText)
+                .where(StoredText.hash == text_hash, StoredText.result_key.is_distinct_from(result_key))
+                .values(result_key=result_key, result=payload)
+            )
+        
+        new_hashes = [text_hash for text_hash in counts if text_hash not in acquired]
+        if new_hashes:
+            rows = [
+                {
+                    "hash": text_hash,
+                    "content": contents[text_hash],
+                    "ref_count": counts[text_hash],
+                    "result_key": latest[text_hash][0] if text_hash in latest else None,
+                    "result": latest[text_hash][1] if text_hash in latest else None,
+                }
+                for text_hash in new_hashes
+            ]
+            dialect = self.session.get_bind().dialect.name
+            upsert = self.UPSERT_INSERTS.get(dialect)
+            if upsert is None:
+                statement = insert(StoredText)
+            else:
+                statement = upsert(StoredText)
+                statement = statement.on_conflict_do_update(
+                    index_elements=[StoredText.hash],
+                    set_={"ref_count": StoredText.ref_count + statement.excluded.ref_count}
+                )
+            await self.session.execute(statement, rows)
+        
+        return hashes
+    
+    async def release(self, hashes: Iterable[str]) -> None:
+        """Drop one reference per hash and delete texts nothing refers to (in the caller's transaction)"""
+        counts = Counter(hashes)
+        if not counts:
+            return
+        for count, group in _group_by_count(counts).items():
+            await self.session.execute(
+                update(StoredText)
+                .where(StoredText.hash.in_(group))
+                .values(ref_count=StoredText.ref_count - count)
+            )
+        await self.session.execute(
+            delete(StoredText).where(StoredText.hash.in_(list(counts)), StoredText.ref_count <= 0)
+        )
+    
+    async def get_result(self, text: str, result_key: str) -> Optional[AnalyzeResponse]:
+        """
+        Response stored with an identical text, if it was produced for result_key
+        
+        Args:
+            text: Text to analyze
+            result_key: AnalysisService.result_key of the request
+            
+        Returns:
+            Stored response or None
+        """
+        result = await self.session.execute(
+            select(StoredText.result).where(
+                StoredText.hash == self.hash_text(text),
+                StoredText.result_key == result_key
+            )
+        )
+        payload = result.scalar_one_or_none()
+        if payload is None:
+            return None
+        return AnalyzeResponse.model_validate(payload)
+
+
+class OutboundEmailRepository:
+    """Repository for the outbound email queue"""
+    
+    def __init__(self, session: AsyncSession):
+        self.session = session
+    
+    def add(self, to_email: str, subject: str, html_content: str) -> OutboundEmail:
+        """Queue an email in the caller's transaction"""
+        email = OutboundEmail(
+            to_email=to_email,
+            subject=subject,
+            html_content=html_content,
+            status="pending",
+            attempts=0,
+            next_attempt_at=datetime.utcnow()
+        )
+        self.session.add(email)
+        return email
+    
+    async def claim_due(self, limit: int, lease_seconds: float) -> List[Row]:
+        """
+        Claim emails that are due for delivery and commit the claim
+        
+        Claimed rows are marked 'sending' and their attempt is counted up front.
+        If the sender dies before recording the outcome, the claim expires
+        after lease_seconds and the email is picked up again.
+        
+        Args:
+            limit: Maximum number of emails to claim
+            lease_seconds: How long the claim holds
+            
+        Returns:
+            Rows with id, to_email, subject, html_content and attempts
+        """
+        now = datetime.utcnow()
+        due = (
+            (OutboundEmail.status.in_(("pending", "sending"))) &
+            (OutboundEmail.next_attempt_at <= now)
+        )
+        result = await self.session.execute(
+            select(OutboundEmail.id)
+            .where(due)
+            .order_by(OutboundEmail.next_attempt_at)
+            .limit(limit)
+        )
+        email_ids = list(result.scalars())
+        if not email_ids:
+            return []
+        
+        # Re-checking due makes a row claimed concurrently by another worker drop out
+        result = await self.session.execute(
+            update(OutboundEmail)
+            .where(OutboundEmail.id.in_(email_ids), due)
+            .values(
+                status="sending",
+                attempts=OutboundEmail.attempts + 1,
+                next_attempt_at=now + timedelta(seconds=lease_seconds)
+            )
+            .returning(
+                OutboundEmail.id, OutboundEmail.to_email, OutboundEmail.subject,
+                OutboundEmail.html_content, OutboundEmail.attempts
+            )
+            .execution_options(synchronize_session=False)
+        )
+        claimed = result.all()
+        await self.session.commit()
+        return claimed
+    
+    async def record_results(
+        self,
+        sent_ids: List[str],
+        failures: Dict[str, Tuple[str, Optional[datetime]]]
+    ) -> None:
+        """
+        Store the outcome of a delivery batch and commit
+        
+        Args:
+            sent_ids: Emails that were delivered
+            failures: Error and retry time per failed email; no retry time marks it failed for good
+        """
+        now = datetime.utcnow()
+        if sent_ids:
+            await self.session.execute(
+                update(OutboundEmail)
+                .where(OutboundEmail.id.in_(sent_ids))
+                .values(status="sent", sent_at=now, last_error=None)
+                .execution_options(synchronize_session=False)
+            )
+        if failures:
+            await self.session.execute(
+                update(OutboundEmail),
+                [
+                    {
+                        "id": email_id,
+                        "status": "failed" if retry_at is None else "pending",
+                        "next_attempt_at": retry_at or now,
+                        "last_error": error[:1000],
+                    }
+                    for email_id, (error, retry_at) in failures.items()
+                ]
+            )
+        await self.session.commit()
+
+
+def _group_by_count(counts: Dict[str, int]) -> Dict[int, List[str]]:
+    """Group keys by their count, so each distinct increment is one statement"""
+    groups: Dict[int, List[str]] = defaultdict(list)
+    for key, count in counts.items():
+        groups[count].append(key)
+    return groups
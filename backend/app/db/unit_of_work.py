@@ -0,0 +1,86 @@
+"""
+Unit of work for writing analyses and their files in one transaction
+"""
+
+import uuid
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.repository import AnalysisRepository, FileRepository
+
+
+class UnitOfWork:
+    """
+    Collects new analysis and file records and writes them with a single commit
+
+    Ids are generated when a record is added, so a file can reference its
+    analysis before either is inserted and nothing has to be read back.
+
+    Usage:
+        async with UnitOfWork(session) as uow:
+            analysis_id = uow.add_analysis(analysis_data)
+            uow.add_file(file_data, analysis_id)
+        # committed here, or rolled back if the block raised
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.analyses: List[Dict[str, Any]] = []
+        self.files: List[Dict[str, Any]] = []
+
+    def add_analysis(self, analysis_data: Dict[str, Any]) -> str:
+        """
+        Queue an analysis record
+
+        Args:
+            analysis_data: Column values (see AnalysisRepository.record_from_result)
+
+        Returns:
+            Id the analysis will be stored under
+        """
+        record = dict(analysis_data)
+        record.setdefault("id", str(uuid.uuid4()))
+        self.analyses.append(record)
+        return record["id"]
+
+    def add_file(self, file_data: Dict[str, Any], analysis_id: Optional[str] = None) -> str:
+        """
+        Queue a file record
+
+        Args:
+            file_data: Column values of the uploaded file
+            analysis_id: Analysis the file was analyzed into, if any
+
+        Returns:
+            Id the file will be stored under
+        """
+        record = dict(file_data)
+        record.setdefault("id", str(uuid.uuid4()))
+        if analysis_id is not None:
+            record["analysis_id"] = analysis_id
+        self.files.append(record)
+        return record["id"]
+
+    async def commit(self) -> None:
+        """Insert everything queued (analyses first, files reference them) and commit once"""
+        try:
+            await AnalysisRepository(self.session).insert_many(self.analyses)
+            await FileRepository(self.session).insert_many(self.files)
+            await self.session.commit()
+        except Exception:
+            await self.session.rollback()
+            raise
+        finally:
+            self.analyses = []
+            self.files = []
+
+    async def __aenter__(self) -> "UnitOfWork":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.commit()
+        else:
+            self.analyses = []
+            self.files = []
@@ -7,11 +7,15 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
-from app.api.routes import router as api_router
+from app.api.routes import router as api_router, job_manager
 from app.api.auth import router as auth_router
 from app.core.config import settings
 from app.db.session import engine
 from app.middleware.logging import LoggingMiddleware
+from app.services.inference_pool import configure_torch_threads, shutdown_inference_pools
+from app.services.auth_service import email_dispatcher
+from app.services.password_hasher import shutdown_password_hasher
+from app.services.template_registry import get_email_templates
 from sqlalchemy.ext.asyncio import AsyncEngine
 
 # Create FastAPI application instance
@@ -70,6 +74,8 @@ async def global_exception_handler(request, exc):
 
 @app.on_event("startup")
 async def on_startup() -> None:
+    # One torch thread budget for the whole process (thread-mode pools share it)
+    configure_torch_threads()
     # Eagerly test DB connectivity on startup (non-fatal if unavailable during local dev?)
     try:
         test_engine: AsyncEngine = engine
@@ -78,4 +84,19 @@ async def on_startup() -> None:
             await conn.run_sync(lambda _: None)
     except Exception:
         # We avoid raising to not block non-DB flows during initial setup
-        pass
\ No newline at end of file
+        pass
+    # Compile email templates up front; a template syntax error aborts startup
+    get_email_templates().preload()
+    # Deliver emails left in the queue by a previous run
+    email_dispatcher.notify()
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    # Stop inference worker threads/processes
+    shutdown_inference_pools()
+    shutdown_password_hasher()
+    # Stop email delivery; unsent emails stay queued in outbound_emails
+    email_dispatcher.shutdown()
+    # Stop analysis job workers; queued jobs are not persisted
+    job_manager.shutdown()
@@ -2,12 +2,18 @@
 Main analysis service that coordinates all analysis modules
 """
 
+import asyncio
+import hashlib
 import time
-from typing import List, Optional, Tuple
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from app.core.config import settings
 from app.services.grammar_service import GrammarService
 from app.services.repetition_service import RepetitionService
-from app.services.semantic_service import SemanticService
+from app.services.semantic_service import DocumentContext, SemanticService
 from app.services.llm_service import LLMService
+from app.services.result_cache import AnalysisResultCache, make_result_key
+from app.services.encoder_service import EncoderOverloadedError
+from app.services.tokenized_document import TOKENIZER_VERSION, TokenizedDocument
 from app.models.responses import (
     AnalyzeResponse,
     AnalysisResult,
@@ -20,6 +26,12 @@ from app.models.responses import (
     WritingStyle
 )
 
+# Awaited with (stage name, partial result) as each analysis stage finishes
+StageCallback = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+# Awaited with a result key on a cache miss; returns a response stored elsewhere, or None
+StoredResultLookup = Callable[[str], Awaitable[Optional[AnalyzeResponse]]]
+
 
 class AnalysisService:
     """Main service for coordinating all text analysis"""
@@ -30,181 +42,394 @@ class AnalysisService:
         self.repetition_service = RepetitionService()
         self.semantic_service = SemanticService()
         self.llm_service = LLMService()
+        
+        self.analysis_version = self.get_analysis_version()
+        self.result_cache = None
+        if settings.ANALYSIS_CACHE_ENABLED:
+            self.result_cache = AnalysisResultCache(
+                version=self.analysis_version,
+                max_entries=settings.ANALYSIS_CACHE_MAX_ENTRIES,
+                db_path=settings.ANALYSIS_CACHE_DB_PATH or None,
+                max_disk_entries=settings.ANALYSIS_CACHE_MAX_DISK_ENTRIES,
+                touch_interval=settings.ANALYSIS_CACHE_TOUCH_INTERVAL_SECONDS
+            )
     
-    async def analyze_text(self, text: str, reference_topic: str = None) -> AnalyzeResponse:
+    def get_analysis_version(self) -> str:
         """
-        Perform comprehensive text analysis
+        Fingerprint of everything that changes analysis output
+        
+        Returns:
+            Short hash of the grammar rules and model names
+        """
+        parts = [
+            self.grammar_service.analyzer.rules.fingerprint(),
+            str(self.grammar_service.use_llm),
+            str(self.semantic_service.model_name),
+            str(self.llm_service.sentiment_model_name),
+            TOKENIZER_VERSION,
+        ]
+        return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
+    
+    def result_key(self, text: str, reference_topic: Optional[str] = None) -> str:
+        """
+        Key identifying the result of analyzing text with the current rules and models
+        
+        Args:
+            text: Text to analyze
+            reference_topic: Optional reference topic
+            
+        Returns:
+            Result cache key
+        """
+        language = self.grammar_service._detect_language(text)
+        return make_result_key(self.analysis_version, text, reference_topic, language)
+    
+    async def analyze_text(
+        self,
+        text: str,
+        reference_topic: str = None,
+        on_stage: Optional[StageCallback] = None,
+        stored_result: Optional[StoredResultLookup] = None,
+        cache_key: Optional[str] = None
+    ) -> AnalyzeResponse:
+        """
+        Perform comprehensive text analysis, served from the result cache when possible
         
         Args:
             text: Text to analyze
             reference_topic: Optional reference topic for semantic analysis
+            on_stage: Optional callback awaited with (stage, partial result) as each of
+                "grammar", "repetition", "semantic" and "sentiment" finishes
+            stored_result: Optional lookup of a persisted response (e.g. the one stored
+                with an identical text), tried when the result cache misses
+            cache_key: result_key(text, reference_topic), if the caller already has it
             
         Returns:
             Complete analysis response
         """
+        if self.result_cache is None and stored_result is None:
+            return await self._analyze_text(text, reference_topic, on_stage)
+        
         start_time = time.time()
+        cache_key = cache_key or self.result_key(text, reference_topic)
         
-        try:
-            # Run all analyses concurrently
-            grammar_errors, repetition_errors, semantic_score, topic_issues, llm_analysis = await self._run_analyses(
-                text, reference_topic
-            )
+        cached = await self.result_cache.get(cache_key) if self.result_cache is not None else None
+        if cached is None and stored_result is not None:
+            cached = await stored_result(cache_key)
+            if cached is not None and self.result_cache is not None:
+                await self.result_cache.put(cache_key, cached)
+        if cached is not None:
+            if on_stage is not None:
+                await self._replay_stages(cached, on_stage)
+            cached.processing_time = round(time.time() - start_time, 3)
+            return cached
+        
+        response = await self._analyze_text(text, reference_topic, on_stage)
+        if self.result_cache is not None:
+            await self.result_cache.put(cache_key, response)
+        return response
+    
+    async def analyze_batch(
+        self,
+        items: List[Tuple[str, Optional[str]]]
+    ) -> AsyncIterator[Tuple[int, AnalyzeResponse]]:
+        """
+        Analyze many texts together, yielding results as each document finishes
+        
+        Cached documents are yielded first. For the rest, grammar rules run in
+        parallel on the rules pool, the sentences of all documents go through
+        one embedding pass, and sentiment requests are submitted together so the
+        micro-batcher runs them in full batches.
+        
+        Args:
+            items: (text, reference_topic) per document
             
-            # Calculate overall score
-            overall_score = await self._calculate_overall_score(
-                text, grammar_errors, repetition_errors, semantic_score
+        Yields:
+            (index in items, analysis response)
+        """
+        start_time = time.time()
+        pending = []
+        cache_keys = {}
+        
+        for index, (text, reference_topic) in enumerate(items):
+            if self.result_cache is not None:
+                language = self.grammar_service._detect_language(text)
+                cache_keys[index] = self.result_cache.make_key(text, reference_topic, language)
+                cached = await self.result_cache.get(cache_keys[index])
+                if cached is not None:
+                    cached.processing_time = round(time.time() - start_time, 3)
+                    yield index, cached
+                    continue
+            pending.append(index)
+        
+        if not pending:
+            return
+        
+        documents = {index: TokenizedDocument(items[index][0]) for index in pending}
+        grammar = await self.grammar_service.analyze_grammar_many(
+            [items[index][0] for index in pending], [documents[index] for index in pending]
+        )
+        contexts = await self.semantic_service.build_document_contexts(
+            [(items[index][0], items[index][1], documents[index]) for index in pending]
+        )
+        
+        async def analyze_one(position: int) -> Tuple[int, AnalyzeResponse]:
+            index = pending[position]
+            text, reference_topic = items[index]
+            response = await self._analyze_text(
+                text, reference_topic,
+                document=documents[index],
+                context=contexts[position],
+                grammar_errors=grammar[position]
             )
+            if self.result_cache is not None and response.success:
+                await self.result_cache.put(cache_keys[index], response)
+            return index, response
+        
+        for finished in asyncio.as_completed([analyze_one(position) for position in range(len(pending))]):
+            yield await finished
+    
+    async def _analyze_text(
+        self,
+        text: str,
+        reference_topic: str = None,
+        on_stage: Optional[StageCallback] = None,
+        document: Optional[TokenizedDocument] = None,
+        context: Optional[DocumentContext] = None,
+        grammar_errors: Optional[List[GrammarError]] = None
+    ) -> AnalyzeResponse:
+        """
+        Perform comprehensive text analysis
+        
+        Args:
+            text: Text to analyze
+            reference_topic: Optional reference topic for semantic analysis
+            on_stage: Optional callback awaited as each stage finishes
+            document: Shared tokenization of text (built here if not given)
+            context: Precomputed semantic context (see analyze_batch)
+            grammar_errors: Precomputed grammar errors (see analyze_batch)
             
-            # Get individual scores
-            grammar_score = await self.grammar_service.get_grammar_score(text, grammar_errors)
-            repetition_score = await self.repetition_service.get_repetition_score(text, repetition_errors)
-            semantic_score_value = semantic_score.score * 100  # Convert to 0-100 scale
-            
-            # Generate suggestions
-            suggestions = self._generate_suggestions(
-                grammar_errors, repetition_errors, semantic_score, topic_issues
-            )
+        Returns:
+            Complete analysis response
+        """
+        start_time = time.time()
+        
+        try:
+            # Tokenize once; every analyzer reads the same spans
+            document = document or TokenizedDocument(text)
             
-            # Add detailed topic consistency suggestions
-            detailed_topic_suggestions = self.semantic_service.generate_topic_improvement_suggestions(
-                topic_issues, reference_topic
+            # Run all analyses concurrently
+            grammar_errors, repetition_errors, semantic_score, topic_issues, llm_analysis = await self._run_analyses(
+                text, reference_topic, on_stage, document, context, grammar_errors
             )
-            suggestions.extend(detailed_topic_suggestions)
             
-            # Add LLM-powered suggestions
-            llm_suggestions = await self.llm_service.generate_improvement_suggestions(
-                text, {
-                    'grammar_score': grammar_score,
-                    'repetition_score': repetition_score,
-                    'semantic_score': semantic_score.score,
-                    'grammar_errors': grammar_errors,
-                    'repetition_errors': repetition_errors,
-                    'topic_consistency': topic_issues
-                }
+            return await self.build_response(
+                text, reference_topic, grammar_errors, repetition_errors,
+                semantic_score, topic_issues, llm_analysis, start_time, document
             )
-            suggestions.extend(llm_suggestions)
-            
-            # Convert topic issues to Pydantic models
-            from app.models.responses import TopicIssue, FlowDisruption, TopicConsistencyResult
+        except EncoderOverloadedError:
+            raise
+        except Exception as e:
+            return self._error_response(start_time)
+    
+    async def build_response(
+        self,
+        text: str,
+        reference_topic: Optional[str],
+        grammar_errors: List[GrammarError],
+        repetition_errors: List[RepetitionError],
+        semantic_score: SemanticScore,
+        topic_issues: dict,
+        llm_analysis: Optional[dict],
+        start_time: float,
+        document: Optional[TokenizedDocument] = None
+    ) -> AnalyzeResponse:
+        """
+        Score the analysis results and assemble the response
+        
+        Args:
+            text: Analyzed text
+            reference_topic: Optional reference topic
+            grammar_errors: Grammar errors found
+            repetition_errors: Repetition errors found
+            semantic_score: Semantic coherence score
+            topic_issues: Topic consistency issues found
+            llm_analysis: LLM analysis dictionary (see build_llm_analysis)
+            start_time: time.time() when the analysis started
+            document: Shared tokenization of text (built here if not given)
             
-            off_topic_sentences = [
-                TopicIssue(
-                    sentence=issue["sentence"],
-                    index=issue["index"],
-                    issue=issue["issue"],
-                    topic_relevance=issue.get("topic_relevance")
-                )
-                for issue in topic_issues.get("off_topic_sentences", [])
-            ]
+        Returns:
+            Complete analysis response
+        """
+        document = document or TokenizedDocument(text)
+        
+        # Calculate overall score
+        overall_score = await self._calculate_overall_score(
+            text, grammar_errors, repetition_errors, semantic_score, document
+        )
+        
+        # Get individual scores
+        grammar_score = await self.grammar_service.get_grammar_score(text, grammar_errors)
+        repetition_score = await self.repetition_service.get_repetition_score(text, repetition_errors, document)
+        semantic_score_value = semantic_score.score * 100  # Convert to 0-100 scale
+        
+        # Generate suggestions
+        suggestions = self._generate_suggestions(
+            grammar_errors, repetition_errors, semantic_score, topic_issues
+        )
+        
+        # Add detailed topic consistency suggestions
+        detailed_topic_suggestions = self.semantic_service.generate_topic_improvement_suggestions(
+            topic_issues, reference_topic
+        )
+        suggestions.extend(detailed_topic_suggestions)
+        
+        # Add LLM-powered suggestions
+        llm_suggestions = await self.llm_service.generate_improvement_suggestions(
+            text, {
+                'grammar_score': grammar_score,
+                'repetition_score': repetition_score,
+                'semantic_score': semantic_score.score,
+                'grammar_errors': grammar_errors,
+                'repetition_errors': repetition_errors,
+                'topic_consistency': topic_issues
+            }
+        )
+        suggestions.extend(llm_suggestions)
+        
+        # Convert topic issues to Pydantic models
+        topic_consistency_result = self._topic_consistency_result(topic_issues)
+        
+        # Convert LLM analysis results to Pydantic models
+        llm_analysis_result = None
+        if llm_analysis and not isinstance(llm_analysis, Exception):
+            sentiment_analysis = self._sentiment_analysis(llm_analysis.get("sentiment_analysis"))
             
-            flow_disruptions = [
-                FlowDisruption(
-                    sentence_index=issue["sentence_index"],
-                    next_sentence_index=issue["next_sentence_index"],
-                    sentence=issue["sentence"],
-                    next_sentence=issue["next_sentence"],
-                    similarity=issue["similarity"],
-                    issue=issue["issue"]
+            topic_classification = None
+            if llm_analysis.get("topic_classification"):
+                topic_data = llm_analysis["topic_classification"]
+                topic_classification = TopicClassification(
+                    predicted_topic=topic_data.get("predicted_topic", "Genel"),
+                    confidence=topic_data.get("confidence", 0.0),
+                    all_scores=topic_data.get("all_scores", {}),
+                    text=topic_data.get("text", "")
                 )
-                for issue in topic_issues.get("flow_disruptions", [])
-            ]
-            
-            topic_consistency_result = TopicConsistencyResult(
-                has_issues=topic_issues.get("has_issues", False),
-                off_topic_sentences=off_topic_sentences,
-                flow_disruptions=flow_disruptions,
-                total_sentences=topic_issues.get("total_sentences", 0),
-                issue_count=topic_issues.get("issue_count", 0)
-            )
             
-            # Convert LLM analysis results to Pydantic models
-            llm_analysis_result = None
-            if llm_analysis and not isinstance(llm_analysis, Exception):
-                sentiment_analysis = None
-                if llm_analysis.get("sentiment_analysis"):
-                    sentiment_data = llm_analysis["sentiment_analysis"]
-                    sentiment_analysis = SentimentAnalysis(
-                        sentiment=sentiment_data.get("sentiment", "neutral"),
-                        confidence=sentiment_data.get("confidence", 0.0),
-                        text=sentiment_data.get("text", "")
-                    )
-                
-                topic_classification = None
-                if llm_analysis.get("topic_classification"):
-                    topic_data = llm_analysis["topic_classification"]
-                    topic_classification = TopicClassification(
-                        predicted_topic=topic_data.get("predicted_topic", "Genel"),
-                        confidence=topic_data.get("confidence", 0.0),
-                        all_scores=topic_data.get("all_scores", {}),
-                        text=topic_data.get("text", "")
-                    )
-                
-                writing_style = None
-                if llm_analysis.get("writing_style"):
-                    style_data = llm_analysis["writing_style"]
-                    writing_style = WritingStyle(
-                        style_type=style_data.get("style_type", "Bilinmiyor"),
-                        formality=style_data.get("formality", "Bilinmiyor"),
-                        avg_sentence_length=style_data.get("avg_sentence_length", 0.0),
-                        avg_word_length=style_data.get("avg_word_length", 0.0),
-                        sentence_count=style_data.get("sentence_count", 0),
-                        word_count=style_data.get("word_count", 0),
-                        character_count=style_data.get("character_count", 0)
-                    )
-                
-                llm_analysis_result = LLMAnalysis(
-                    sentiment_analysis=sentiment_analysis,
-                    topic_classification=topic_classification,
-                    writing_style=writing_style,
-                    text_length=llm_analysis.get("text_length", len(text)),
-                    analysis_timestamp=llm_analysis.get("analysis_timestamp")
+            writing_style = None
+            if llm_analysis.get("writing_style"):
+                style_data = llm_analysis["writing_style"]
+                writing_style = WritingStyle(
+                    style_type=style_data.get("style_type", "Bilinmiyor"),
+                    formality=style_data.get("formality", "Bilinmiyor"),
+                    avg_sentence_length=style_data.get("avg_sentence_length", 0.0),
+                    avg_word_length=style_data.get("avg_word_length", 0.0),
+                    sentence_count=style_data.get("sentence_count", 0),
+                    word_count=style_data.get("word_count", 0),
+                    character_count=style_data.get("character_count", 0)
                 )
             
-            # Create analysis result
-            result = AnalysisResult(
-                grammar_errors=grammar_errors,
-                repetition_errors=repetition_errors,
-                semantic_score=semantic_score,
-                grammar_score=grammar_score,
-                repetition_score=repetition_score,
-                semantic_coherence=semantic_score,  # Use same semantic score for coherence
-                topic_consistency=topic_consistency_result,
-                overall_score=overall_score,
-                suggestions=suggestions,
-                llm_analysis=llm_analysis_result
+            llm_analysis_result = LLMAnalysis(
+                sentiment_analysis=sentiment_analysis,
+                topic_classification=topic_classification,
+                writing_style=writing_style,
+                text_length=llm_analysis.get("text_length", len(text)),
+                analysis_timestamp=llm_analysis.get("analysis_timestamp")
             )
-            
-            processing_time = time.time() - start_time
-            
-            return AnalyzeResponse(
-                success=True,
-                result=result,
-                processing_time=round(processing_time, 3)
+        
+        # Create analysis result
+        result = AnalysisResult(
+            grammar_errors=grammar_errors,
+            repetition_errors=repetition_errors,
+            semantic_score=semantic_score,
+            grammar_score=grammar_score,
+            repetition_score=repetition_score,
+            semantic_coherence=semantic_score,  # Use same semantic score for coherence
+            topic_consistency=topic_consistency_result,
+            overall_score=overall_score,
+            suggestions=suggestions,
+            llm_analysis=llm_analysis_result
+        )
+        
+        processing_time = time.time() - start_time
+        
+        return AnalyzeResponse(
+            success=True,
+            result=result,
+            processing_time=round(processing_time, 3)
+        )
+    
+    def _topic_consistency_result(self, topic_issues: dict):
+        """Convert the topic issues dictionary to its response model"""
+        from app.models.responses import TopicIssue, FlowDisruption, TopicConsistencyResult
+        
+        off_topic_sentences = [
+            TopicIssue(
+                sentence=issue["sentence"],
+                index=issue["index"],
+                issue=issue["issue"],
+                topic_relevance=issue.get("topic_relevance")
             )
-            
-        except Exception as e:
-            processing_time = time.time() - start_time
-            
-            return AnalyzeResponse(
-                success=False,
-                result=AnalysisResult(
-                    grammar_errors=[],
-                    repetition_errors=[],
-                    semantic_score=SemanticScore(score=0.0, explanation="Analiz hatası"),
-                    grammar_score=0.0,
-                    repetition_score=0.0,
-                    semantic_coherence=SemanticScore(score=0.0, explanation="Analiz hatası"),
-                    overall_score=0.0,
-                    suggestions=["Analiz sırasında hata oluştu"],
-                    llm_analysis=None
-                ),
-                processing_time=round(processing_time, 3)
+            for issue in topic_issues.get("off_topic_sentences", [])
+        ]
+        
+        flow_disruptions = [
+            FlowDisruption(
+                sentence_index=issue["sentence_index"],
+                next_sentence_index=issue["next_sentence_index"],
+                sentence=issue["sentence"],
+                next_sentence=issue["next_sentence"],
+                similarity=issue["similarity"],
+                issue=issue["issue"]
             )
+            for issue in topic_issues.get("flow_disruptions", [])
+        ]
+        
+        return TopicConsistencyResult(
+            has_issues=topic_issues.get("has_issues", False),
+            off_topic_sentences=off_topic_sentences,
+            flow_disruptions=flow_disruptions,
+            total_sentences=topic_issues.get("total_sentences", 0),
+            issue_count=topic_issues.get("issue_count", 0)
+        )
+    
+    def _sentiment_analysis(self, sentiment_data: Optional[dict]) -> Optional[SentimentAnalysis]:
+        """Convert a sentiment result dictionary to its response model"""
+        if not sentiment_data:
+            return None
+        return SentimentAnalysis(
+            sentiment=sentiment_data.get("sentiment", "neutral"),
+            confidence=sentiment_data.get("confidence", 0.0),
+            text=sentiment_data.get("text", "")
+        )
+    
+    def _error_response(self, start_time: float) -> AnalyzeResponse:
+        """Response returned when the analysis fails"""
+        processing_time = time.time() - start_time
+        
+        return AnalyzeResponse(
+            success=False,
+            result=AnalysisResult(
+                grammar_errors=[],
+                repetition_errors=[],
+                semantic_score=SemanticScore(score=0.0, explanation="Analiz hatası"),
+                grammar_score=0.0,
+                repetition_score=0.0,
+                semantic_coherence=SemanticScore(score=0.0, explanation="Analiz hatası"),
+                overall_score=0.0,
+                suggestions=["Analiz sırasında hata oluştu"],
+                llm_analysis=None
+            ),
+            processing_time=round(processing_time, 3)
+        )
     
     async def _run_analyses(
         self,
         text: str,
-        reference_topic: Optional[str] = None
+        reference_topic: Optional[str] = None,
+        on_stage: Optional[StageCallback] = None,
+        document: Optional[TokenizedDocument] = None,
+        context: Optional[DocumentContext] = None,
+        grammar_errors: Optional[List[GrammarError]] = None
     ) -> Tuple[List[GrammarError], List[RepetitionError], SemanticScore, dict, Optional[dict]]:
         """
         Run all analyses concurrently
@@ -212,78 +437,176 @@ class AnalysisService:
         Args:
             text: Text to analyze
             reference_topic: Optional reference topic
+            on_stage: Optional callback awaited as each stage finishes
+            document: Shared tokenization of text (built here if not given)
+            context: Precomputed semantic context, skips sentence splitting and encoding
+            grammar_errors: Precomputed grammar errors, skips the grammar check
             
         Returns:
             Tuple of (grammar_errors, repetition_errors, semantic_score, topic_issues, llm_analysis)
         """
-        import asyncio
-        
-        # Run core analyses concurrently (faster)
-        tasks = [
-            self.grammar_service.analyze_grammar(text),
-            self.repetition_service.analyze_repetitions(text),
-            self.semantic_service.analyze_semantic_coherence(text, reference_topic),
-            self.semantic_service.detect_topic_consistency_issues(text, reference_topic)
-        ]
+        document = document or TokenizedDocument(text)
         
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        async def precomputed(value):
+            return value
         
-        # Handle exceptions gracefully
-        grammar_errors = results[0] if not isinstance(results[0], Exception) else []
-        repetition_errors = results[1] if not isinstance(results[1], Exception) else []
-        semantic_score = results[2] if not isinstance(results[2], Exception) else SemanticScore(
-            score=0.0, explanation="Anlamsal analiz hatası"
+        # Split and embed once; both semantic checks share the same context
+        context_task = asyncio.ensure_future(
+            precomputed(context) if context is not None
+            else self.semantic_service.build_document_context(text, reference_topic, document)
         )
-        topic_issues = results[3] if not isinstance(results[3], Exception) else {
-            "has_issues": False,
-            "issues": [],
-            "off_topic_sentences": [],
-            "flow_disruptions": []
-        }
         
-        # LLM analysis - run only sentiment for speed
-        llm_analysis = None
-        try:
-            # Run only fast LLM analyses
-            sentiment_result = await self.llm_service.analyze_sentiment(text)
+        async def semantic_coherence():
+            context = await context_task
+            return await self.semantic_service.analyze_semantic_coherence(
+                text, reference_topic, context=context
+            )
+        
+        async def topic_consistency():
+            context = await context_task
+            return await self.semantic_service.detect_topic_consistency_issues(
+                text, reference_topic, context=context
+            )
+        
+        async def run_stage(stage: str, coroutines: list, fallbacks: list) -> list:
+            results = await asyncio.gather(*coroutines, return_exceptions=True)
             
-            # Simple writing style analysis without models
-            word_count = len(text.split())
-            sentence_count = len([s for s in text.split('.') if s.strip()])
-            avg_sentence_length = word_count / sentence_count if sentence_count > 0 else 0
+            # Overload is not an analysis failure: reject instead of returning a degraded result
+            for result in results:
+                if isinstance(result, EncoderOverloadedError):
+                    raise result
             
-            llm_analysis = {
-                "sentiment_analysis": sentiment_result,
-                "topic_classification": {
-                    "predicted_topic": "Genel",
-                    "confidence": 0.5,
-                    "all_scores": {"Genel": 1.0},
-                    "text": text[:100] + "..." if len(text) > 100 else text
-                },
-                "writing_style": {
-                    "style_type": "Basit" if avg_sentence_length < 10 else "Karmaşık",
-                    "formality": "Orta",
-                    "avg_sentence_length": round(avg_sentence_length, 1),
-                    "avg_word_length": round(sum(len(word) for word in text.split()) / word_count, 1) if word_count > 0 else 0,
-                    "sentence_count": sentence_count,
-                    "word_count": word_count,
-                    "character_count": len(text)
-                },
-                "text_length": len(text),
-                "analysis_timestamp": asyncio.get_event_loop().time()
-            }
-        except Exception as e:
-            print(f"LLM analysis failed: {e}")
-            llm_analysis = None
+            # Handle exceptions gracefully
+            results = [
+                fallback if isinstance(result, Exception) else result
+                for result, fallback in zip(results, fallbacks)
+            ]
+            
+            if on_stage is not None:
+                await on_stage(stage, self._stage_payload(stage, results))
+            return results
+        
+        # Run core analyses and sentiment concurrently (faster)
+        grammar, repetition, semantic, sentiment = await asyncio.gather(
+            run_stage(
+                "grammar",
+                [
+                    precomputed(grammar_errors) if grammar_errors is not None
+                    else self.grammar_service.analyze_grammar(text, document)
+                ],
+                [[]]
+            ),
+            run_stage("repetition", [self.repetition_service.analyze_repetitions(text, document)], [[]]),
+            run_stage(
+                "semantic",
+                [semantic_coherence(), topic_consistency()],
+                [
+                    SemanticScore(score=0.0, explanation="Anlamsal analiz hatası"),
+                    {
+                        "has_issues": False,
+                        "issues": [],
+                        "off_topic_sentences": [],
+                        "flow_disruptions": []
+                    }
+                ]
+            ),
+            # LLM analysis - run only sentiment for speed
+            run_stage("sentiment", [self.llm_service.analyze_sentiment(text)], [None])
+        )
+        
+        grammar_errors, = grammar
+        repetition_errors, = repetition
+        semantic_score, topic_issues = semantic
+        sentiment_result, = sentiment
+        
+        llm_analysis = None
+        if sentiment_result is None:
+            print("LLM analysis failed")
+        else:
+            llm_analysis = self.build_llm_analysis(text, sentiment_result, document)
         
         return grammar_errors, repetition_errors, semantic_score, topic_issues, llm_analysis
     
+    def _stage_payload(self, stage: str, results: list) -> Dict[str, Any]:
+        """Partial result of a finished stage, shaped like the matching AnalysisResult fields"""
+        if stage == "grammar":
+            return {"grammar_errors": results[0]}
+        if stage == "repetition":
+            return {"repetition_errors": results[0]}
+        if stage == "semantic":
+            return {
+                "semantic_score": results[0],
+                "topic_consistency": self._topic_consistency_result(results[1])
+            }
+        return {"sentiment_analysis": self._sentiment_analysis(results[0])}
+    
+    async def _replay_stages(self, response: AnalyzeResponse, on_stage: StageCallback) -> None:
+        """Report every stage of a cached response"""
+        result = response.result
+        await on_stage("grammar", {"grammar_errors": result.grammar_errors})
+        await on_stage("repetition", {"repetition_errors": result.repetition_errors})
+        await on_stage("semantic", {
+            "semantic_score": result.semantic_score,
+            "topic_consistency": result.topic_consistency
+        })
+        await on_stage("sentiment", {
+            "sentiment_analysis": result.llm_analysis.sentiment_analysis if result.llm_analysis else None
+        })
+    
+    def build_llm_analysis(
+        self,
+        text: str,
+        sentiment_result: Dict[str, Any],
+        document: Optional[TokenizedDocument] = None
+    ) -> Dict[str, Any]:
+        """
+        Combine sentiment with simple writing style statistics
+        
+        Args:
+            text: Analyzed text
+            sentiment_result: Result of LLMService.analyze_sentiment
+            document: Shared tokenization of text (built here if not given)
+            
+        Returns:
+            LLM analysis dictionary consumed by build_response
+        """
+        import asyncio
+        
+        document = document or TokenizedDocument(text)
+        
+        # Simple writing style analysis without models
+        word_count = document.word_count
+        sentence_count = document.sentence_count
+        avg_sentence_length = word_count / sentence_count if sentence_count > 0 else 0
+        
+        return {
+            "sentiment_analysis": sentiment_result,
+            "topic_classification": {
+                "predicted_topic": "Genel",
+                "confidence": 0.5,
+                "all_scores": {"Genel": 1.0},
+                "text": text[:100] + "..." if len(text) > 100 else text
+            },
+            "writing_style": {
+                "style_type": "Basit" if avg_sentence_length < 10 else "Karmaşık",
+                "formality": "Orta",
+                "avg_sentence_length": round(avg_sentence_length, 1),
+                "avg_word_length": round(document.avg_word_length, 1),
+                "sentence_count": sentence_count,
+                "word_count": word_count,
+                "character_count": len(text)
+            },
+            "text_length": len(text),
+            "analysis_timestamp": asyncio.get_event_loop().time()
+        }
+    
     async def _calculate_overall_score(
         self,
         text: str,
         grammar_errors: List[GrammarError],
         repetition_errors: List[RepetitionError],
-        semantic_score: SemanticScore
+        semantic_score: SemanticScore,
+        document: Optional[TokenizedDocument] = None
     ) -> float:
         """
         Calculate overall quality score
@@ -293,13 +616,14 @@ class AnalysisService:
             grammar_errors: Grammar errors found
             repetition_errors: Repetition errors found
             semantic_score: Semantic coherence score
+            document: Shared tokenization of text
             
         Returns:
             Overall score (0-100)
         """
         # Get individual scores
         grammar_score = await self.grammar_service.get_grammar_score(text, grammar_errors)
-        repetition_score = await self.repetition_service.get_repetition_score(text, repetition_errors)
+        repetition_score = await self.repetition_service.get_repetition_score(text, repetition_errors, document)
         semantic_score_value = semantic_score.score * 100  # Convert to 0-100 scale
         
         # Weighted average (can be adjusted based on importance)
@@ -5,33 +5,60 @@ Authentication service for user management
 import uuid
 import secrets
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
-from passlib.context import CryptContext
+from typing import Optional, Dict, Any, Tuple
 from jose import JWTError, jwt
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy import select
 
 from app.db.models import User
+from app.db.session import async_session_factory
 from app.core.config import settings
+from app.services.email_dispatcher import EmailDispatcher, SMTPTransport
 from app.services.email_service import EmailService
+from app.services.password_hasher import get_password_hasher
+from app.services.principal_cache import PrincipalCache
 
-pwd_context = CryptContext(schemes=["sha256_crypt"], deprecated="auto")
 email_service = EmailService()
+email_dispatcher = EmailDispatcher(
+    async_session_factory,
+    SMTPTransport(
+        settings.SMTP_SERVER,
+        settings.SMTP_PORT,
+        settings.FROM_EMAIL,
+        username=settings.SMTP_USERNAME,
+        password=settings.SMTP_PASSWORD,
+        use_tls=settings.SMTP_USE_TLS,
+        timeout=settings.SMTP_TIMEOUT_SECONDS,
+        idle_seconds=settings.SMTP_IDLE_SECONDS,
+        # Without configured credentials emails are printed instead of sent
+        dev_mode=(settings.SMTP_USERNAME == "your-email@gmail.com" or
+                  settings.SMTP_PASSWORD == "your-app-password")
+    ),
+    batch_size=settings.EMAIL_BATCH_SIZE,
+    poll_interval=settings.EMAIL_POLL_INTERVAL_SECONDS,
+    max_attempts=settings.EMAIL_MAX_ATTEMPTS,
+    retry_base_seconds=settings.EMAIL_RETRY_BASE_SECONDS,
+    retry_max_seconds=settings.EMAIL_RETRY_MAX_SECONDS
+)
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES
+)
 
 
 class AuthService:
     """Authentication service for user management"""
     
     @staticmethod
-    def verify_password(plain_password: str, hashed_password: str) -> bool:
-        """Verify a password against its hash"""
-        return pwd_context.verify(plain_password, hashed_password)
+    async def verify_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password against its hash; also returns a replacement hash if the work factor changed"""
+        return await get_password_hasher().verify(plain_password, hashed_password)
     
     @staticmethod
-    def get_password_hash(password: str) -> str:
+    async def get_password_hash(password: str) -> str:
         """Generate password hash"""
-        return pwd_context.hash(password)
+        return await get_password_hasher().hash(password)
     
     @staticmethod
     def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -65,7 +92,7 @@ class AuthService:
             # Create user
             user = User(
                 email=user_data["email"],
-                password_hash=AuthService.get_password_hash(user_data["password"]),
+                password_hash=await AuthService.get_password_hash(user_data["password"]),
                 first_name=user_data["first_name"],
                 last_name=user_data["last_name"],
                 email_verification_token=verification_token,
@@ -73,19 +100,16 @@ class AuthService:
             )
             
             db.add(user)
+            # Welcome email is queued in the same transaction and sent in the background
+            email_service.queue_welcome_email(
+                db,
+                user.email, 
+                user.first_name, 
+                verification_token
+            )
             await db.commit()
             await db.refresh(user)
-            
-            # Send welcome email (with error handling)
-            try:
-                email_service.send_welcome_email(
-                    user.email, 
-                    user.first_name, 
-                    verification_token
-                )
-            except Exception as e:
-                print(f"Email sending failed, but user created: {e}")
-                # Don't fail the registration if email fails
+            email_dispatcher.notify()
             
             return user
             
@@ -101,11 +125,14 @@ class AuthService:
         
         if not user:
             return None
-        if not AuthService.verify_password(password, user.password_hash):
+        verified, new_hash = await AuthService.verify_password(password, user.password_hash)
+        if not verified:
             return None
         if not user.is_active:
             return None
         
+        if new_hash is not None:
+            user.password_hash = new_hash
         # Update last login
         user.last_login = datetime.utcnow()
         await db.commit()
@@ -148,18 +175,14 @@ class AuthService:
         
         user.email_verification_token = verification_token
         user.email_verification_expires = verification_expires
+        email_service.queue_verification_email(
+            db,
+            user.email, 
+            user.first_name, 
+            verification_token
+        )
         await db.commit()
-        
-        # Send verification email (with error handling)
-        try:
-            email_service.send_verification_email(
-                user.email, 
-                user.first_name, 
-                verification_token
-            )
-        except Exception as e:
-            print(f"Verification email sending failed: {e}")
-            # Don't fail the operation if email fails
+        email_dispatcher.notify()
         
         return True
     
@@ -178,18 +201,14 @@ class AuthService:
         
         user.password_reset_token = reset_token
         user.password_reset_expires = reset_expires
+        email_service.queue_password_reset_email(
+            db,
+            user.email, 
+            user.first_name, 
+            reset_token
+        )
         await db.commit()
-        
-        # Send reset email (with error handling)
-        try:
-            email_service.send_password_reset_email(
-                user.email, 
-                user.first_name, 
-                reset_token
-            )
-        except Exception as e:
-            print(f"Password reset email sending failed: {e}")
-            # Don't fail the operation if email fails
+        email_dispatcher.notify()
         
         return True
     
@@ -207,9 +226,10 @@ class AuthService:
         if not user:
             return False
         
-        user.password_hash = AuthService.get_password_hash(new_password)
+        user.password_hash = await AuthService.get_password_hash(new_password)
         user.password_reset_token = None
         user.password_reset_expires = None
         await db.commit()
+        principal_cache.invalidate_user(user.id)
         
         return True
@@ -0,0 +1,305 @@
+"""
+Background delivery of queued emails over a reused SMTP session
+"""
+
+import asyncio
+import smtplib
+import threading
+import time
+from datetime import datetime, timedelta
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.db.repository import OutboundEmailRepository
+
+# (to_email, subject, html_content)
+EmailMessage = Tuple[str, str, str]
+# None when delivered, else (error, permanent)
+DeliveryOutcome = Optional[Tuple[str, bool]]
+
+
+class SMTPTransport:
+    """
+    One SMTP session kept open across messages and batches
+
+    The session is opened (EHLO, STARTTLS, login) on first use and reused
+    until it drops or sits idle longer than idle_seconds. A message that fails
+    because a reused session went away is retried once on a fresh session.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        from_email: str,
+        username: str = "",
+        password: str = "",
+        use_tls: bool = True,
+        timeout: float = 30.0,
+        idle_seconds: float = 60.0,
+        dev_mode: bool = False
+    ):
+        """
+        Initialize SMTP transport
+
+        Args:
+            host: SMTP server
+            port: SMTP port
+            from_email: Sender address
+            username: Login user; empty skips login
+            password: Login password
+            use_tls: Upgrade the session with STARTTLS
+            timeout: Socket timeout in seconds
+            idle_seconds: Idle sessions older than this are closed instead of reused
+            dev_mode: Print messages instead of sending them
+        """
+        self.host = host
+        self.port = port
+        self.from_email = from_email
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.idle_seconds = idle_seconds
+        self.dev_mode = dev_mode
+
+        self._server: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def send_many(self, messages: List[EmailMessage]) -> List[DeliveryOutcome]:
+        """
+        Send messages one after another over the shared session
+
+        Args:
+            messages: (to_email, subject, html_content) per message
+
+        Returns:
+            Outcome per message: None if delivered, else (error, permanent)
+        """
+        with self._lock:
+            return [self._send(to_email, subject, html_content) for to_email, subject, html_content in messages]
+
+    def close_if_idle(self) -> None:
+        with self._lock:
+            if self._server is not None and time.monotonic() - self._last_used > self.idle_seconds:
+                self._close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+    def _send(self, to_email: str, subject: str, html_content: str) -> DeliveryOutcome:
+        if self.dev_mode:
+            print(f"=== EMAIL SENT (DEV MODE) ===")
+            print(f"To: {to_email}")
+            print(f"Subject: {subject}")
+            print(f"From: {self.from_email}")
+            print(f"Content: {html_content[:200]}...")
+            print(f"==================")
+            return None
+
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = subject
+        msg['From'] = self.from_email
+        msg['To'] = to_email
+        msg.attach(MIMEText(html_content, 'html'))
+
+        for attempt in range(2):
+            reused = self._server is not None
+            try:
+                self._connection().send_message(msg)
+                self._last_used = time.monotonic()
+                return None
+            except smtplib.SMTPRecipientsRefused as e:
+                codes = [code for code, _ in e.recipients.values()]
+                return str(e), all(code >= 500 for code in codes)
+            except (smtplib.SMTPServerDisconnected, ConnectionError) as e:
+                self._close()
+                if reused and attempt == 0:
+                    continue
+                return str(e), False
+            except smtplib.SMTPResponseException as e:
+                if e.smtp_code in (421, 451):
+                    self._close()
+                return str(e), 500 <= e.smtp_code < 600 and e.smtp_code != 535
+            except Exception as e:
+                self._close()
+                return str(e), False
+        return "SMTP session lost", False
+
+    def _connection(self) -> smtplib.SMTP:
+        if self._server is not None and time.monotonic() - self._last_used > self.idle_seconds:
+            self._close()
+        if self._server is None:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            try:
+                server.ehlo()
+                if self.use_tls:
+                    server.starttls()
+                    server.ehlo()
+                if self.username:
+                    server.login(self.username, self.password)
+            except Exception:
+                server.close()
+                raise
+            self._server = server
+            self._last_used = time.monotonic()
+            self.connections_opened += 1
+        return self._server
+
+    def _close(self) -> None:
+        server, self._server = self._server, None
+        if server is None:
+            return
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+
+class EmailDispatcher:
+    """Delivers queued outbound_emails rows in batches on a background task"""
+
+    def __init__(
+        self,
+        session_factory,
+        transport: SMTPTransport,
+        batch_size: int = 20,
+        poll_interval: float = 10.0,
+        max_attempts: int = 5,
+        retry_base_seconds: float = 30.0,
+        retry_max_seconds: float = 3600.0,
+        lease_seconds: float = 300.0
+    ):
+        """
+        Initialize email dispatcher
+
+        Args:
+            session_factory: async_sessionmaker for the queue table
+            transport: SMTP session used for every batch
+            batch_size: Emails claimed and sent per round
+            poll_interval: Seconds between checks for retries and emails queued by other processes
+            max_attempts: Attempts before an email is marked failed
+            retry_base_seconds: Delay before the first retry, doubled after each failure
+            retry_max_seconds: Upper bound of the retry delay
+            lease_seconds: How long a claimed batch is reserved for this dispatcher
+        """
+        self.session_factory = session_factory
+        self.transport = transport
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.lease_seconds = lease_seconds
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.batches = 0
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.last_error: Optional[str] = None
+
+    def notify(self) -> None:
+        """Wake the dispatcher (after queuing emails), starting it on the running loop if needed"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._wake = asyncio.Event()
+            self._task = loop.create_task(self._work())
+        self._wake.set()
+
+    async def dispatch_due(self) -> int:
+        """
+        Claim one batch of due emails, send it and record the outcome
+
+        Returns:
+            Number of emails handled
+        """
+        async with self.session_factory() as session:
+            claimed = await OutboundEmailRepository(session).claim_due(self.batch_size, self.lease_seconds)
+        if not claimed:
+            return 0
+
+        outcomes = await asyncio.to_thread(
+            self.transport.send_many,
+            [(row.to_email, row.subject, row.html_content) for row in claimed]
+        )
+
+        now = datetime.utcnow()
+        sent_ids: List[str] = []
+        failures: Dict[str, Tuple[str, Optional[datetime]]] = {}
+        for row, outcome in zip(claimed, outcomes):
+            if outcome is None:
+                sent_ids.append(row.id)
+                continue
+            error, permanent = outcome
+            self.last_error = error
+            if permanent or row.attempts >= self.max_attempts:
+                failures[row.id] = (error, None)
+                self.failed += 1
+                print(f"⚠️ Email to {row.to_email} failed after {row.attempts} attempt(s): {error}")
+            else:
+                failures[row.id] = (error, now + timedelta(seconds=self._retry_delay(row.attempts)))
+                self.retried += 1
+
+        async with self.session_factory() as session:
+            await OutboundEmailRepository(session).record_results(sent_ids, failures)
+        self.batches += 1
+        self.sent += len(sent_ids)
+        return len(claimed)
+
+    async def drain(self) -> int:
+        """Send everything that is due right now (scripts and tests)"""
+        handled = 0
+        while True:
+            count = await self.dispatch_due()
+            if not count:
+                return handled
+            handled += count
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "batches": self.batches,
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "smtp_connections_opened": self.transport.connections_opened,
+            "last_error": self.last_error,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the background task and close the SMTP session (called on application shutdown)"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.transport.close()
+
+    def _retry_delay(self, attempts: int) -> float:
+        return min(self.retry_base_seconds * 2 ** (attempts - 1), self.retry_max_seconds)
+
+    async def _work(self) -> None:
+        wake = self._wake
+        while True:
+            wake.clear()
+            try:
+                handled = await self.dispatch_due()
+            except Exception as e:
+                print(f"⚠️ Email dispatch failed: {e}")
+                self.last_error = str(e)
+                handled = 0
+            if handled >= self.batch_size:
+                continue
+
+            await asyncio.to_thread(self.transport.close_if_idle)
+            try:
+                await asyncio.wait_for(wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,181 @@
+"""
+Persistent sentence embedding store backed by a memory-mapped array file
+"""
+
+import hashlib
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class SentenceEmbeddingStore:
+    """
+    Append-only store of sentence embeddings keyed by sentence hash and model name
+
+    Each model gets two files in the store directory:
+        <model>.<dim>.<dtype>.vec  raw vectors, one row each, memory-mapped for reads
+        <model>.<dim>.<dtype>.idx  16-byte sentence digests, one per row, same order
+
+    Vectors are written before their digests, so after a crash the index never
+    points past the end of the vector file. The store is meant for a single
+    writer process; every API worker should point at its own directory.
+    """
+
+    DIGEST_SIZE = 16
+
+    def __init__(self, directory: str, model_name: str, dim: int, dtype: str = "float32"):
+        """
+        Initialize embedding store
+
+        Args:
+            directory: Directory holding the store files
+            model_name: Sentence transformer model name, part of every key
+            dim: Embedding dimension of the model
+            dtype: Storage dtype, "float32" or "float16"
+        """
+        self.model_name = model_name
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+        self.row_bytes = self.dim * self.dtype.itemsize
+
+        os.makedirs(directory, exist_ok=True)
+        slug = re.sub(r"[^\w.-]", "_", model_name)
+        self.vectors_path = os.path.join(directory, f"{slug}.{dim}.{self.dtype.name}.vec")
+        self.index_path = os.path.join(directory, f"{slug}.{dim}.{self.dtype.name}.idx")
+
+        self._lock = threading.Lock()
+        self._rows: Dict[bytes, int] = {}
+        self._mmap: Optional[np.memmap] = None
+        self._mapped_rows = 0
+
+        self.hits = 0
+        self.misses = 0
+
+        self._load_index()
+
+    def digest(self, sentence: str) -> bytes:
+        """Hash a sentence together with the model name"""
+        return hashlib.blake2b(
+            sentence.encode("utf-8"),
+            digest_size=self.DIGEST_SIZE,
+            person=b"noteguard-emb",
+            key=self.model_name.encode("utf-8")[:64],
+        ).digest()
+
+    def lookup(self, sentences: List[str]) -> Tuple[Dict[int, np.ndarray], List[int]]:
+        """
+        Find stored embeddings for a list of sentences
+
+        Args:
+            sentences: Sentences to look up
+
+        Returns:
+            (found vectors by sentence position, positions that were not found)
+        """
+        found: Dict[int, np.ndarray] = {}
+        missing: List[int] = []
+
+        with self._lock:
+            for position, sentence in enumerate(sentences):
+                row = self._rows.get(self.digest(sentence))
+                if row is None:
+                    missing.append(position)
+                    continue
+                found[position] = self._read_row(row)
+
+            self.hits += len(found)
+            self.misses += len(missing)
+
+        return found, missing
+
+    def add(self, sentences: List[str], embeddings: np.ndarray) -> None:
+        """
+        Append new sentence embeddings
+
+        Args:
+            sentences: Sentences that were encoded
+            embeddings: Matching array of shape (len(sentences), dim)
+        """
+        embeddings = np.asarray(embeddings)
+        if embeddings.ndim != 2 or len(sentences) != len(embeddings):
+            return
+
+        if embeddings.shape[1] != self.dim:
+            print(f"⚠️ Embedding store dimension mismatch: {embeddings.shape[1]} != {self.dim}")
+            return
+
+        with self._lock:
+            digests: List[bytes] = []
+            seen = set()
+            rows: List[np.ndarray] = []
+            for sentence, vector in zip(sentences, embeddings):
+                key = self.digest(sentence)
+                if key in self._rows or key in seen:
+                    continue
+                seen.add(key)
+                digests.append(key)
+                rows.append(vector)
+
+            if not rows:
+                return
+
+            block = np.ascontiguousarray(np.stack(rows), dtype=self.dtype)
+            with open(self.vectors_path, "ab") as vectors_file:
+                # Drop a torn tail left by an interrupted write before appending
+                vectors_file.truncate(len(self._rows) * self.row_bytes)
+                vectors_file.write(block.tobytes())
+                vectors_file.flush()
+                os.fsync(vectors_file.fileno())
+            with open(self.index_path, "ab") as index_file:
+                index_file.write(b"".join(digests))
+                index_file.flush()
+
+            first_row = len(self._rows)
+            for offset, key in enumerate(digests):
+                self._rows[key] = first_row + offset
+
+    def stats(self) -> Dict[str, object]:
+        """Store size and hit/miss counters"""
+        with self._lock:
+            return {
+                "model_name": self.model_name,
+                "dtype": self.dtype.name,
+                "rows": len(self._rows),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def _load_index(self) -> None:
+        """Read the digest index and reconcile it with the vector file"""
+        if not os.path.exists(self.index_path):
+            return
+
+        with open(self.index_path, "rb") as index_file:
+            data = index_file.read()
+
+        vector_bytes = os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0
+        # Rows whose vector never reached the disk are ignored
+        row_count = min(len(data) // self.DIGEST_SIZE, vector_bytes // self.row_bytes)
+
+        if row_count * self.DIGEST_SIZE != len(data):
+            with open(self.index_path, "ab") as index_file:
+                index_file.truncate(row_count * self.DIGEST_SIZE)
+
+        for row in range(row_count):
+            start = row * self.DIGEST_SIZE
+            self._rows[data[start:start + self.DIGEST_SIZE]] = row
+
+    def _read_row(self, row: int) -> np.ndarray:
+        """Read one vector through the memory map; caller holds the lock"""
+        if self._mmap is None or row >= self._mapped_rows:
+            self._remap()
+        return np.asarray(self._mmap[row], dtype=np.float32)
+
+    def _remap(self) -> None:
+        """Map the vector file again after it has grown"""
+        row_count = os.path.getsize(self.vectors_path) // self.row_bytes
+        self._mmap = np.memmap(self.vectors_path, dtype=self.dtype, mode="r", shape=(row_count, self.dim))
+        self._mapped_rows = row_count
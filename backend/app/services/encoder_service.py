@@ -0,0 +1,321 @@
+"""
+Process-wide micro-batched sentence encoder
+"""
+
+import asyncio
+import threading
+from collections import Counter
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.inference_pool import ModelRef, get_inference_pool
+from app.services.micro_batcher import bucket_label
+
+
+class EncoderOverloadedError(RuntimeError):
+    """Raised when the encoder cannot accept more sentences in time"""
+
+
+class _EncodeRequest:
+    """Sentences of one caller and the rows filled in so far"""
+
+    __slots__ = ("sentences", "rows", "remaining", "future")
+
+    def __init__(self, sentences: List[str], future: asyncio.Future):
+        self.sentences = sentences
+        self.rows: List[Optional[np.ndarray]] = [None] * len(sentences)
+        self.remaining = len(sentences)
+        self.future = future
+
+
+class SentenceEncoderService:
+    """
+    Merges sentence lists of concurrent requests into shared encode calls
+
+    Pending sentences are deduplicated, sorted by estimated token length and
+    cut into batches limited both by sentence count and by padded tokens
+    (longest sentence x batch size), so short sentences are not padded to the
+    length of long ones. Each request gets back its own rows, in order.
+
+    Admission is bounded: when more than max_pending_sentences are queued or
+    being encoded, callers wait up to admission_timeout_ms for room and then
+    get EncoderOverloadedError instead of adding to an unbounded backlog.
+    """
+
+    def __init__(
+        self,
+        encode: Callable[[List[str]], Any],
+        max_batch_sentences: int = 64,
+        max_batch_tokens: int = 8192,
+        max_wait_ms: float = 5.0,
+        max_pending_sentences: int = 4096,
+        admission_timeout_ms: float = 1000.0,
+        max_seq_length: int = 128,
+        token_counter: Optional[Callable[[str], int]] = None,
+        executor: Optional[Executor] = None,
+        name: str = "encoder"
+    ):
+        """
+        Initialize encoder service
+
+        Args:
+            encode: Blocking function mapping a list of sentences to an (n, dim) array
+            max_batch_sentences: Maximum sentences per encode call
+            max_batch_tokens: Maximum padded tokens per encode call
+            max_wait_ms: How long the first pending request waits for others to join
+            max_pending_sentences: Sentences accepted (queued or encoding) at once
+            admission_timeout_ms: How long a caller waits for room before being rejected
+            max_seq_length: Model truncation length; caps token estimates
+            token_counter: Token estimate for a sentence (defaults to a character heuristic)
+            executor: Executor running encode (None uses the loop default)
+            name: Name used in stats
+        """
+        self.encode_fn = encode
+        self.max_batch_sentences = max_batch_sentences
+        self.max_batch_tokens = max_batch_tokens
+        self.max_wait = max_wait_ms / 1000
+        self.max_pending_sentences = max_pending_sentences
+        self.admission_timeout = admission_timeout_ms / 1000
+        self.max_seq_length = max_seq_length
+        self.token_counter = token_counter or self._estimate_tokens
+        self.executor = executor
+        self.name = name
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._capacity: Optional[asyncio.Condition] = None
+        self._queue: List[_EncodeRequest] = []
+        self._queued_sentences = 0
+        self._pending_sentences = 0
+
+        self.requests = 0
+        self.sentences = 0
+        self.encoded = 0
+        self.batches = 0
+        self.rejected = 0
+        self.batch_sizes: Counter = Counter()
+        self.batch_tokens: Counter = Counter()
+        self.queue_depths: Counter = Counter()
+
+    async def encode(self, sentences: List[str]) -> np.ndarray:
+        """
+        Encode sentences together with those of other pending requests
+
+        Args:
+            sentences: Sentences to encode
+
+        Returns:
+            Array of shape (len(sentences), dim)
+
+        Raises:
+            EncoderOverloadedError: If no room frees up within admission_timeout_ms
+        """
+        if not sentences:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        loop = asyncio.get_running_loop()
+        self._ensure_worker(loop)
+        await self._admit(len(sentences))
+
+        request = _EncodeRequest(list(sentences), loop.create_future())
+        self._queue.append(request)
+        self._queued_sentences += len(sentences)
+        self.requests += 1
+        self.sentences += len(sentences)
+        self._wakeup.set()
+
+        return await request.future
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch counters, admission state and histograms"""
+        return {
+            "name": self.name,
+            "requests": self.requests,
+            "sentences": self.sentences,
+            "encoded": self.encoded,
+            "batches": self.batches,
+            "rejected": self.rejected,
+            "pending_sentences": self._pending_sentences,
+            "max_pending_sentences": self.max_pending_sentences,
+            "batch_size_histogram": dict(self.batch_sizes),
+            "batch_tokens_histogram": dict(self.batch_tokens),
+            "queue_depth_histogram": dict(self.queue_depths),
+        }
+
+    def _estimate_tokens(self, sentence: str) -> int:
+        # Roughly one word piece per three characters, plus [CLS]/[SEP]
+        return len(sentence) // 3 + 2
+
+    def _ensure_worker(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Start the worker task on the running loop (once per loop)"""
+        if self._loop is loop and self._worker is not None and not self._worker.done():
+            return
+        self._loop = loop
+        self._wakeup = asyncio.Event()
+        self._capacity = asyncio.Condition()
+        self._queue = []
+        self._queued_sentences = 0
+        self._pending_sentences = 0
+        self._worker = loop.create_task(self._run())
+
+    async def _admit(self, count: int) -> None:
+        """Reserve room for count sentences or raise EncoderOverloadedError"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.admission_timeout
+
+        async with self._capacity:
+            # An oversized request is still accepted when nothing else is pending
+            while self._pending_sentences and self._pending_sentences + count > self.max_pending_sentences:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    self.rejected += 1
+                    raise EncoderOverloadedError(
+                        f"Sentence encoder is overloaded ({self._pending_sentences} sentences pending)"
+                    )
+                try:
+                    await asyncio.wait_for(self._capacity.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+            self._pending_sentences += count
+
+    async def _release(self, count: int) -> None:
+        async with self._capacity:
+            self._pending_sentences -= count
+            self._capacity.notify_all()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            await self._wakeup.wait()
+
+            # Give concurrent requests a moment to join the round
+            deadline = loop.time() + self.max_wait
+            while self._queued_sentences < self.max_batch_sentences:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            requests = self._queue
+            self._queue = []
+            self._queued_sentences = 0
+            self._wakeup.clear()
+
+            try:
+                await self._process(loop, requests)
+            finally:
+                await self._release(sum(len(request.sentences) for request in requests))
+
+    async def _process(self, loop: asyncio.AbstractEventLoop, requests: List[_EncodeRequest]) -> None:
+        """Encode all sentences of a round and hand the rows back"""
+        self.queue_depths[bucket_label(len(requests))] += 1
+
+        # Identical sentences from different requests are encoded once
+        slots: Dict[str, List[Tuple[_EncodeRequest, int]]] = {}
+        for request in requests:
+            if request.future.done():
+                continue
+            for index, sentence in enumerate(request.sentences):
+                slots.setdefault(sentence, []).append((request, index))
+
+        # Length bucketing: neighbours in a batch have similar lengths
+        unique = sorted(slots, key=self._token_count)
+
+        for batch, padded_tokens in self._plan_batches(unique):
+            self.batches += 1
+            self.encoded += len(batch)
+            self.batch_sizes[bucket_label(len(batch))] += 1
+            self.batch_tokens[bucket_label(padded_tokens)] += 1
+
+            try:
+                embeddings = np.asarray(await loop.run_in_executor(self.executor, self.encode_fn, batch))
+            except Exception as e:
+                for sentence in batch:
+                    for request, _ in slots[sentence]:
+                        if not request.future.done():
+                            request.future.set_exception(e)
+                continue
+
+            for sentence, vector in zip(batch, embeddings):
+                for request, index in slots[sentence]:
+                    if request.future.done():
+                        continue
+                    request.rows[index] = vector
+                    request.remaining -= 1
+                    if request.remaining == 0:
+                        request.future.set_result(np.stack(request.rows))
+
+    def _token_count(self, sentence: str) -> int:
+        return min(self.token_counter(sentence), self.max_seq_length)
+
+    def _plan_batches(self, sentences: List[str]) -> Iterator[Tuple[List[str], int]]:
+        """Cut length-sorted sentences into batches within the size and padded-token limits"""
+        batch: List[str] = []
+        longest = 0
+        for sentence in sentences:
+            tokens = self._token_count(sentence)
+            grown = max(longest, tokens)
+            if batch and (
+                len(batch) >= self.max_batch_sentences
+                or grown * (len(batch) + 1) > self.max_batch_tokens
+            ):
+                yield batch, longest * len(batch)
+                batch, grown = [], tokens
+            batch.append(sentence)
+            longest = grown
+        if batch:
+            yield batch, longest * len(batch)
+
+
+def load_sentence_transformer(model_name: str):
+    """Load a sentence transformer (used inside inference worker processes)"""
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+def encode_batch(model, batch: List[str]) -> np.ndarray:
+    """One forward pass over a planned batch"""
+    return model.encode(batch, batch_size=len(batch))
+
+
+_encoders: Dict[str, SentenceEncoderService] = {}
+_encoders_lock = threading.Lock()
+
+
+def get_encoder_service(model_name: str, model) -> SentenceEncoderService:
+    """
+    Return the process-wide encoder service for a model, creating it on first use
+
+    Args:
+        model_name: Sentence transformer model name
+        model: Loaded SentenceTransformer used by the service
+
+    Returns:
+        Shared SentenceEncoderService
+    """
+    with _encoders_lock:
+        encoder = _encoders.get(model_name)
+        if encoder is None:
+            pool = get_inference_pool("encoder")
+            encoder = SentenceEncoderService(
+                pool.bind(encode_batch, ModelRef(lambda: model, load_sentence_transformer, model_name)),
+                max_batch_sentences=settings.ENCODER_BATCH_MAX_SENTENCES,
+                max_batch_tokens=settings.ENCODER_BATCH_MAX_TOKENS,
+                max_wait_ms=settings.ENCODER_BATCH_MAX_WAIT_MS,
+                max_pending_sentences=settings.ENCODER_MAX_PENDING_SENTENCES,
+                admission_timeout_ms=settings.ENCODER_ADMISSION_TIMEOUT_MS,
+                max_seq_length=getattr(model, "max_seq_length", None) or 128,
+                executor=pool,
+                name=model_name
+            )
+            _encoders[model_name] = encoder
+        return encoder
@@ -2,8 +2,7 @@
 Grammar analysis logic
 """
 
-import re
-from typing import List
+from typing import List, Optional
 from app.models.responses import GrammarError
 from app.services.grammar_rules import GrammarRules
 
@@ -14,19 +13,20 @@ class GrammarAnalyzer:
     def __init__(self):
         self.rules = GrammarRules()
     
-    def detect_language(self, text: str) -> str:
+    def detect_language(self, text: str, lowered: Optional[str] = None) -> str:
         """
         Simple language detection based on character patterns
         
         Args:
             text: Text to analyze
+            lowered: text.lower(), if the caller already has it
             
         Returns:
             Language code ('tr' for Turkish, 'en' for English, default 'en')
         """
         # Simple heuristics for language detection
         turkish_chars = set('çğıöşüÇĞIÖŞÜ')
-        text_chars = set(text.lower())
+        text_chars = set(lowered if lowered is not None else text.lower())
         
         # If Turkish characters are present, likely Turkish
         if turkish_chars.intersection(text_chars):
@@ -35,48 +35,53 @@ class GrammarAnalyzer:
         # Default to English
         return 'en'
     
-    def analyze_with_rules(self, text: str, language: str) -> List[GrammarError]:
+    def analyze_with_rules(
+        self,
+        text: str,
+        language: str,
+        pos: int = 0,
+        endpos: Optional[int] = None
+    ) -> List[GrammarError]:
         """
         Improved rule-based analysis with context awareness
         
         Args:
             text: Text to analyze
             language: Language code
+            pos: Only scan from this index (used for partial re-analysis)
+            endpos: Only scan up to this index
             
         Returns:
             List of grammar errors
         """
-        rules = self.rules.get_rules(language)
+        matcher = self.rules.get_matcher(language)
         grammar_errors = []
         
-        for rule in rules:
-            # Use case-insensitive search
-            matches = re.finditer(rule['pattern'], text, re.IGNORECASE)
-            for match in matches:
-                if rule.get('ignore_at_start') and match.start() == 0:
-                    continue
+        for rule, match in matcher.find_matches(text, pos, endpos):
+            if rule.get('ignore_at_start') and match.start() == 0:
+                continue
 
-                # Apply context check if available
-                if 'context_check' in rule:
-                    try:
-                        if not rule['context_check'](text, match):
-                            continue
-                    except Exception as e:
-                        print(f"Context check failed for rule {rule['rule_id']}: {e}")
+            # Apply context check if available
+            if 'context_check' in rule:
+                try:
+                    if not rule['context_check'](text, match):
                         continue
-
-                # Additional filtering for better accuracy
-                if not self._is_valid_error(text, match, rule):
+                except Exception as e:
+                    print(f"Context check failed for rule {rule['rule_id']}: {e}")
                     continue
 
-                error = GrammarError(
-                    message=rule['message'],
-                    offset=match.start(),
-                    length=match.end() - match.start(),
-                    rule_id=rule['rule_id'],
-                    suggestion=rule.get('suggestion')
-                )
-                grammar_errors.append(error)
+            # Additional filtering for better accuracy
+            if not self._is_valid_error(text, match, rule):
+                continue
+
+            error = GrammarError(
+                message=rule['message'],
+                offset=match.start(),
+                length=match.end() - match.start(),
+                rule_id=rule['rule_id'],
+                suggestion=rule.get('suggestion')
+            )
+            grammar_errors.append(error)
         
         return grammar_errors
     
@@ -157,3 +162,13 @@ class GrammarAnalyzer:
                 return False
         
         return True
+
+
+def load_grammar_analyzer() -> GrammarAnalyzer:
+    """Build a rule analyzer (used inside rule-check worker processes)"""
+    return GrammarAnalyzer()
+
+
+def check_rules(analyzer: GrammarAnalyzer, text: str, language: str) -> List[GrammarError]:
+    """Rule-based analysis of one text"""
+    return analyzer.analyze_with_rules(text, language)
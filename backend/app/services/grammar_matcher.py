@@ -0,0 +1,96 @@
+"""
+Compiled matcher for grammar rules
+"""
+
+import re
+from collections import defaultdict
+from typing import Any, Dict, List, Match, Optional, Tuple
+
+
+# Rules of the form \b(word)\b are plain word lookups
+LITERAL_RULE_PATTERN = re.compile(r'\\b\((\w+)\)\\b')
+
+# re.IGNORECASE treats i, I, ı and İ as the same letter (and ſ as s); the
+# folded keys must put them in the same bucket
+_FOLD_TABLE = str.maketrans({'İ': 'i', 'I': 'i', 'ı': 'i', 'ſ': 's'})
+
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def fold_word(word: str) -> str:
+    """Case-fold a word the way re.IGNORECASE compares characters"""
+    return word.translate(_FOLD_TABLE).lower()
+
+
+class GrammarMatcher:
+    """
+    Grammar rules for one language, compiled once
+
+    Literal word rules go into a single dictionary and are matched during one
+    tokenization pass over the text. All other rules are precompiled regexes.
+    find_matches returns the same (rule, match) pairs, in the same order, as
+    running re.finditer(rule['pattern'], text, re.IGNORECASE) rule by rule.
+    """
+
+    def __init__(self, rules: List[Dict[str, Any]]):
+        """
+        Compile rules
+
+        Args:
+            rules: Rule dictionaries from GrammarRules
+        """
+        self.rules = rules
+        self.literal_rules: Dict[str, List[Tuple[int, re.Pattern]]] = defaultdict(list)
+        self.regex_rules: List[Tuple[int, re.Pattern]] = []
+
+        for index, rule in enumerate(rules):
+            compiled = re.compile(rule['pattern'], re.IGNORECASE)
+            literal = LITERAL_RULE_PATTERN.fullmatch(rule['pattern'])
+            if literal:
+                self.literal_rules[fold_word(literal.group(1))].append((index, compiled))
+            else:
+                self.regex_rules.append((index, compiled))
+
+    def find_matches(
+        self,
+        text: str,
+        pos: int = 0,
+        endpos: Optional[int] = None
+    ) -> List[Tuple[Dict[str, Any], Match]]:
+        """
+        Find all rule matches in text
+
+        Args:
+            text: Text to analyze
+            pos: Start scanning here; word boundaries still see the preceding character
+            endpos: Stop scanning here, as if the text ended at this index
+
+        Returns:
+            (rule, match) pairs ordered by rule, then by position
+        """
+        if endpos is None:
+            endpos = len(text)
+        matches_by_rule: Dict[int, List[Match]] = defaultdict(list)
+
+        if self.literal_rules:
+            for token in WORD_PATTERN.finditer(text, pos, endpos):
+                candidates = self.literal_rules.get(fold_word(token.group(0)))
+                if not candidates:
+                    continue
+                for index, compiled in candidates:
+                    # Confirm with the rule's own regex (in place, so word
+                    # boundaries see the real neighbours) so folding can never add a match
+                    confirmed = compiled.match(text, token.start(), endpos)
+                    if confirmed and confirmed.end() == token.end():
+                        matches_by_rule[index].append(token)
+
+        for index, compiled in self.regex_rules:
+            matches = list(compiled.finditer(text, pos, endpos))
+            if matches:
+                matches_by_rule[index] = matches
+
+        return [
+            (self.rules[index], match)
+            for index in sorted(matches_by_rule)
+            for match in matches_by_rule[index]
+        ]
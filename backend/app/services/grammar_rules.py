@@ -2,8 +2,10 @@
 Grammar rules for different languages
 """
 
+import hashlib
 import re
 from typing import Dict, List, Any, Callable
+from app.services.grammar_matcher import GrammarMatcher
 
 
 class GrammarRules:
@@ -14,11 +16,39 @@ class GrammarRules:
             'tr': self._get_turkish_rules(),
             'en': self._get_english_rules()
         }
+        # Compile every rule set once at startup
+        self.matchers = {
+            language: GrammarMatcher(rules)
+            for language, rules in self.rules.items()
+        }
     
     def get_rules(self, language: str) -> List[Dict[str, Any]]:
         """Get grammar rules for specific language"""
         return self.rules.get(language, self.rules['en'])
     
+    def get_matcher(self, language: str) -> GrammarMatcher:
+        """Get compiled matcher for specific language"""
+        return self.matchers.get(language, self.matchers['en'])
+    
+    def fingerprint(self) -> str:
+        """Stable hash of all rule definitions, used to invalidate cached results"""
+        digest = hashlib.sha256()
+        for language in sorted(self.rules):
+            digest.update(language.encode('utf-8'))
+            for rule in self.rules[language]:
+                for key in sorted(rule):
+                    digest.update(key.encode('utf-8'))
+                    digest.update(self._fingerprint_value(rule[key]).encode('utf-8'))
+        return digest.hexdigest()[:16]
+    
+    @staticmethod
+    def _fingerprint_value(value: Any) -> str:
+        """Represent a rule value so that callables hash by their code, not their id"""
+        code = getattr(value, '__code__', None)
+        if code is not None:
+            return code.co_code.hex() + repr(code.co_consts) + repr(code.co_names)
+        return repr(value)
+    
     def _get_turkish_rules(self) -> List[Dict[str, Any]]:
         """Get Turkish grammar rules - simplified to prevent false positives"""
         return [
@@ -4,16 +4,62 @@ Grammar analysis service using LLM-based checking with multi-language support
 
 import asyncio
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from app.models.responses import GrammarError
-from app.services.grammar_analyzer import GrammarAnalyzer
+from app.services.grammar_analyzer import GrammarAnalyzer, check_rules, load_grammar_analyzer
 from app.services.grammar_scorer import GrammarScorer
+from app.services.inference_pool import ModelRef, get_inference_pool
+from app.services.tokenized_document import TokenizedDocument
 
 # Hugging Face imports
 from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline
 import torch
 
 
+def load_causal_lm(model_name: str):
+    """Load tokenizer and model for generation (used inside inference worker processes)"""
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForCausalLM.from_pretrained(
+        model_name,
+        torch_dtype=torch.float32,  # Use float32 for CPU compatibility
+        device_map="cpu"  # Force CPU usage
+    )
+    return tokenizer, model
+
+
+def generate_completion(tokenizer_and_model, prompt: str, max_new_tokens: int = 200):
+    """
+    Generate a continuation of the prompt
+    
+    Args:
+        tokenizer_and_model: (tokenizer, model) pair, or None if loading failed
+        prompt: Full prompt
+        max_new_tokens: Tokens to generate after the prompt
+        
+    Returns:
+        Decoded prompt + continuation, or None without a model
+    """
+    if tokenizer_and_model is None:
+        return None
+    tokenizer, model = tokenizer_and_model
+    
+    # Tokenize input
+    inputs = tokenizer.encode(prompt, return_tensors="pt", truncation=True, max_length=512)
+    
+    # Generate response
+    with torch.no_grad():
+        outputs = model.generate(
+            inputs,
+            max_length=inputs.shape[1] + max_new_tokens,
+            temperature=0.1,
+            do_sample=True,
+            pad_token_id=tokenizer.eos_token_id
+        )
+    
+    # Decode response
+    return tokenizer.decode(outputs[0], skip_special_tokens=True)
+
+
 class GrammarService:
     """Service for grammar and spelling analysis using LLM with multi-language support"""
     
@@ -27,6 +73,7 @@ class GrammarService:
         self.hf_models = {}
         self.tokenizers = {}
         self._initialize_hf_models()
+        self.generation_pool = get_inference_pool("generation")
         
         # LLM prompt templates
         self.llm_prompt_templates = {
@@ -38,22 +85,25 @@ class GrammarService:
         """Detect language of the text"""
         return self.analyzer.detect_language(text)
     
-    async def analyze_grammar(self, text: str) -> List[GrammarError]:
+    async def analyze_grammar(self, text: str, document: Optional[TokenizedDocument] = None) -> List[GrammarError]:
         """
         Analyze text for grammar and spelling errors using LLM with fallback to rules
         
         Args:
             text: Text to analyze
+            document: Shared tokenization of text (built here if not given)
             
         Returns:
             List of grammar errors found
         """
+        document = document or TokenizedDocument(text)
+        
         # Detect language
-        language = self._detect_language(text)
+        language = self.analyzer.detect_language(text, document.lower)
         
         # Use LLM-based analysis if enabled
         if self.use_llm:
-            return await self._analyze_with_llm(text, language)
+            return await self._analyze_with_llm(text, language, document)
         else:
             # Fallback to rule-based analysis
             errors = await self._analyze_with_rules(text, language)
@@ -63,6 +113,60 @@ class GrammarService:
             
             return filtered_errors
     
+    async def analyze_grammar_many(
+        self,
+        texts: List[str],
+        documents: Optional[List[TokenizedDocument]] = None
+    ) -> List[List[GrammarError]]:
+        """
+        Analyze many texts, running the rule checks in parallel on the rules pool
+        
+        Args:
+            texts: Texts to analyze
+            documents: Shared tokenization of each text
+            
+        Returns:
+            Grammar errors per text, in order
+        """
+        documents = documents or [TokenizedDocument(text) for text in texts]
+        
+        if self.use_llm:
+            return list(await asyncio.gather(*(
+                self.analyze_grammar(text, document) for text, document in zip(texts, documents)
+            )))
+        
+        pool = get_inference_pool("rules")
+        analyzer = ModelRef(lambda: self.analyzer, load_grammar_analyzer)
+        languages = [self.analyzer.detect_language(text, document.lower) for text, document in zip(texts, documents)]
+        
+        results = await asyncio.gather(*(
+            pool.run(check_rules, analyzer, text, language) for text, language in zip(texts, languages)
+        ))
+        return [self._filter_errors(errors, text) for errors, text in zip(results, texts)]
+    
+    async def analyze_grammar_range(self, text: str, language: str, pos: int, endpos: int) -> List[GrammarError]:
+        """
+        Rule-based analysis of one region of the text
+        
+        Args:
+            text: Full text (context checks look at the whole text)
+            language: Language code
+            pos: Region start
+            endpos: Region end
+            
+        Returns:
+            Filtered grammar errors starting inside the scanned region
+        """
+        errors = self.analyzer.analyze_with_rules(text, language, pos, endpos)
+        return self._filter_errors(errors, text)
+    
+    def get_rule_order(self, language: str) -> Dict[tuple, int]:
+        """Map (rule_id, message) to rule position, the order errors are reported in"""
+        order = {}
+        for index, rule in enumerate(self.analyzer.rules.get_rules(language)):
+            order.setdefault((rule['rule_id'], rule['message']), index)
+        return order
+    
     async def get_grammar_score(self, text: str, errors: List[GrammarError]) -> float:
         """Calculate grammar score based on errors"""
         return self.scorer.calculate_score(text, errors)
@@ -157,12 +261,7 @@ class GrammarService:
             model_name = self.model_configs[language]['name']
             
             # Load tokenizer and model
-            tokenizer = AutoTokenizer.from_pretrained(model_name)
-            model = AutoModelForCausalLM.from_pretrained(
-                model_name,
-                torch_dtype=torch.float32,  # Use float32 for CPU compatibility
-                device_map="cpu"  # Force CPU usage
-            )
+            tokenizer, model = load_causal_lm(model_name)
             
             # Store loaded models
             self.tokenizers[language] = tokenizer
@@ -176,6 +275,14 @@ class GrammarService:
             print(f"Error loading {language} model: {e}")
             return None
 
+    def _get_hf_model_pair(self, language: str):
+        """(tokenizer, model) for a language, loaded on first use; None if unavailable"""
+        model = self._load_hf_model(language)
+        tokenizer = self.tokenizers.get(language)
+        if not model or not tokenizer:
+            return None
+        return tokenizer, model
+
     def _get_turkish_grammar_prompt(self) -> str:
         """Get Turkish grammar analysis prompt for LLM"""
         return """
@@ -240,13 +347,19 @@ Output format (JSON):
 Respond only in JSON format, no additional explanations.
 """
 
-    async def _analyze_with_llm(self, text: str, language: str) -> List[GrammarError]:
+    async def _analyze_with_llm(
+        self,
+        text: str,
+        language: str,
+        document: Optional[TokenizedDocument] = None
+    ) -> List[GrammarError]:
         """
         Analyze text using LLM for grammar errors
         
         Args:
             text: Text to analyze
             language: Language code ('tr' or 'en')
+            document: Shared tokenization of text
             
         Returns:
             List of grammar errors
@@ -261,7 +374,7 @@ Respond only in JSON format, no additional explanations.
                 return self._parse_llm_response(llm_response)
             
             # Fallback to mock LLM for demonstration
-            mock_response = await self._get_mock_llm_response(text, language)
+            mock_response = await self._get_mock_llm_response(text, language, document)
             return self._parse_llm_response(mock_response)
             
         except Exception as e:
@@ -282,35 +395,22 @@ Respond only in JSON format, no additional explanations.
             LLM response or None if not available
         """
         try:
-            # Load the appropriate model
-            model = self._load_hf_model(language)
-            if not model:
+            if language not in self.model_configs:
                 print(f"Could not load {language} model")
                 return None
-                
-            tokenizer = self.tokenizers.get(language)
-            if not tokenizer:
-                print(f"Could not load {language} tokenizer")
-                return None
             
             # Create the full prompt
             full_prompt = f"{prompt_template}\n\nText to analyze: {text}\n\nAnalysis:"
             
-            # Tokenize input
-            inputs = tokenizer.encode(full_prompt, return_tensors="pt", truncation=True, max_length=512)
-            
-            # Generate response
-            with torch.no_grad():
-                outputs = model.generate(
-                    inputs,
-                    max_length=inputs.shape[1] + 200,  # Generate up to 200 more tokens
-                    temperature=0.1,
-                    do_sample=True,
-                    pad_token_id=tokenizer.eos_token_id
-                )
-            
-            # Decode response
-            response_text = tokenizer.decode(outputs[0], skip_special_tokens=True)
+            # Loading and generation run on the generation pool, off the event loop
+            generation_model = ModelRef(
+                lambda: self._get_hf_model_pair(language),
+                load_causal_lm, self.model_configs[language]['name']
+            )
+            response_text = await self.generation_pool.run(generate_completion, generation_model, full_prompt)
+            if response_text is None:
+                print(f"Could not load {language} model")
+                return None
             
             # Extract the generated part (after the prompt)
             generated_part = response_text[len(full_prompt):].strip()
@@ -457,7 +557,12 @@ Respond only in JSON format, no additional explanations.
         
         return errors
 
-    async def _get_mock_llm_response(self, text: str, language: str) -> Dict[str, Any]:
+    async def _get_mock_llm_response(
+        self,
+        text: str,
+        language: str,
+        document: Optional[TokenizedDocument] = None
+    ) -> Dict[str, Any]:
         """
         Mock LLM response for demonstration
         In production, this would be replaced with actual LLM API calls
@@ -498,14 +603,15 @@ Respond only in JSON format, no additional explanations.
                     })
             
             # Check for de/da usage
-            words = text.split()
-            for i, word in enumerate(words):
+            spans = (document or TokenizedDocument(text)).word_spans
+            for i in range(0, len(spans), 2):
+                start_pos, end_pos = spans[i], spans[i + 1]
+                word = text[start_pos:end_pos]
                 if word.endswith('de') and len(word) > 2:
                     # This is a simplified check - LLM would be more sophisticated
-                    start_pos = sum(len(w) + 1 for w in words[:i])
                     errors.append({
                         "message": "'de' bağlacı ayrı yazılmalı",
-                        "offset": start_pos + len(word) - 2,
+                        "offset": end_pos - 2,
                         "length": 2,
                         "rule_id": "TURKISH_DE_DA",
                         "suggestion": " de"
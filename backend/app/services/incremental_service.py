@@ -0,0 +1,327 @@
+"""
+Incremental re-analysis of edited drafts
+"""
+
+import bisect
+import itertools
+import time
+from collections import OrderedDict
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.models.responses import AnalyzeResponse, GrammarError, RepetitionError, SemanticScore
+from app.services.analysis_service import AnalysisService
+from app.services.encoder_service import EncoderOverloadedError
+from app.services.semantic_service import DocumentContext
+from app.services.tokenized_document import Span, split_sentence_spans
+
+
+class DocumentState:
+    """Per-sentence analysis state of one stored analysis"""
+
+    def __init__(self, text: str, language: str, reference_topic: Optional[str]):
+        self.text = text
+        self.language = language
+        self.reference_topic = reference_topic
+        self.spans: List[Span] = []
+        # Stable sentence ids; unchanged sentences keep their id across edits
+        self.span_ids: List[int] = []
+        self.tokens: Dict[int, List[str]] = {}
+        self.grammar_errors: List[GrammarError] = []
+        # Normalized embeddings of semantic sentences
+        self.vectors: Dict[int, np.ndarray] = {}
+        self.topic_normalized: Optional[np.ndarray] = None
+        self.sentiment_text: Optional[str] = None
+        self.sentiment_result: Optional[dict] = None
+
+
+class IncrementalAnalysisService:
+    """Re-analyzes an edited draft by only processing the sentences that changed"""
+
+    def __init__(self, analysis_service: AnalysisService, max_states: int = 128):
+        """
+        Initialize incremental analysis service
+
+        Args:
+            analysis_service: Service whose sub-services and response builder are reused
+            max_states: Number of document states kept in memory (LRU)
+        """
+        self.analysis_service = analysis_service
+        self.grammar_service = analysis_service.grammar_service
+        self.repetition_service = analysis_service.repetition_service
+        self.semantic_service = analysis_service.semantic_service
+        self.llm_service = analysis_service.llm_service
+        self.max_states = max_states
+        self._states: "OrderedDict[str, DocumentState]" = OrderedDict()
+        self._sentence_ids = itertools.count()
+
+    def remember(self, analysis_id, state: DocumentState) -> None:
+        """Keep the state of a stored analysis for the next incremental request"""
+        key = str(analysis_id)
+        self._states[key] = state
+        self._states.move_to_end(key)
+        while len(self._states) > self.max_states:
+            self._states.popitem(last=False)
+
+    async def analyze_incremental(
+        self,
+        previous_analysis,
+        text: str,
+        reference_topic: Optional[str] = None
+    ) -> Tuple[AnalyzeResponse, Optional[DocumentState]]:
+        """
+        Analyze an edited version of a stored analysis
+
+        Args:
+            previous_analysis: Analysis row from AnalysisRepository
+            text: New text
+            reference_topic: Optional reference topic
+
+        Returns:
+            (analysis response, state to remember under the new analysis id).
+            Falls back to a full analysis (and no state) if anything goes wrong.
+        """
+        start_time = time.time()
+
+        try:
+            previous = self._states.get(str(previous_analysis.id))
+            if previous is None:
+                stored_errors = [GrammarError(**error) for error in previous_analysis.grammar_errors or []]
+                previous = await self._build_state(
+                    previous_analysis.full_text, previous_analysis.reference_topic, stored_errors
+                )
+
+            state = await self._apply_edit(previous, text, reference_topic)
+
+            response = await self.analysis_service.build_response(
+                text,
+                reference_topic,
+                state.grammar_errors,
+                self._repetition_errors(state),
+                self._semantic_score(state),
+                await self._topic_issues(state),
+                self.analysis_service.build_llm_analysis(text, state.sentiment_result),
+                start_time
+            )
+            return response, state
+        except EncoderOverloadedError:
+            raise
+        except Exception as e:
+            print(f"Incremental analysis failed, running full analysis: {e}")
+            return await self.analysis_service.analyze_text(text, reference_topic), None
+
+    async def _build_state(
+        self,
+        text: str,
+        reference_topic: Optional[str],
+        grammar_errors: Optional[List[GrammarError]] = None
+    ) -> DocumentState:
+        """Build the state of a text from scratch (used when no state is cached)"""
+        state = DocumentState(text, self.grammar_service._detect_language(text), reference_topic)
+        state.spans = split_sentence_spans(text)
+        state.span_ids = [next(self._sentence_ids) for _ in state.spans]
+
+        for sid, (start, _, end) in zip(state.span_ids, state.spans):
+            state.tokens[sid] = self.repetition_service._tokenize_text(text[start:end])
+
+        if grammar_errors is None:
+            grammar_errors = await self.grammar_service.analyze_grammar(text)
+        state.grammar_errors = grammar_errors
+
+        if self.semantic_service.model is not None:
+            semantic = self._semantic_sentences(state, range(len(state.spans)))
+            await self._add_vectors(state, semantic)
+            if reference_topic:
+                state.topic_normalized = await self._encode_normalized([reference_topic])
+
+        return state
+
+    async def _apply_edit(self, old: DocumentState, text: str, reference_topic: Optional[str]) -> DocumentState:
+        """Derive the state of the new text from the state of the old one"""
+        state = DocumentState(text, self.grammar_service._detect_language(text), reference_topic)
+        state.spans = split_sentence_spans(text)
+
+        old_sentences = [old.text[start:end] for start, _, end in old.spans]
+        new_sentences = [text[start:end] for start, _, end in state.spans]
+        opcodes = SequenceMatcher(None, old_sentences, new_sentences, autojunk=False).get_opcodes()
+
+        # Unchanged sentences keep their id, tokens and embedding
+        span_map: Dict[int, int] = {}
+        state.span_ids = [0] * len(state.spans)
+        for tag, i1, i2, j1, j2 in opcodes:
+            if tag == 'equal':
+                for k in range(i2 - i1):
+                    span_map[j1 + k] = i1 + k
+                    state.span_ids[j1 + k] = old.span_ids[i1 + k]
+            else:
+                for j in range(j1, j2):
+                    state.span_ids[j] = next(self._sentence_ids)
+
+        changed = [opcode for opcode in opcodes if opcode[0] != 'equal']
+        live_ids = set(state.span_ids)
+        removed_ids = [
+            old.span_ids[i]
+            for _, i1, i2, _, _ in changed
+            for i in range(i1, i2)
+            if old.span_ids[i] not in live_ids
+        ]
+
+        for j, sid in enumerate(state.span_ids):
+            if j in span_map:
+                state.tokens[sid] = old.tokens[sid]
+            else:
+                start, _, end = state.spans[j]
+                state.tokens[sid] = self.repetition_service._tokenize_text(text[start:end])
+
+        await self._update_grammar(old, state, changed, span_map)
+        await self._update_vectors(old, state, changed, span_map, removed_ids)
+
+        # Sentiment only looks at the first 200 characters
+        if old.sentiment_result is not None and old.sentiment_text == text[:200]:
+            state.sentiment_text = old.sentiment_text
+            state.sentiment_result = old.sentiment_result
+        else:
+            state.sentiment_text = text[:200]
+            state.sentiment_result = await self.llm_service.analyze_sentiment(text)
+
+        return state
+
+    def _repetition_errors(self, state: DocumentState) -> List[RepetitionError]:
+        """Repetitions over the cached per-sentence tokens (the suffix-array search is near-linear)"""
+        words = [word for sid in state.span_ids for word in state.tokens[sid]]
+        return self.repetition_service.find_repetitions(words)
+
+    async def _update_grammar(self, old: DocumentState, state: DocumentState, changed, span_map: Dict[int, int]) -> None:
+        """Shift errors of unchanged sentences and re-run the rules around changed ones"""
+        text = state.text
+
+        if self.grammar_service.use_llm or state.language != old.language:
+            state.grammar_errors = await self.grammar_service.analyze_grammar(text)
+            return
+
+        # Neighbouring sentences are re-checked too: rules look across the boundary
+        dirty: Set[int] = set()
+        for _, _, _, j1, j2 in changed:
+            dirty.update(range(max(0, j1 - 1), min(len(state.spans), j2 + 1)))
+
+        old_starts = [start for start, _, _ in old.spans]
+        old_errors_by_span: Dict[int, List[GrammarError]] = {}
+        for error in old.grammar_errors:
+            i = bisect.bisect_right(old_starts, error.offset) - 1
+            old_errors_by_span.setdefault(i, []).append(error)
+
+        errors: List[GrammarError] = []
+        for j, (start, _, _) in enumerate(state.spans):
+            if j in dirty:
+                continue
+            i = span_map[j]
+            shift = start - old.spans[i][0]
+            for error in old_errors_by_span.get(i, []):
+                errors.append(error if shift == 0 else error.model_copy(update={'offset': error.offset + shift}))
+
+        for first, last in self._runs(sorted(dirty)):
+            pos = state.spans[first][0]
+            stop = state.spans[last][2]
+            # One sentence of lookahead so matches crossing the run end are complete
+            endpos = state.spans[last + 1][2] if last + 1 < len(state.spans) else len(text)
+            fresh = await self.grammar_service.analyze_grammar_range(text, state.language, pos, endpos)
+            errors.extend(error for error in fresh if error.offset < stop)
+
+        # Same order as a full run: by rule, then by position
+        rule_order = self.grammar_service.get_rule_order(state.language)
+        errors.sort(key=lambda error: (rule_order.get((error.rule_id, error.message), len(rule_order)), error.offset))
+        state.grammar_errors = errors
+
+    @staticmethod
+    def _runs(indexes: List[int]) -> List[Tuple[int, int]]:
+        """Group sorted indexes into (first, last) runs of consecutive values"""
+        runs = []
+        for index in indexes:
+            if runs and runs[-1][1] == index - 1:
+                runs[-1] = (runs[-1][0], index)
+            else:
+                runs.append((index, index))
+        return runs
+
+    def _semantic_sentences(self, state: DocumentState, span_indexes) -> List[Tuple[int, str]]:
+        """(sentence id, sentence) for spans SemanticService would keep"""
+        sentences = []
+        for j in span_indexes:
+            start, segment_end, _ = state.spans[j]
+            sentence = state.text[start:segment_end].strip()
+            if sentence and len(sentence) > 10:
+                sentences.append((state.span_ids[j], sentence))
+        return sentences
+
+    async def _encode_normalized(self, sentences: List[str]) -> np.ndarray:
+        """Encode sentences (through the embedding store) and L2-normalize them"""
+        embeddings = await self.semantic_service._get_sentence_embeddings(sentences)
+        return self.semantic_service.similarity_engine.normalize(embeddings)
+
+    async def _add_vectors(self, state: DocumentState, semantic: List[Tuple[int, str]]) -> None:
+        """Encode new semantic sentences and store their embeddings"""
+        if not semantic:
+            return
+
+        normalized = await self._encode_normalized([sentence for _, sentence in semantic])
+        for (sid, _), vector in zip(semantic, normalized):
+            state.vectors[sid] = vector
+
+    async def _update_vectors(self, old: DocumentState, state: DocumentState, changed, span_map, removed_ids) -> None:
+        """Drop embeddings of removed sentences, encode only the new ones"""
+        if self.semantic_service.model is None:
+            return
+
+        state.vectors = dict(old.vectors)
+        for sid in removed_ids:
+            state.vectors.pop(sid, None)
+
+        new_spans = [j for _, _, _, j1, j2 in changed for j in range(j1, j2)]
+        await self._add_vectors(state, self._semantic_sentences(state, new_spans))
+
+        if old.reference_topic == state.reference_topic and old.topic_normalized is not None:
+            state.topic_normalized = old.topic_normalized
+        elif state.reference_topic:
+            state.topic_normalized = await self._encode_normalized([state.reference_topic])
+
+    def _semantic_score(self, state: DocumentState) -> SemanticScore:
+        """Coherence from the stored embeddings: mean pairwise similarity in O(n * dim)"""
+        semantic = self._semantic_sentences(state, range(len(state.spans)))
+        count = len(semantic)
+
+        if count < 2:
+            return SemanticScore(
+                score=1.0,
+                explanation="Tek cümle olduğu için anlamsal analiz yapılamadı."
+            )
+
+        if self.semantic_service.model is None:
+            score = self.semantic_service._simple_coherence_analysis([sentence for _, sentence in semantic])
+        else:
+            # sum over i < j of x_i . x_j == (|sum x|^2 - sum |x|^2) / 2, summed fresh on
+            # every request so rounding errors do not build up over chained edits
+            vectors = np.stack([state.vectors[sid] for sid, _ in semantic]).astype(np.float64)
+            vector_sum = vectors.sum(axis=0)
+            pair_sum = (float(vector_sum @ vector_sum) - float(np.einsum('ij,ij->', vectors, vectors))) / 2
+            score = self.semantic_service._calculate_coherence_score(pair_sum / (count * (count - 1) / 2))
+
+        return SemanticScore(
+            score=score,
+            explanation=self.semantic_service._generate_explanation(score, count)
+        )
+
+    async def _topic_issues(self, state: DocumentState) -> dict:
+        """Topic consistency from stored embeddings, without encoding anything"""
+        semantic = self._semantic_sentences(state, range(len(state.spans)))
+        context = DocumentContext(state.text, [sentence for _, sentence in semantic], state.reference_topic)
+
+        if self.semantic_service.model is not None and len(semantic) >= 2:
+            context.normalized = np.stack([state.vectors[sid] for sid, _ in semantic])
+            context.embeddings = context.normalized
+            context.topic_normalized = state.topic_normalized
+
+        return await self.semantic_service.detect_topic_consistency_issues(
+            state.text, state.reference_topic, context=context
+        )
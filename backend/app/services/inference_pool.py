@@ -0,0 +1,211 @@
+"""
+Dedicated executors for model inference, one pool per model family
+"""
+
+import asyncio
+import functools
+import multiprocessing
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Tuple
+
+from app.core.config import settings
+
+FAMILIES = ("encoder", "sentiment", "zero_shot", "generation", "rules")
+
+# Models loaded inside a worker process, keyed by loader and its arguments
+_worker_models: Dict[Tuple, Any] = {}
+_worker_models_lock = threading.Lock()
+
+
+def _pin_torch_threads(torch_threads: int) -> None:
+    """Limit torch intra-op parallelism of the calling process (the setting is process-wide)"""
+    if torch_threads <= 0:
+        return
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except Exception as e:
+        print(f"⚠️ Could not pin torch threads: {e}")
+
+
+def _call_local(get_model: Callable[[], Any], fn: Callable, *args):
+    return fn(get_model(), *args)
+
+
+def _call_in_worker(loader: Callable, loader_args: Tuple, fn: Callable, *args):
+    """Run fn with this worker process's copy of the model, loading it on first use"""
+    key = (loader.__module__, loader.__qualname__, loader_args)
+    with _worker_models_lock:
+        model = _worker_models.get(key)
+        if model is None:
+            model = loader(*loader_args)
+            _worker_models[key] = model
+    return fn(model, *args)
+
+
+class ModelRef:
+    """
+    How an inference call reaches its model
+
+    In thread mode get_local returns the model already loaded in this process.
+    In process mode loader(*loader_args) is called once in each worker, so
+    loader and its arguments must be picklable (module-level function, plain values).
+    """
+
+    def __init__(self, get_local: Callable[[], Any], loader: Callable[..., Any], *loader_args):
+        self.get_local = get_local
+        self.loader = loader
+        self.loader_args = loader_args
+
+
+class InferencePool(Executor):
+    """Executor for one model family with its own workers and torch thread budget"""
+
+    def __init__(self, family: str, max_workers: int = 1, torch_threads: int = 0, use_processes: bool = False):
+        """
+        Initialize inference pool
+
+        Args:
+            family: Model family name ("encoder", "sentiment", ...)
+            max_workers: Number of worker threads or processes
+            torch_threads: torch intra-op threads per worker process (0 keeps the torch default).
+                Ignored in thread mode: torch.set_num_threads affects the whole process,
+                so thread pools share the value set by configure_torch_threads().
+            use_processes: Run calls in worker processes instead of threads
+        """
+        self.family = family
+        self.max_workers = max_workers
+        self.torch_threads = torch_threads if use_processes else 0
+        self.use_processes = use_processes
+
+        if use_processes:
+            # spawn: forking a process that already runs torch threads can deadlock
+            self._executor: Executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_pin_torch_threads,
+                initargs=(torch_threads,)
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix=f"inference-{family}"
+            )
+
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.active = 0
+        self.failed = 0
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        future = self._executor.submit(fn, *args, **kwargs)
+        with self._lock:
+            self.submitted += 1
+            self.active += 1
+        future.add_done_callback(self._on_done)
+        return future
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    def bind(self, fn: Callable, model: ModelRef) -> Callable:
+        """
+        Turn fn(model, *args) into a callable of *args that can be submitted to this pool
+
+        Args:
+            fn: Module-level function taking the model as its first argument
+            model: Where the model comes from
+
+        Returns:
+            Callable suitable for submit() / run_in_executor()
+        """
+        if self.use_processes:
+            return functools.partial(_call_in_worker, model.loader, model.loader_args, fn)
+        return functools.partial(_call_local, model.get_local, fn)
+
+    async def run(self, fn: Callable, model: ModelRef, *args) -> Any:
+        """
+        Run fn(model, *args) on this pool without blocking the event loop
+
+        Args:
+            fn: Module-level function taking the model as its first argument
+            model: Where the model comes from
+            *args: Further arguments for fn
+
+        Returns:
+            Return value of fn
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self, self.bind(fn, model), *args)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": "process" if self.use_processes else "thread",
+                "max_workers": self.max_workers,
+                "torch_threads": self.torch_threads,
+                "submitted": self.submitted,
+                "active": self.active,
+                "failed": self.failed,
+            }
+
+    def _on_done(self, future: Future) -> None:
+        with self._lock:
+            self.active -= 1
+            if not future.cancelled() and future.exception() is not None:
+                self.failed += 1
+
+
+_pools: Dict[str, InferencePool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_inference_pool(family: str) -> InferencePool:
+    """
+    Return the process-wide pool of a model family, creating it from settings on first use
+
+    Args:
+        family: One of FAMILIES
+
+    Returns:
+        Shared InferencePool
+    """
+    if family not in FAMILIES:
+        raise ValueError(f"Unknown inference family: {family}")
+
+    with _pools_lock:
+        pool = _pools.get(family)
+        if pool is None:
+            prefix = f"INFERENCE_{family.upper()}"
+            # A family may override the global mode (rule checks only scale in processes)
+            mode = getattr(settings, f"{prefix}_MODE", None) or settings.INFERENCE_POOL_MODE
+            pool = InferencePool(
+                family,
+                max_workers=getattr(settings, f"{prefix}_WORKERS"),
+                torch_threads=getattr(settings, f"{prefix}_TORCH_THREADS"),
+                use_processes=mode == "process"
+            )
+            _pools[family] = pool
+        return pool
+
+
+def configure_torch_threads() -> None:
+    """Apply INFERENCE_TORCH_THREADS to this process once (called on application startup)"""
+    _pin_torch_threads(settings.INFERENCE_TORCH_THREADS)
+
+
+def inference_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats of every pool created so far"""
+    with _pools_lock:
+        pools = dict(_pools)
+    return {family: pool.stats() for family, pool in pools.items()}
+
+
+def shutdown_inference_pools() -> None:
+    """Stop all pools (called on application shutdown)"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=False, cancel_futures=True)
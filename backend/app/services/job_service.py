@@ -0,0 +1,264 @@
+"""
+In-process job queue for running analyses outside the HTTP request
+"""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.db.repository import AnalysisRepository, TextRepository
+from app.db.unit_of_work import UnitOfWork
+from app.models.responses import AnalyzeResponse
+from app.services.analysis_service import AnalysisService
+
+STAGES = ("grammar", "repetition", "semantic", "sentiment")
+
+
+class JobQueueFullError(RuntimeError):
+    """Raised when no more jobs can be queued"""
+
+
+class AnalysisJob:
+    """State and event log of one queued analysis"""
+
+    def __init__(
+        self,
+        user_id: str,
+        text: str,
+        reference_topic: Optional[str],
+        source_type: str = "text",
+        file_data: Optional[Dict[str, Any]] = None
+    ):
+        self.id = str(uuid.uuid4())
+        self.user_id = user_id
+        self.text: Optional[str] = text
+        self.reference_topic = reference_topic
+        self.source_type = source_type
+        self.file_data = file_data
+
+        self.status = "queued"
+        self.completed_stages: List[str] = []
+        self.events: List[Dict[str, Any]] = []
+        self.analysis_id: Optional[str] = None
+        self.result: Optional[AnalyzeResponse] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        self.finished_monotonic: Optional[float] = None
+
+        self._new_event = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def add_event(self, event: str, data: Dict[str, Any]) -> None:
+        """Append to the event log and wake up subscribers"""
+        self.events.append({"id": len(self.events) + 1, "event": event, "data": data})
+        waiter, self._new_event = self._new_event, asyncio.Event()
+        waiter.set()
+
+    async def stream_events(self, after: int = 0) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield logged events after the given id, then live ones until the job finishes
+
+        Args:
+            after: Id of the last event the client already has (SSE Last-Event-ID)
+        """
+        while True:
+            while after < len(self.events):
+                yield self.events[after]
+                after += 1
+            if self.finished:
+                return
+            await self._new_event.wait()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Status document for GET /jobs/{id}"""
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "source_type": self.source_type,
+            "stages_completed": list(self.completed_stages),
+            "progress": round(len(self.completed_stages) / len(STAGES), 2),
+            "analysis_id": self.analysis_id,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "result": self.result,
+        }
+
+    def _finish(self, status: str) -> None:
+        self.status = status
+        self.finished_at = datetime.utcnow()
+        self.finished_monotonic = time.monotonic()
+        # The text is stored with the analysis; do not keep a second copy around
+        self.text = None
+
+
+class JobManager:
+    """Runs submitted analyses on a fixed number of worker tasks"""
+
+    def __init__(
+        self,
+        analysis_service: AnalysisService,
+        session_factory,
+        workers: int = 2,
+        max_queued: int = 100,
+        max_jobs: int = 1000,
+        retention_seconds: float = 3600
+    ):
+        """
+        Initialize job manager
+
+        Args:
+            analysis_service: Service running the analyses
+            session_factory: async_sessionmaker used to persist finished results
+            workers: Number of analyses running at the same time
+            max_queued: Jobs waiting for a worker before submit() is refused
+            max_jobs: Finished jobs kept for status queries
+            retention_seconds: How long finished jobs stay queryable
+        """
+        self.analysis_service = analysis_service
+        self.session_factory = session_factory
+        self.workers = workers
+        self.max_queued = max_queued
+        self.max_jobs = max_jobs
+        self.retention_seconds = retention_seconds
+
+        self.jobs: "OrderedDict[str, AnalysisJob]" = OrderedDict()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+
+    def submit(
+        self,
+        user_id: str,
+        text: str,
+        reference_topic: Optional[str] = None,
+        source_type: str = "text",
+        file_data: Optional[Dict[str, Any]] = None
+    ) -> AnalysisJob:
+        """
+        Queue an analysis
+
+        Args:
+            user_id: Owner of the job and of the stored analysis
+            text: Text to analyze
+            reference_topic: Optional reference topic
+            source_type: "text" or "file"
+            file_data: Record of the uploaded file, stored together with the analysis
+
+        Returns:
+            The queued job
+
+        Raises:
+            JobQueueFullError: If max_queued jobs are already waiting
+        """
+        queue = self._ensure_workers()
+        self._prune()
+
+        if queue.full():
+            raise JobQueueFullError("Too many analysis jobs are waiting, try again later")
+
+        job = AnalysisJob(user_id, text, reference_topic, source_type, file_data)
+        self.jobs[job.id] = job
+        job.add_event("queued", {"job_id": job.id, "position": queue.qsize() + 1})
+        queue.put_nowait(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        return self.jobs.get(job_id)
+
+    def shutdown(self) -> None:
+        """Cancel the worker tasks (called on application shutdown)"""
+        for task in self._worker_tasks:
+            task.cancel()
+        self._worker_tasks = []
+
+    def _ensure_workers(self) -> asyncio.Queue:
+        """Start the worker tasks on the running loop (once per loop)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or not self._worker_tasks or all(task.done() for task in self._worker_tasks):
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_queued)
+            self._worker_tasks = [loop.create_task(self._work()) for _ in range(self.workers)]
+        return self._queue
+
+    def _prune(self) -> None:
+        """Forget finished jobs that are too old or beyond max_jobs"""
+        now = time.monotonic()
+        finished = [job for job in self.jobs.values() if job.finished]
+        excess = len(finished) - self.max_jobs
+        for job in finished:
+            if excess > 0 or now - job.finished_monotonic > self.retention_seconds:
+                del self.jobs[job.id]
+                excess -= 1
+
+    async def _work(self) -> None:
+        queue = self._queue
+        while True:
+            job = await queue.get()
+            try:
+                await self._run(job)
+            finally:
+                queue.task_done()
+
+    async def _run(self, job: AnalysisJob) -> None:
+        job.status = "running"
+        job.add_event("started", {"job_id": job.id})
+
+        async def on_stage(stage: str, payload: Dict[str, Any]) -> None:
+            job.completed_stages.append(stage)
+            job.add_event("stage", {
+                "stage": stage,
+                "completed": len(job.completed_stages),
+                "total": len(STAGES)
+            })
+
+        async def stored_result(key: str) -> Optional[AnalyzeResponse]:
+            async with self.session_factory() as session:
+                return await TextRepository(session).get_result(job.text, key)
+
+        try:
+            result_key = self.analysis_service.result_key(job.text, job.reference_topic)
+            result = await self.analysis_service.analyze_text(
+                job.text, job.reference_topic, on_stage=on_stage,
+                stored_result=stored_result, cache_key=result_key
+            )
+            if not result.success:
+                raise RuntimeError("Analiz sırasında hata oluştu")
+
+            # The analysis and its uploaded file are written in one transaction
+            async with self.session_factory() as session:
+                async with UnitOfWork(session) as uow:
+                    analysis_id = uow.add_analysis(AnalysisRepository.record_from_result(
+                        result, job.text, job.reference_topic, job.user_id, job.source_type, result_key
+                    ))
+                    if job.file_data:
+                        uow.add_file(job.file_data, analysis_id)
+
+            job.result = result
+            job.analysis_id = analysis_id
+            job._finish("completed")
+            job.add_event("completed", {"job_id": job.id, "analysis_id": job.analysis_id})
+        except Exception as e:
+            print(f"Analysis job {job.id} failed: {e}")
+            job.error = str(e)
+            job._finish("failed")
+            job.add_event("failed", {"job_id": job.id, "error": job.error})
+            await self._store_unanalyzed_file(job)
+
+    async def _store_unanalyzed_file(self, job: AnalysisJob) -> None:
+        """Keep the record of an uploaded file whose analysis failed"""
+        if not job.file_data:
+            return
+        try:
+            async with self.session_factory() as session:
+                async with UnitOfWork(session) as uow:
+                    uow.add_file(job.file_data)
+        except Exception as e:
+            print(f"Could not store file of failed job {job.id}: {e}")
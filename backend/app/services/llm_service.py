@@ -4,15 +4,60 @@ LLM Service for advanced text analysis using Hugging Face models
 
 import asyncio
 import logging
+import threading
 from typing import List, Dict, Any, Optional, Tuple
 from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
 import torch
 from app.models.responses import SemanticScore
 from app.core.config import settings
+from app.services.inference_pool import ModelRef, get_inference_pool
+from app.services.micro_batcher import MicroBatcher
+from app.services.tokenized_document import TokenizedDocument
 
 logger = logging.getLogger(__name__)
 
 
+def load_text_classification_pipeline(model_name: str, device: str):
+    """Load the sentiment pipeline (used inside inference worker processes)"""
+    return pipeline(
+        "text-classification",
+        model=model_name,
+        device=device,
+        max_length=128,
+        truncation=True
+    )
+
+
+def load_zero_shot_pipeline(model_name: str, device: str):
+    """Load the zero-shot pipeline (used inside inference worker processes)"""
+    return pipeline(
+        "zero-shot-classification",
+        model=model_name,
+        device=device
+    )
+
+
+def classify_batch(sentiment_pipeline, texts: List[str]) -> List[Dict[str, Any]]:
+    """
+    Run one padded forward pass of the sentiment pipeline
+    
+    Args:
+        sentiment_pipeline: Text classification pipeline
+        texts: Truncated texts from all requests in the batch
+        
+    Returns:
+        Top label and score for each text, in order
+    """
+    results = sentiment_pipeline(texts, batch_size=len(texts))
+    # Pipelines configured with top_k return a list of labels per text
+    return [result[0] if isinstance(result, list) else result for result in results]
+
+
+def zero_shot_classify(zero_shot_pipeline, text: str, candidate_labels: List[str]) -> Dict[str, Any]:
+    """Single-label zero-shot classification"""
+    return zero_shot_pipeline(text, candidate_labels, multi_label=False)
+
+
 class LLMService:
     """Service for LLM-powered text analysis"""
     
@@ -20,10 +65,29 @@ class LLMService:
         """Initialize LLM service with cached models"""
         self.cached_models = {}
         self.cached_tokenizers = {}
+        self._models_lock = threading.Lock()
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         
         # Initialize default models (like before)
         self._initialize_default_models()
+        
+        # Each model family runs on its own pool so one slow call cannot starve another
+        self.sentiment_pool = get_inference_pool("sentiment")
+        self.zero_shot_pool = get_inference_pool("zero_shot")
+        
+        # Concurrent sentiment requests share padded forward passes
+        sentiment_model = ModelRef(
+            lambda: self._get_cached_model(self.sentiment_model_name, load_text_classification_pipeline),
+            load_text_classification_pipeline, self.sentiment_model_name, self.device
+        )
+        self.sentiment_batcher = MicroBatcher(
+            self.sentiment_pool.bind(classify_batch, sentiment_model),
+            max_batch_size=settings.SENTIMENT_BATCH_MAX_SIZE,
+            max_wait_ms=settings.SENTIMENT_BATCH_MAX_WAIT_MS,
+            max_queue_size=settings.SENTIMENT_QUEUE_MAX_SIZE,
+            executor=self.sentiment_pool,
+            name="sentiment"
+        )
     
     def _initialize_default_models(self):
         """Initialize default models for common tasks"""
@@ -33,17 +97,11 @@ class LLMService:
             self.text_gen_model_name = "microsoft/DialoGPT-small"
             self.zero_shot_model_name = "facebook/bart-base"
             
-            # Pre-load sentiment model
+            # Pre-load sentiment model (worker processes load their own copy)
             try:
-                sentiment_pipeline = pipeline(
-                    "text-classification",
-                    model=self.sentiment_model_name,
-                    device=self.device,
-                    max_length=128,
-                    truncation=True
-                )
-                self.cached_models[self.sentiment_model_name] = sentiment_pipeline
-                logger.info("Sentiment model loaded successfully")
+                if settings.INFERENCE_POOL_MODE != "process":
+                    self._get_cached_model(self.sentiment_model_name, load_text_classification_pipeline)
+                    logger.info("Sentiment model loaded successfully")
             except Exception as e:
                 logger.warning(f"Could not pre-load sentiment model: {e}")
                 # Fallback to a simpler approach
@@ -57,6 +115,13 @@ class LLMService:
             self.sentiment_model_name = None
             self.zero_shot_model_name = None
     
+    def _get_cached_model(self, model_name: str, loader):
+        """Load a pipeline on first use; called from inference pool threads, not the event loop"""
+        with self._models_lock:
+            if model_name not in self.cached_models:
+                self.cached_models[model_name] = loader(model_name, self.device)
+            return self.cached_models[model_name]
+    
     async def analyze_sentiment(self, text: str) -> Dict[str, Any]:
         """
         Analyze sentiment using multilingual model
@@ -68,32 +133,14 @@ class LLMService:
             Dictionary with sentiment analysis results
         """
         try:
-            # Use cached model if available
-            if self.sentiment_model_name not in self.cached_models:
-                # Load sentiment analysis pipeline with smaller model
-                sentiment_pipeline = pipeline(
-                    "text-classification",
-                    model=self.sentiment_model_name,
-                    device=self.device,
-                    max_length=128,  # Limit input length for speed
-                    truncation=True
-                )
-                self.cached_models[self.sentiment_model_name] = sentiment_pipeline
-            
             # Truncate text for faster processing
             truncated_text = text[:200] if len(text) > 200 else text
             
-            # Run sentiment analysis
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                self.cached_models[self.sentiment_model_name],
-                truncated_text
-            )
+            # Run sentiment analysis (batched with other pending requests)
+            sentiment_result = await self.sentiment_batcher.submit(truncated_text)
             
             # Process results
-            if isinstance(result, list) and len(result) > 0:
-                sentiment_result = result[0]
+            if sentiment_result:
                 return {
                     "sentiment": sentiment_result.get("label", "neutral"),
                     "confidence": round(sentiment_result.get("score", 0.0), 3),
@@ -272,16 +319,6 @@ class LLMService:
             Dictionary with topic classification results
         """
         try:
-            # Use cached model if available
-            if self.zero_shot_model_name not in self.cached_models:
-                # Load zero-shot classification pipeline
-                zero_shot_pipeline = pipeline(
-                    "zero-shot-classification",
-                    model=self.zero_shot_model_name,
-                    device=self.device
-                )
-                self.cached_models[self.zero_shot_model_name] = zero_shot_pipeline
-            
             # Define topic candidates (Turkish topics)
             topic_candidates = [
                 "Bilim", "Teknoloji", "Spor", "Sağlık", "Eğitim", 
@@ -292,13 +329,12 @@ class LLMService:
             truncated_text = text[:300] if len(text) > 300 else text
             
             # Run zero-shot classification
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None,
-                self.cached_models[self.zero_shot_model_name],
-                truncated_text,
-                topic_candidates,
-                multi_label=False
+            zero_shot_model = ModelRef(
+                lambda: self._get_cached_model(self.zero_shot_model_name, load_zero_shot_pipeline),
+                load_zero_shot_pipeline, self.zero_shot_model_name, self.device
+            )
+            result = await self.zero_shot_pool.run(
+                zero_shot_classify, zero_shot_model, truncated_text, topic_candidates
             )
             
             # Process results
@@ -336,23 +372,24 @@ class LLMService:
                 "error": str(e)
             }
     
-    async def analyze_writing_style(self, text: str) -> Dict[str, Any]:
+    async def analyze_writing_style(self, text: str, document: Optional[TokenizedDocument] = None) -> Dict[str, Any]:
         """
         Analyze writing style characteristics
         
         Args:
             text: Text to analyze
+            document: Shared tokenization of text (built here if not given)
             
         Returns:
             Writing style analysis results
         """
         try:
             # Basic style analysis
-            sentences = text.split('.')
-            words = text.split()
+            document = document or TokenizedDocument(text)
+            words = document.words()
             
-            avg_sentence_length = len(words) / max(len(sentences), 1)
-            avg_word_length = sum(len(word) for word in words) / max(len(words), 1)
+            avg_sentence_length = len(words) / max(document.sentence_count, 1)
+            avg_word_length = document.avg_word_length
             
             # Style classification
             if avg_sentence_length > 25:
@@ -381,7 +418,7 @@ class LLMService:
                 "formality": formality,
                 "avg_sentence_length": round(avg_sentence_length, 1),
                 "avg_word_length": round(avg_word_length, 1),
-                "sentence_count": len(sentences),
+                "sentence_count": document.sentence_count,
                 "word_count": len(words),
                 "character_count": len(text)
             }
@@ -405,12 +442,14 @@ class LLMService:
         Returns:
             Dictionary with comprehensive analysis results
         """
+        document = TokenizedDocument(text)
+        
         try:
             # Run all LLM analyses concurrently for speed
             tasks = [
                 self.analyze_sentiment(text),
                 self.classify_text_topic(text),
-                self.analyze_writing_style(text),
+                self.analyze_writing_style(text, document),
                 self.generate_improvement_suggestions(text, {
                     'text_length': len(text),
                     'reference_topic': reference_topic
@@ -436,10 +475,10 @@ class LLMService:
             style_result = results[2] if not isinstance(results[2], Exception) else {
                 "style_type": "Basit",
                 "formality": "Orta",
-                "avg_sentence_length": len(text.split('.')) if '.' in text else len(text.split()),
-                "avg_word_length": sum(len(word) for word in text.split()) / len(text.split()) if text.split() else 0,
-                "sentence_count": len(text.split('.')),
-                "word_count": len(text.split()),
+                "avg_sentence_length": document.word_count / max(document.sentence_count, 1),
+                "avg_word_length": document.avg_word_length,
+                "sentence_count": document.sentence_count,
+                "word_count": document.word_count,
                 "character_count": len(text)
             }
             
@@ -473,10 +512,10 @@ class LLMService:
                 "writing_style": {
                     "style_type": "Basit",
                     "formality": "Orta",
-                    "avg_sentence_length": len(text.split('.')) if '.' in text else len(text.split()),
-                    "avg_word_length": sum(len(word) for word in text.split()) / len(text.split()) if text.split() else 0,
-                    "sentence_count": len(text.split('.')),
-                    "word_count": len(text.split()),
+                    "avg_sentence_length": document.word_count / max(document.sentence_count, 1),
+                    "avg_word_length": document.avg_word_length,
+                    "sentence_count": document.sentence_count,
+                    "word_count": document.word_count,
                     "character_count": len(text)
                 },
                 "text_length": len(text),
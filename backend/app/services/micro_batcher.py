@@ -0,0 +1,174 @@
+"""
+Async micro-batching of model calls from concurrent requests
+"""
+
+import asyncio
+import time
+from collections import Counter
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+def bucket_label(value: int) -> str:
+    """Power-of-two histogram bucket label for a count"""
+    if value <= 1:
+        return str(value)
+    upper = 1 << (value - 1).bit_length()
+    lower = upper // 2 + 1
+    return str(upper) if lower == upper else f"{lower}-{upper}"
+
+
+class MicroBatcher:
+    """
+    Collects items submitted by many coroutines and processes them in batches
+
+    The first pending item opens a batch; the batch is closed when it reaches
+    max_batch_size or max_wait_ms has passed, whichever comes first. The batch
+    function runs in an executor and must return one result per item, in order.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 16,
+        max_wait_ms: float = 10.0,
+        max_queue_size: int = 256,
+        executor: Optional[Executor] = None,
+        name: str = "batcher"
+    ):
+        """
+        Initialize micro-batcher
+
+        Args:
+            process_batch: Blocking function mapping a list of items to a list of results
+            max_batch_size: Maximum number of items per batch
+            max_wait_ms: How long an open batch waits for more items
+            max_queue_size: Pending items allowed before submit() waits for room
+            executor: Executor running process_batch (None uses the loop default)
+            name: Name used in log messages and stats
+        """
+        self.process_batch = process_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue_size = max_queue_size
+        self.executor = executor
+        self.name = name
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        self.batches = 0
+        self.items = 0
+        self.batch_sizes: Counter = Counter()
+        self.queue_depths: Counter = Counter()
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Queue one item and wait for its result
+
+        Args:
+            item: Input for process_batch
+
+        Returns:
+            The result process_batch produced for this item
+        """
+        queue = self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await queue.put((item, future))
+        return await future
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch counters plus batch-size and queue-depth histograms"""
+        return {
+            "name": self.name,
+            "queue_depth": self.queue_depth,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "batch_size_histogram": dict(sorted(self.batch_sizes.items())),
+            "queue_depth_histogram": dict(self.queue_depths),
+        }
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        """Start the worker task on the running loop (once per loop)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._worker = loop.create_task(self._run())
+        return self._queue
+
+    async def _collect(self, queue: asyncio.Queue) -> List[Tuple[Any, asyncio.Future]]:
+        """Wait for the first item, then gather more until the batch is full or the wait expires"""
+        batch = [await queue.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self) -> None:
+        queue = self._queue
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = await self._collect(queue)
+            # Callers that gave up (cancelled) do not need a forward pass
+            batch = [(item, future) for item, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            self.batches += 1
+            self.items += len(batch)
+            self.batch_sizes[len(batch)] += 1
+            self.queue_depths[bucket_label(queue.qsize())] += 1
+
+            try:
+                results = await self._process(loop, [item for item, _ in batch])
+            except Exception as e:
+                if len(batch) == 1:
+                    _, future = batch[0]
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    # One bad item must not fail everyone else in the batch
+                    await self._process_one_by_one(loop, batch)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    async def _process(self, loop: asyncio.AbstractEventLoop, items: List[Any]) -> List[Any]:
+        results = await loop.run_in_executor(self.executor, self.process_batch, items)
+        if len(results) != len(items):
+            raise RuntimeError(f"{self.name}: batch returned {len(results)} results for {len(items)} items")
+        return results
+
+    async def _process_one_by_one(self, loop: asyncio.AbstractEventLoop, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        for item, future in batch:
+            if future.done():
+                continue
+            try:
+                result = (await self._process(loop, [item]))[0]
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,197 @@
+"""
+Password hashing and verification on a dedicated, bounded worker pool
+"""
+
+import asyncio
+import functools
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from passlib.context import CryptContext
+
+from app.core.config import settings
+
+SCHEME = "sha256_crypt"
+
+# Contexts built inside a worker, keyed by work factor
+_contexts: Dict[int, CryptContext] = {}
+_contexts_lock = threading.Lock()
+
+
+class PasswordHasherBusyError(RuntimeError):
+    """Raised when too many hashing calls are already waiting for a worker"""
+
+
+def _context(rounds: int) -> CryptContext:
+    with _contexts_lock:
+        context = _contexts.get(rounds)
+        if context is None:
+            context = CryptContext(
+                schemes=[SCHEME],
+                deprecated="auto",
+                **{f"{SCHEME}__default_rounds": rounds, f"{SCHEME}__min_rounds": rounds}
+            )
+            _contexts[rounds] = context
+        return context
+
+
+def _hash(rounds: int, password: str) -> str:
+    return _context(rounds).hash(password)
+
+
+def _verify_and_update(rounds: int, password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+    return _context(rounds).verify_and_update(password, password_hash)
+
+
+class PasswordHasher:
+    """
+    Runs password hashing off the event loop with a concurrency limit
+
+    At most max_workers hashes run at once and at most max_queued more wait
+    for a worker; beyond that calls fail fast with PasswordHasherBusyError
+    instead of piling up behind a login spike.
+    """
+
+    def __init__(
+        self,
+        rounds: int = 535000,
+        max_workers: int = 2,
+        max_queued: int = 64,
+        use_processes: bool = False
+    ):
+        """
+        Initialize password hasher
+
+        Args:
+            rounds: Work factor of new hashes (sha256_crypt rounds). Hashes made
+                with fewer rounds are rehashed on the next successful login.
+            max_workers: Hashes computed concurrently
+            max_queued: Calls allowed to wait for a worker
+            use_processes: Hash in worker processes instead of threads
+        """
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.use_processes = use_processes
+
+        if use_processes:
+            self._executor: Executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix="password-hasher"
+            )
+        self._slots: Optional[asyncio.Semaphore] = None
+
+        self.waiting = 0
+        self.active = 0
+        self.completed = 0
+        self.rejected = 0
+        self.peak_waiting = 0
+        self.total_wait_seconds = 0.0
+        self.total_run_seconds = 0.0
+
+    async def hash(self, password: str) -> str:
+        """
+        Hash a password with the configured work factor
+
+        Raises:
+            PasswordHasherBusyError: If the queue is full
+        """
+        return await self._run(_hash, self.rounds, password)
+
+    async def verify(self, password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+        """
+        Check a password against its stored hash
+
+        Args:
+            password: Plain password
+            password_hash: Stored hash
+
+        Returns:
+            (matches, new_hash): new_hash is set when the stored hash uses an
+            outdated work factor and should be replaced
+
+        Raises:
+            PasswordHasherBusyError: If the queue is full
+        """
+        return await self._run(_verify_and_update, self.rounds, password, password_hash)
+
+    async def _run(self, fn: Callable, *args) -> Any:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_workers)
+        if self.waiting >= self.max_queued and self._slots.locked():
+            self.rejected += 1
+            raise PasswordHasherBusyError("Too many sign-in requests, try again shortly")
+
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        started_at = time.perf_counter()
+        self.total_wait_seconds += started_at - queued_at
+        self.active += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(fn, *args))
+        finally:
+            self.active -= 1
+            self.completed += 1
+            self.total_run_seconds += time.perf_counter() - started_at
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": "process" if self.use_processes else "thread",
+            "scheme": SCHEME,
+            "rounds": self.rounds,
+            "max_workers": self.max_workers,
+            "max_queued": self.max_queued,
+            "active": self.active,
+            "waiting": self.waiting,
+            "peak_waiting": self.peak_waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "mean_wait_ms": round(self.total_wait_seconds / self.completed * 1000, 2) if self.completed else 0.0,
+            "mean_run_ms": round(self.total_run_seconds / self.completed * 1000, 2) if self.completed else 0.0,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_hasher: Optional[PasswordHasher] = None
+_hasher_lock = threading.Lock()
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Return the process-wide password hasher, creating it from settings on first use"""
+    global _hasher
+    with _hasher_lock:
+        if _hasher is None:
+            _hasher = PasswordHasher(
+                rounds=settings.PASSWORD_HASH_ROUNDS,
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                max_queued=settings.PASSWORD_HASH_MAX_QUEUED,
+                use_processes=settings.PASSWORD_HASH_POOL_MODE == "process"
+            )
+        return _hasher
+
+
+def shutdown_password_hasher() -> None:
+    """Stop the hashing workers (called on application shutdown)"""
+    global _hasher
+    with _hasher_lock:
+        hasher, _hasher = _hasher, None
+    if hasher is not None:
+        hasher.shutdown()
@@ -0,0 +1,153 @@
+"""
+Repeated-phrase search over word sequences using a suffix array and LCP intervals
+"""
+
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+
+def to_word_ids(words: Sequence[Hashable]) -> List[int]:
+    """
+    Map words to dense integer ids (in first-occurrence order)
+
+    Args:
+        words: Word sequence
+
+    Returns:
+        List of ids, one per word
+    """
+    ids: Dict[Hashable, int] = {}
+    return [ids.setdefault(word, len(ids)) for word in words]
+
+
+def suffix_array(ids: Sequence[int]) -> List[int]:
+    """
+    Suffix array of an id sequence by prefix doubling
+
+    Args:
+        ids: Dense integer ids (0..k-1)
+
+    Returns:
+        Start positions of all suffixes in lexicographic order
+    """
+    n = len(ids)
+    sa = list(range(n))
+    if n < 2:
+        return sa
+
+    rank = list(ids)
+    step = 1
+    while True:
+        # Rank of the suffix step positions later; shorter suffixes sort first
+        stride = n + 1
+        keys = [rank[i] * stride + (rank[i + step] + 1 if i + step < n else 0) for i in range(n)]
+        sa.sort(key=keys.__getitem__)
+
+        new_rank = [0] * n
+        for j in range(1, n):
+            new_rank[sa[j]] = new_rank[sa[j - 1]] + (keys[sa[j]] != keys[sa[j - 1]])
+        rank = new_rank
+
+        if rank[sa[-1]] == n - 1 or step >= n:
+            return sa
+        step *= 2
+
+
+def lcp_array(ids: Sequence[int], sa: Sequence[int]) -> List[int]:
+    """
+    Longest common prefix of each suffix with its predecessor in the suffix array (Kasai)
+
+    Args:
+        ids: Id sequence
+        sa: Its suffix array
+
+    Returns:
+        lcp where lcp[j] is the common prefix length of sa[j - 1] and sa[j] (lcp[0] == 0)
+    """
+    n = len(ids)
+    rank = [0] * n
+    for j, start in enumerate(sa):
+        rank[start] = j
+
+    lcp = [0] * n
+    common = 0
+    for start in range(n):
+        j = rank[start]
+        if j == 0:
+            common = 0
+            continue
+        other = sa[j - 1]
+        while start + common < n and other + common < n and ids[start + common] == ids[other + common]:
+            common += 1
+        lcp[j] = common
+        if common:
+            common -= 1
+    return lcp
+
+
+def repeated_phrases(
+    ids: Sequence[int],
+    min_length: int = 2,
+    max_length: Optional[int] = None,
+    min_count: int = 2,
+    maximal: bool = False
+) -> List[Tuple[int, List[int]]]:
+    """
+    Find every phrase of min_length..max_length words occurring at least min_count times
+
+    Each LCP interval of the suffix array is a right-maximal repeat: all its
+    suffixes share the first lcp words, and every phrase length between the
+    enclosing interval's lcp (exclusive) and its own lcp (inclusive) occurs at
+    exactly those positions. One stack pass over the LCP array therefore yields
+    all repeated phrases, so the cost does not grow with max_length.
+
+    Args:
+        ids: Word ids (see to_word_ids)
+        min_length: Shortest phrase length reported
+        max_length: Longest phrase length reported (None for no limit)
+        min_count: Minimum number of (possibly overlapping) occurrences
+        maximal: Only report maximal repeats, i.e. phrases that cannot be extended
+            to the left or right without losing an occurrence (cut at max_length).
+            Keeps the output linear in the text length when max_length is large.
+
+    Returns:
+        (phrase length, sorted start positions) pairs, ordered by length and positions
+    """
+    n = len(ids)
+    if n < 2 or min_count > n:
+        return []
+
+    sa = suffix_array(ids)
+    lcp = lcp_array(ids, sa)
+    longest = n if max_length is None else max_length
+    found: List[Tuple[int, List[int]]] = []
+
+    # Open intervals as (lcp, left bound); the root interval has lcp 0
+    stack = [(0, 0)]
+    for j in range(1, n + 1):
+        current = lcp[j] if j < n else 0
+        left = j - 1
+        while current < stack[-1][0]:
+            interval_lcp, left = stack.pop()
+            parent_lcp = max(current, stack[-1][0])
+            if j - left >= min_count:
+                shortest = max(parent_lcp + 1, min_length)
+                if maximal:
+                    shortest = max(min(interval_lcp, longest), min_length)
+                if shortest <= min(interval_lcp, longest):
+                    positions = sorted(sa[left:j])
+                    if maximal and not _left_maximal(ids, positions):
+                        continue
+                    for length in range(shortest, min(interval_lcp, longest) + 1):
+                        found.append((length, positions))
+        if current > stack[-1][0]:
+            stack.append((current, left))
+
+    # Positions break ties between maximal repeats cut to the same length at the same start
+    found.sort(key=lambda item: (item[0], item[1]))
+    return found
+
+
+def _left_maximal(ids: Sequence[int], positions: List[int]) -> bool:
+    """Whether the occurrences are not all preceded by the same word"""
+    previous = {ids[position - 1] if position else -1 for position in positions}
+    return len(previous) > 1
@@ -0,0 +1,133 @@
+"""
+Short-lived cache of authenticated principals, keyed by bearer token
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+
+class PrincipalCache:
+    """
+    TTL + LRU cache mapping a verified token to the principal dict of its user
+
+    Entries expire after ttl_seconds or when the token itself expires,
+    whichever comes first. invalidate_user drops every token of a user and
+    keeps lookups that were already reading the database from storing the
+    data they read before the change.
+    """
+
+    def __init__(self, ttl_seconds: float = 60.0, max_entries: int = 10000):
+        """
+        Initialize principal cache
+
+        Args:
+            ttl_seconds: How long a principal is served without reading the user again
+            max_entries: Maximum number of cached tokens
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        # token -> (principal, expires_at on the monotonic clock)
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._tokens_by_user: Dict[str, Set[str]] = {}
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Return a copy of the cached principal of a token, or None"""
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self.misses += 1
+                return None
+            principal, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return dict(principal)
+
+    def generation(self, user_id: str) -> int:
+        """Invalidation counter of a user; pass it back to put()"""
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def put(
+        self,
+        token: str,
+        principal: Dict[str, Any],
+        token_expires_at: Optional[float] = None,
+        generation: int = 0
+    ) -> None:
+        """
+        Cache the principal of a token
+
+        Args:
+            token: Bearer token the principal was resolved from
+            principal: Principal dict (must contain "sub")
+            token_expires_at: Token "exp" claim as a Unix timestamp
+            generation: generation(user_id) read before loading the user; the
+                entry is dropped if the user was invalidated since
+        """
+        if self.ttl_seconds <= 0 or self.max_entries <= 0:
+            return
+
+        ttl = self.ttl_seconds
+        if token_expires_at is not None:
+            ttl = min(ttl, token_expires_at - time.time())
+        if ttl <= 0:
+            return
+
+        user_id = principal["sub"]
+        with self._lock:
+            if self._generations.get(user_id, 0) != generation:
+                return
+            if token in self._entries:
+                self._remove(token)
+            self._entries[token] = (dict(principal), time.monotonic() + ttl)
+            self._tokens_by_user.setdefault(user_id, set()).add(token)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Drop every cached token of a user (profile change, password reset, deactivation)"""
+        user_id = str(user_id)
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+            }
+
+    def _remove(self, token: str) -> None:
+        """Drop one token; caller holds the lock"""
+        principal, _ = self._entries.pop(token)
+        tokens = self._tokens_by_user.get(principal["sub"])
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[principal["sub"]]
@@ -2,10 +2,12 @@
 Repetition detection service using n-gram analysis
 """
 
-import re
-from typing import List, Dict, Tuple
-from collections import Counter, defaultdict
+from typing import List, Dict, Optional
+from collections import defaultdict
+from app.core.config import settings
 from app.models.responses import RepetitionError
+from app.services.phrase_index import repeated_phrases, to_word_ids
+from app.services.tokenized_document import TokenizedDocument
 
 
 class RepetitionService:
@@ -14,22 +16,37 @@ class RepetitionService:
     def __init__(self):
         """Initialize repetition detection service"""
         self.min_word_count = 2  # Minimum words for phrase repetition
-        self.max_word_count = 5   # Maximum words for phrase repetition
+        # Maximum words for phrase repetition (None: no limit)
+        self.max_word_count = settings.REPETITION_MAX_PHRASE_WORDS or None
+        self.maximal_phrases_only = settings.REPETITION_MAXIMAL_PHRASES_ONLY
         self.max_threshold = 5    # Maximum threshold regardless of text length
     
-    async def analyze_repetitions(self, text: str) -> List[RepetitionError]:
+    async def analyze_repetitions(self, text: str, document: Optional[TokenizedDocument] = None) -> List[RepetitionError]:
         """
         Analyze text for repetitions
         
         Args:
             text: Text to analyze
+            document: Shared tokenization of text (built here if not given)
             
         Returns:
             List of repetition errors found
         """
         # Clean and tokenize text
-        words = self._tokenize_text(text)
+        words = (document or TokenizedDocument(text)).normalized_words
         
+        return self.find_repetitions(words)
+    
+    def find_repetitions(self, words: List[str]) -> List[RepetitionError]:
+        """
+        Find word and phrase repetitions in an already tokenized text
+        
+        Args:
+            words: Words as produced by _tokenize_text
+            
+        Returns:
+            List of repetition errors found
+        """
         # Find word repetitions
         word_repetitions = self._find_word_repetitions(words)
         
@@ -60,15 +77,9 @@ class RepetitionService:
             text: Input text
             
         Returns:
-            List of words
+            List of lowercased words without punctuation
         """
-        # Remove punctuation and convert to lowercase
-        text = re.sub(r'[^\w\s]', ' ', text.lower())
-        
-        # Split into words and filter out empty strings
-        words = [word.strip() for word in text.split() if word.strip()]
-        
-        return words
+        return TokenizedDocument(text).normalized_words
     
     def _find_word_repetitions(self, words: List[str]) -> List[Dict]:
         """
@@ -86,21 +97,42 @@ class RepetitionService:
         for i, word in enumerate(words):
             word_positions[word].append(i)
         
-        # Calculate dynamic threshold based on text length
-        text_length = len(words)
+        return self._find_word_repetitions_from_positions(word_positions, len(words))
+    
+    def _get_threshold(self, text_length: int) -> int:
+        """
+        Dynamic repetition threshold based on text length (in words)
+        
+        Args:
+            text_length: Number of words
+            
+        Returns:
+            Minimum count for a word or phrase to be reported
+        """
         if text_length < 50:
-            threshold = 2  # Short texts: 2 repetitions
+            return 2  # Short texts: 2 repetitions
         elif text_length < 100:
-            threshold = 2  # Medium-short texts: 2 repetitions
+            return 2  # Medium-short texts: 2 repetitions
         elif text_length < 200:
-            threshold = 3  # Medium texts: 3 repetitions
+            return 3  # Medium texts: 3 repetitions
         elif text_length < 500:
-            threshold = 4  # Long texts: 4 repetitions
+            return 4  # Long texts: 4 repetitions
         else:
-            threshold = 5  # Very long texts: 5 repetitions
+            return 5  # Very long texts: 5 repetitions
+    
+    def _find_word_repetitions_from_positions(self, word_positions: Dict[str, List[int]], text_length: int) -> List[Dict]:
+        """
+        Select repeated words from their positions
         
+        Args:
+            word_positions: Positions of each word, in first-occurrence order
+            text_length: Number of words in the text
+            
+        Returns:
+            List of word repetition dictionaries
+        """
         # Cap threshold at maximum value
-        threshold = min(threshold, self.max_threshold)
+        threshold = min(self._get_threshold(text_length), self.max_threshold)
         
         repetitions = []
         
@@ -127,69 +159,54 @@ class RepetitionService:
     
     def _find_phrase_repetitions(self, words: List[str]) -> List[Dict]:
         """
-        Find repeated phrases using n-grams with dynamic threshold
+        Find repeated phrases with a suffix array over word ids, with dynamic threshold
         
         Args:
             words: List of words
             
         Returns:
-            List of phrase repetition dictionaries
+            List of phrase repetition dictionaries, by phrase length then first position
         """
         repetitions = []
         
-        # Calculate dynamic threshold based on text length
-        text_length = len(words)
-        if text_length < 50:
-            threshold = 2  # Short texts: 2 repetitions
-        elif text_length < 100:
-            threshold = 2  # Medium-short texts: 2 repetitions
-        elif text_length < 200:
-            threshold = 3  # Medium texts: 3 repetitions
-        elif text_length < 500:
-            threshold = 4  # Long texts: 4 repetitions
-        else:
-            threshold = 5  # Very long texts: 5 repetitions
+        # Calculate dynamic threshold based on text length, capped at maximum value
+        threshold = min(self._get_threshold(len(words)), self.max_threshold)
         
-        # Cap threshold at maximum value
-        threshold = min(threshold, self.max_threshold)
+        phrases = repeated_phrases(
+            to_word_ids(words),
+            min_length=self.min_word_count,
+            max_length=self.max_word_count,
+            min_count=threshold,
+            maximal=self.maximal_phrases_only
+        )
         
-        # Check different phrase lengths
-        for phrase_length in range(self.min_word_count, self.max_word_count + 1):
-            if len(words) < phrase_length:
-                continue
-            
-            # Generate n-grams
-            ngrams = []
-            for i in range(len(words) - phrase_length + 1):
-                phrase = ' '.join(words[i:i + phrase_length])
-                ngrams.append((phrase, i))
-            
-            # Count phrase occurrences
-            phrase_counter = Counter(phrase for phrase, _ in ngrams)
+        for phrase_length, positions in phrases:
+            first = positions[0]
+            phrase = ' '.join(words[first:first + phrase_length])
             
-            # Find repeated phrases
-            for phrase, count in phrase_counter.items():
-                if count >= threshold:
-                    # Find all positions of this phrase
-                    positions = [pos for p, pos in ngrams if p == phrase]
-                    
-                    repetition = {
-                        'word': phrase,
-                        'count': count,
-                        'positions': positions,
-                        'suggestion': f"'{phrase}' ifadesini farklı şekillerde ifade edin"
-                    }
-                    repetitions.append(repetition)
+            repetition = {
+                'word': phrase,
+                'count': len(positions),
+                'positions': positions,
+                'suggestion': f"'{phrase}' ifadesini farklı şekillerde ifade edin"
+            }
+            repetitions.append(repetition)
         
         return repetitions
     
-    async def get_repetition_score(self, text: str, errors: List[RepetitionError]) -> float:
+    async def get_repetition_score(
+        self,
+        text: str,
+        errors: List[RepetitionError],
+        document: Optional[TokenizedDocument] = None
+    ) -> float:
         """
         Calculate repetition score based on errors
         
         Args:
             text: Original text
             errors: List of repetition errors
+            document: Shared tokenization of text (built here if not given)
             
         Returns:
             Repetition score (0-100)
@@ -198,7 +215,7 @@ class RepetitionService:
             return 0.0
         
         # Calculate repetition density
-        total_words = len(text.split())
+        total_words = (document or TokenizedDocument(text)).word_count
         repetition_words = sum(error.count for error in errors)
         
         # Score based on repetition density (lower is better)
@@ -0,0 +1,259 @@
+"""
+Content-addressed cache for complete analysis results
+"""
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from app.models.responses import AnalyzeResponse
+
+
+def make_result_key(version: str, text: str, reference_topic: Optional[str], language: str) -> str:
+    """
+    Build the key identifying an analysis result
+
+    The text is hashed exactly as submitted. Grammar offsets and the
+    spacing rules depend on every character, so normalizing whitespace
+    would return results that point at the wrong positions.
+
+    Args:
+        version: Fingerprint of rules and model names
+        text: Text to analyze
+        reference_topic: Optional reference topic
+        language: Detected language code
+
+    Returns:
+        Hex digest identifying the analysis
+    """
+    digest = hashlib.sha256()
+    for part in (version, language, (reference_topic or "").strip(), text):
+        encoded = part.encode("utf-8")
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class AnalysisResultCache:
+    """
+    Two-tier (in-memory LRU + optional SQLite) cache of AnalyzeResponse objects
+
+    Memory hits are served on the event loop. The SQLite tier runs on a worker
+    thread under its own lock, so memory hits never wait for the disk. Disk hits
+    only record their access time in memory; the times are written in one
+    statement at most every touch_interval seconds (or with the next write).
+    Rows beyond max_disk_entries are evicted in batches, once the table has
+    grown past the budget by a tenth of it.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        max_entries: int = 256,
+        db_path: Optional[str] = None,
+        max_disk_entries: int = 10000,
+        touch_interval: float = 60.0
+    ):
+        """
+        Initialize result cache
+
+        Args:
+            version: Fingerprint of rules and model names. It is part of every
+                key, and disk rows written under another version are purged on
+                startup.
+            max_entries: Maximum number of results kept in memory
+            db_path: SQLite file for the persistent tier; None disables it
+            max_disk_entries: Maximum number of rows kept on disk (exceeded by
+                at most a tenth between evictions)
+            touch_interval: Seconds between writes of disk access times
+        """
+        self.version = version
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.touch_interval = touch_interval
+        self._eviction_slack = max(1, max_disk_entries // 10)
+        self._memory: "OrderedDict[str, AnalyzeResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        # Disk tier state, guarded by _db_lock
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._disk_rows = 0  # upper bound of the row count (replaced rows are counted again)
+        self._touches: Dict[str, float] = {}
+        self._last_touch_flush = time.monotonic()
+        if db_path:
+            try:
+                self._db = self._open_db(db_path)
+                self._disk_rows = self._db.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0]
+            except sqlite3.Error as e:
+                print(f"⚠️ Analysis cache disk tier disabled: {e}")
+                self._db = None
+
+    def make_key(self, text: str, reference_topic: Optional[str], language: str) -> str:
+        """Build the cache key for a request (see make_result_key)"""
+        return make_result_key(self.version, text, reference_topic, language)
+
+    async def get(self, key: str) -> Optional[AnalyzeResponse]:
+        """Return a copy of the cached response, or None"""
+        with self._lock:
+            response = self._memory.get(key)
+            if response is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return response.model_copy(deep=True)
+
+        response = await asyncio.to_thread(self._disk_get, key) if self._db is not None else None
+        with self._lock:
+            if response is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._memory_put(key, response)
+        return response.model_copy(deep=True)
+
+    async def put(self, key: str, response: AnalyzeResponse) -> None:
+        """Store a successful response in both tiers"""
+        if not response.success:
+            return
+
+        stored = response.model_copy(deep=True)
+        with self._lock:
+            self._memory_put(key, stored)
+        if self._db is not None:
+            await asyncio.to_thread(self._disk_put, key, stored)
+
+    def clear(self) -> None:
+        """Drop every cached result"""
+        with self._lock:
+            self._memory.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM analysis_cache")
+                self._db.commit()
+                self._disk_rows = 0
+                self._touches.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and tier sizes"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "version": self.version,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+                "disk_enabled": self._db is not None,
+            }
+        if self._db is not None:
+            with self._db_lock:
+                stats["disk_entries"] = self._db.execute(
+                    "SELECT COUNT(*) FROM analysis_cache"
+                ).fetchone()[0]
+        return stats
+
+    def _memory_put(self, key: str, response: AnalyzeResponse) -> None:
+        """Insert into the LRU; caller holds the lock"""
+        self._memory[key] = response
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _open_db(self, db_path: str) -> sqlite3.Connection:
+        """Open the SQLite tier and purge rows from older rule/model versions"""
+        db = sqlite3.connect(db_path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS analysis_cache (
+                key TEXT PRIMARY KEY,
+                version TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        db.execute(
+            "CREATE INDEX IF NOT EXISTS ix_analysis_cache_last_access "
+            "ON analysis_cache (last_access)"
+        )
+        db.execute("DELETE FROM analysis_cache WHERE version != ?", (self.version,))
+        db.commit()
+        return db
+
+    def _disk_get(self, key: str) -> Optional[AnalyzeResponse]:
+        """Read a row (worker thread)"""
+        try:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT payload FROM analysis_cache WHERE key = ? AND version = ?",
+                    (key, self.version)
+                ).fetchone()
+                if row is None:
+                    return None
+                self._touches[key] = time.time()
+                if time.monotonic() - self._last_touch_flush >= self.touch_interval:
+                    self._flush_touches()
+                    self._db.commit()
+            return AnalyzeResponse.model_validate_json(row[0])
+        except Exception as e:
+            print(f"Analysis cache read failed: {e}")
+            return None
+
+    def _disk_put(self, key: str, response: AnalyzeResponse) -> None:
+        """Write a row, evicting least recently used rows when over budget (worker thread)"""
+        try:
+            payload = response.model_dump_json()
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO analysis_cache (key, version, payload, last_access) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, self.version, payload, time.time())
+                )
+                self._touches.pop(key, None)
+                self._flush_touches()
+                self._disk_rows += 1
+                if self._disk_rows > self.max_disk_entries + self._eviction_slack:
+                    self._evict()
+                self._db.commit()
+        except Exception as e:
+            print(f"Analysis cache write failed: {e}")
+
+    def _flush_touches(self) -> None:
+        """Write pending access times; caller holds _db_lock and commits"""
+        if self._touches:
+            self._db.executemany(
+                "UPDATE analysis_cache SET last_access = ? WHERE key = ?",
+                [(last_access, key) for key, last_access in self._touches.items()]
+            )
+            self._touches.clear()
+        self._last_touch_flush = time.monotonic()
+
+    def _evict(self) -> None:
+        """Trim the table to max_disk_entries; caller holds _db_lock and commits"""
+        self._disk_rows = self._db.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0]
+        excess = self._disk_rows - self.max_disk_entries
+        if excess <= 0:
+            return
+        self._db.execute(
+            """
+            DELETE FROM analysis_cache WHERE key IN (
+                SELECT key FROM analysis_cache
+                ORDER BY last_access
+                LIMIT ?
+            )
+            """,
+            (excess,)
+        )
+        self._disk_rows = self.max_disk_entries
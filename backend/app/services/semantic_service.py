@@ -2,13 +2,40 @@
 Semantic coherence analysis service using sentence-transformers
 """
 
-import asyncio
-import re
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Optional
 from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
+from app.core.config import settings
 from app.models.responses import SemanticScore
+from app.services.embedding_store import SentenceEmbeddingStore
+from app.services.encoder_service import get_encoder_service
+from app.services.similarity_engine import SimilarityEngine
+from app.services.tokenized_document import TokenizedDocument
+
+
+class DocumentContext:
+    """Per-request sentence split and embeddings shared by all semantic checks"""
+    
+    def __init__(self, text: str, sentences: List[str], reference_topic: Optional[str] = None):
+        """
+        Args:
+            text: Original text
+            sentences: Sentences produced by SemanticService._split_into_sentences
+            reference_topic: Optional reference topic
+        """
+        self.text = text
+        self.sentences = sentences
+        self.reference_topic = reference_topic
+        # Filled by SemanticService.build_document_context in a single encode pass
+        self.embeddings: Optional[np.ndarray] = None
+        self.topic_embedding: Optional[np.ndarray] = None
+        # Row-normalized copies, so every similarity is a plain dot product
+        self.normalized: Optional[np.ndarray] = None
+        self.topic_normalized: Optional[np.ndarray] = None
+    
+    @property
+    def has_embeddings(self) -> bool:
+        return self.embeddings is not None
 
 
 class SemanticService:
@@ -30,20 +57,139 @@ class SemanticService:
             # Fallback to simple analysis
             self.model = None
         self.model_name = model_name
+        self.similarity_engine = SimilarityEngine()
+        self.embedding_store = self._open_embedding_store()
+        # Shared by every request (and every SemanticService) using this model
+        self.encoder = get_encoder_service(model_name, self.model) if self.model is not None else None
+    
+    def _open_embedding_store(self) -> Optional[SentenceEmbeddingStore]:
+        """Open the persistent embedding store if one is configured"""
+        if self.model is None or not settings.EMBEDDING_STORE_DIR:
+            return None
+        
+        try:
+            return SentenceEmbeddingStore(
+                settings.EMBEDDING_STORE_DIR,
+                self.model_name,
+                dim=self.model.get_sentence_embedding_dimension(),
+                dtype=settings.EMBEDDING_STORE_DTYPE
+            )
+        except Exception as e:
+            print(f"⚠️ Embedding store disabled: {e}")
+            return None
+    
+    async def build_document_context(
+        self,
+        text: str,
+        reference_topic: str = None,
+        document: Optional[TokenizedDocument] = None
+    ) -> DocumentContext:
+        """
+        Split text into sentences and embed them (topic included) in one batch
+        
+        Args:
+            text: Text to analyze
+            reference_topic: Optional reference topic, encoded in the same batch
+            document: Shared tokenization of text (built here if not given)
+            
+        Returns:
+            DocumentContext to pass to the semantic analysis methods
+        """
+        sentences = (document or TokenizedDocument(text)).semantic_sentences
+        context = DocumentContext(text, sentences, reference_topic)
+        
+        # Nothing to compare with fewer than two sentences
+        if self.model is None or len(sentences) < 2:
+            return context
+        
+        batch = [reference_topic] + sentences if reference_topic else sentences
+        embeddings = await self._get_sentence_embeddings(batch)
+        self._attach_embeddings(context, embeddings)
+        
+        return context
+    
+    async def build_document_contexts(
+        self,
+        items: List[Tuple[str, Optional[str], TokenizedDocument]]
+    ) -> List[DocumentContext]:
+        """
+        Build the contexts of many documents with one embedding pass over all their sentences
+        
+        Args:
+            items: (text, reference_topic, document) per document
+            
+        Returns:
+            One DocumentContext per item, in order
+        """
+        contexts = [
+            DocumentContext(text, document.semantic_sentences, reference_topic)
+            for text, reference_topic, document in items
+        ]
+        if self.model is None:
+            return contexts
+        
+        batches = {}
+        for index, context in enumerate(contexts):
+            # Nothing to compare with fewer than two sentences
+            if len(context.sentences) < 2:
+                continue
+            topic = context.reference_topic
+            batches[index] = [topic] + context.sentences if topic else context.sentences
+        
+        # Sentences shared between documents (and topics) are encoded once
+        unique = list(dict.fromkeys(sentence for batch in batches.values() for sentence in batch))
+        if not unique:
+            return contexts
+        
+        # Chunks stay within the encoder's admission limit
+        chunk_size = max(1, self.encoder.max_pending_sentences // 2) if self.encoder is not None else len(unique)
+        rows = []
+        for start in range(0, len(unique), chunk_size):
+            rows.append(await self._get_sentence_embeddings(unique[start:start + chunk_size]))
+        vectors = dict(zip(unique, np.concatenate(rows)))
+        
+        for index, batch in batches.items():
+            self._attach_embeddings(contexts[index], np.stack([vectors[sentence] for sentence in batch]))
+        
+        return contexts
     
-    async def analyze_semantic_coherence(self, text: str, reference_topic: str = None) -> SemanticScore:
+    def _attach_embeddings(self, context: DocumentContext, embeddings: np.ndarray) -> None:
+        """Store embeddings (topic first, if any) and their normalized copies on a context"""
+        reference_topic = context.reference_topic
+        
+        if reference_topic:
+            context.topic_embedding = embeddings[0:1]
+            context.embeddings = embeddings[1:]
+        else:
+            context.embeddings = embeddings
+        
+        normalized = self.similarity_engine.normalize(embeddings)
+        if reference_topic:
+            context.topic_normalized = normalized[0:1]
+            context.normalized = normalized[1:]
+        else:
+            context.normalized = normalized
+    
+    async def analyze_semantic_coherence(
+        self,
+        text: str,
+        reference_topic: str = None,
+        context: Optional[DocumentContext] = None
+    ) -> SemanticScore:
         """
         Analyze semantic coherence of text
         
         Args:
             text: Text to analyze
             reference_topic: Optional reference topic for comparison
+            context: Shared document context; built here when not given
             
         Returns:
             SemanticScore object with coherence score and explanation
         """
-        # Split text into sentences
-        sentences = self._split_into_sentences(text)
+        if context is None:
+            context = await self.build_document_context(text, reference_topic)
+        sentences = context.sentences
         
         if len(sentences) < 2:
             return SemanticScore(
@@ -52,15 +198,12 @@ class SemanticService:
             )
         
         # Use model-based analysis if available, otherwise fallback
-        if self.model is not None:
-            # Get sentence embeddings
-            embeddings = await self._get_sentence_embeddings(sentences)
-            
-            # Calculate pairwise similarities
-            similarities = self._calculate_pairwise_similarities(embeddings)
+        if context.has_embeddings:
+            # Mean similarity over all sentence pairs
+            mean_similarity = self.similarity_engine.upper_triangle_mean(context.normalized)
             
             # Calculate overall coherence score
-            coherence_score = self._calculate_coherence_score(similarities)
+            coherence_score = self._calculate_coherence_score(mean_similarity)
         else:
             # Fallback to simple heuristic-based analysis
             coherence_score = self._simple_coherence_analysis(sentences)
@@ -83,17 +226,7 @@ class SemanticService:
         Returns:
             List of sentences
         """
-        # Simple sentence splitting (can be improved with more sophisticated NLP)
-        sentences = re.split(r'[.!?]+', text)
-        
-        # Clean and filter sentences
-        sentences = [
-            sentence.strip() 
-            for sentence in sentences 
-            if sentence.strip() and len(sentence.strip()) > 10
-        ]
-        
-        return sentences
+        return TokenizedDocument(text).semantic_sentences
     
     def _simple_coherence_analysis(self, sentences: List[str]) -> float:
         """
@@ -125,53 +258,49 @@ class SemanticService:
         Returns:
             Array of sentence embeddings
         """
-        # Run embedding generation in thread pool
-        loop = asyncio.get_event_loop()
-        embeddings = await loop.run_in_executor(
-            None,
-            self.model.encode,
-            sentences
-        )
-        
-        return embeddings
+        if self.embedding_store is None:
+            return await self._encode(sentences)
+        
+        # Only sentences the store has not seen go through the model
+        found, missing = self.embedding_store.lookup(sentences)
+        if not missing:
+            return np.stack([found[i] for i in range(len(sentences))])
+        
+        unique_missing = list(dict.fromkeys(sentences[i] for i in missing))
+        encoded = np.asarray(await self._encode(unique_missing), dtype=np.float32)
+        self.embedding_store.add(unique_missing, encoded)
+        
+        encoded_by_sentence = dict(zip(unique_missing, encoded))
+        return np.stack([
+            found[i] if i in found else encoded_by_sentence[sentence]
+            for i, sentence in enumerate(sentences)
+        ])
     
-    def _calculate_pairwise_similarities(self, embeddings: np.ndarray) -> List[float]:
+    async def _encode(self, sentences: List[str]) -> np.ndarray:
         """
-        Calculate pairwise similarities between sentence embeddings
+        Run the sentence transformer on a list of sentences
         
         Args:
-            embeddings: Array of sentence embeddings
+            sentences: List of sentences
             
         Returns:
-            List of similarity scores
+            Array of sentence embeddings
         """
-        similarities = []
-        
-        for i in range(len(embeddings) - 1):
-            for j in range(i + 1, len(embeddings)):
-                similarity = cosine_similarity(
-                    embeddings[i:i+1], 
-                    embeddings[j:j+1]
-                )[0][0]
-                similarities.append(similarity)
-        
-        return similarities
+        # Batched with sentences of other concurrent requests
+        return await self.encoder.encode(sentences)
     
-    def _calculate_coherence_score(self, similarities: List[float]) -> float:
+    def _calculate_coherence_score(self, mean_similarity: float) -> float:
         """
-        Calculate overall coherence score from similarities
+        Calculate overall coherence score from the mean pairwise similarity
         
         Args:
-            similarities: List of pairwise similarities
+            mean_similarity: Mean similarity over all sentence pairs
             
         Returns:
             Coherence score (0-1)
         """
-        if not similarities:
-            return 0.0
-        
         # Use mean similarity as coherence score
-        coherence_score = np.mean(similarities)
+        coherence_score = float(mean_similarity)
         
         # Normalize to 0-1 range
         coherence_score = max(0.0, min(1.0, coherence_score))
@@ -228,13 +357,14 @@ class SemanticService:
         embeddings = await self._get_sentence_embeddings(reference_sentences)
         
         # Calculate similarities with reference topic
-        topic_embeddings = embeddings[0:1]  # Reference topic embedding
-        text_embeddings = embeddings[1:]    # Text sentence embeddings
+        normalized = self.similarity_engine.normalize(embeddings)
+        topic_normalized = normalized[0:1]  # Reference topic embedding
+        text_normalized = normalized[1:]    # Text sentence embeddings
         
-        similarities = cosine_similarity(topic_embeddings, text_embeddings)[0]
+        similarities = self.similarity_engine.topic_similarities(text_normalized, topic_normalized)
         
         # Calculate average relevance to topic
-        topic_relevance = np.mean(similarities)
+        topic_relevance = float(np.mean(similarities))
         
         # Generate explanation
         if topic_relevance >= 0.7:
@@ -249,20 +379,28 @@ class SemanticService:
             explanation=explanation
         )
 
-    async def detect_topic_consistency_issues(self, text: str, reference_topic: str = None) -> Dict[str, Any]:
+    async def detect_topic_consistency_issues(
+        self,
+        text: str,
+        reference_topic: str = None,
+        context: Optional[DocumentContext] = None
+    ) -> Dict[str, Any]:
         """
         Detect topic consistency issues and flow disruptions
         
         Args:
             text: Text to analyze
             reference_topic: Optional reference topic
+            context: Shared document context; built here when not given
             
         Returns:
             Dictionary with detected issues
         """
-        text_sentences = self._split_into_sentences(text)
+        if context is None:
+            context = await self.build_document_context(text, reference_topic)
+        text_sentences = context.sentences
         
-        if len(text_sentences) < 2:
+        if len(text_sentences) < 2 or not context.has_embeddings:
             return {
                 "has_issues": False,
                 "issues": [],
@@ -270,64 +408,52 @@ class SemanticService:
                 "flow_disruptions": []
             }
         
-        # Get embeddings for all sentences
-        embeddings = await self._get_sentence_embeddings(text_sentences)
+        normalized = context.normalized
         
         issues = []
         off_topic_sentences = []
         flow_disruptions = []
         
         # 1. Check topic consistency if reference topic provided
-        if reference_topic:
-            topic_embedding = await self._get_sentence_embeddings([reference_topic])
-            topic_similarities = cosine_similarity(topic_embedding, embeddings)[0]
+        if context.topic_normalized is not None:
+            topic_similarities = self.similarity_engine.topic_similarities(
+                normalized, context.topic_normalized
+            )
             
             # Find sentences with low topic relevance
-            for i, similarity in enumerate(topic_similarities):
-                if similarity < 0.4:  # Threshold for off-topic detection
-                    off_topic_sentences.append({
-                        "sentence": text_sentences[i],
-                        "index": i,
-                        "topic_relevance": round(similarity, 3),
-                        "issue": "Bu cümle ana konudan sapıyor"
-                    })
-        
-        # 2. Check flow consistency between consecutive sentences
-        for i in range(len(embeddings) - 1):
-            current_embedding = embeddings[i:i+1]
-            next_embedding = embeddings[i+1:i+2]
-            
-            similarity = cosine_similarity(current_embedding, next_embedding)[0][0]
-            
-            if similarity < 0.3:  # Threshold for flow disruption
-                flow_disruptions.append({
-                    "sentence_index": i,
-                    "next_sentence_index": i + 1,
+            for i in np.flatnonzero(topic_similarities < 0.4):  # Threshold for off-topic detection
+                off_topic_sentences.append({
                     "sentence": text_sentences[i],
-                    "next_sentence": text_sentences[i + 1],
-                    "similarity": round(similarity, 3),
-                    "issue": "Bu cümleler arasında anlam akışı kopuk"
+                    "index": int(i),
+                    "topic_relevance": round(float(topic_similarities[i]), 3),
+                    "issue": "Bu cümle ana konudan sapıyor"
                 })
         
+        # 2. Check flow consistency between consecutive sentences
+        # adjacent[i] is the similarity between sentence i and sentence i + 1
+        adjacent = self.similarity_engine.adjacent_similarities(normalized)
+        
+        for i in np.flatnonzero(adjacent < 0.3):  # Threshold for flow disruption
+            flow_disruptions.append({
+                "sentence_index": int(i),
+                "next_sentence_index": int(i) + 1,
+                "sentence": text_sentences[i],
+                "next_sentence": text_sentences[i + 1],
+                "similarity": round(float(adjacent[i]), 3),
+                "issue": "Bu cümleler arasında anlam akışı kopuk"
+            })
+        
         # 3. Check for abrupt topic shifts
-        if len(embeddings) >= 3:
-            for i in range(1, len(embeddings) - 1):
-                prev_embedding = embeddings[i-1:i]
-                current_embedding = embeddings[i:i+1]
-                next_embedding = embeddings[i+1:i+2]
-                
-                # Calculate similarity with previous and next sentences
-                prev_similarity = cosine_similarity(prev_embedding, current_embedding)[0][0]
-                next_similarity = cosine_similarity(current_embedding, next_embedding)[0][0]
-                
-                # If current sentence is very different from both neighbors
-                if prev_similarity < 0.3 and next_similarity < 0.3:
-                    issues.append({
-                        "type": "topic_shift",
-                        "sentence_index": i,
-                        "sentence": text_sentences[i],
-                        "issue": "Bu cümle konudan ani bir sapma gösteriyor"
-                    })
+        # Current sentence is very different from both neighbors
+        if len(adjacent) >= 2:
+            low_flow = adjacent < 0.3
+            for i in np.flatnonzero(low_flow[:-1] & low_flow[1:]) + 1:
+                issues.append({
+                    "type": "topic_shift",
+                    "sentence_index": int(i),
+                    "sentence": text_sentences[i],
+                    "issue": "Bu cümle konudan ani bir sapma gösteriyor"
+                })
         
         # Combine all issues
         all_issues = off_topic_sentences + flow_disruptions + issues
@@ -0,0 +1,126 @@
+"""
+Vectorized cosine similarity over sentence embedding matrices
+"""
+
+from typing import Iterator, Tuple
+import numpy as np
+
+
+class SimilarityEngine:
+    """Cosine similarity computations done with matrix products instead of per-pair calls"""
+
+    def __init__(self, block_size: int = 512):
+        """
+        Initialize similarity engine
+
+        Args:
+            block_size: Maximum number of rows multiplied at once. Documents with
+                more sentences than this are processed in row blocks so memory
+                stays at block_size x n instead of n x n.
+        """
+        self.block_size = block_size
+
+    @staticmethod
+    def normalize(embeddings: np.ndarray) -> np.ndarray:
+        """
+        L2-normalize embedding rows once so dot products are cosine similarities
+
+        Args:
+            embeddings: Array of shape (n, dim) or (dim,)
+
+        Returns:
+            Row-normalized float32 array of shape (n, dim)
+        """
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        # Zero vectors get similarity 0 with everything (same as sklearn)
+        norms[norms == 0] = 1.0
+
+        return matrix / norms
+
+    def pairwise_matrix(self, normalized: np.ndarray) -> np.ndarray:
+        """
+        Full n x n cosine similarity matrix
+
+        Args:
+            normalized: Row-normalized embeddings
+
+        Returns:
+            Similarity matrix
+        """
+        return normalized @ normalized.T
+
+    def iter_pairwise_blocks(self, normalized: np.ndarray) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Yield the similarity matrix in row blocks
+
+        Args:
+            normalized: Row-normalized embeddings
+
+        Yields:
+            (first row index, block of shape (rows, n))
+        """
+        for start in range(0, len(normalized), self.block_size):
+            yield start, normalized[start:start + self.block_size] @ normalized.T
+
+    def upper_triangle_mean(self, normalized: np.ndarray) -> float:
+        """
+        Mean similarity over all sentence pairs i < j
+
+        Args:
+            normalized: Row-normalized embeddings
+
+        Returns:
+            Mean pairwise similarity (0.0 for fewer than two rows)
+        """
+        n = len(normalized)
+        if n < 2:
+            return 0.0
+
+        pair_count = n * (n - 1) / 2
+
+        if n <= self.block_size:
+            similarities = self.pairwise_matrix(normalized)
+            rows, cols = np.triu_indices(n, k=1)
+            return float(similarities[rows, cols].sum(dtype=np.float64) / pair_count)
+
+        total = 0.0
+        columns = np.arange(n)
+        for start, block in self.iter_pairwise_blocks(normalized):
+            row_ids = start + np.arange(block.shape[0])
+            mask = columns[None, :] > row_ids[:, None]
+            total += float(block[mask].sum(dtype=np.float64))
+
+        return total / pair_count
+
+    @staticmethod
+    def adjacent_similarities(normalized: np.ndarray) -> np.ndarray:
+        """
+        Similarity of each sentence with the next one (first off-diagonal)
+
+        Args:
+            normalized: Row-normalized embeddings
+
+        Returns:
+            Array of length n - 1 where item i is sim(i, i + 1)
+        """
+        if len(normalized) < 2:
+            return np.zeros(0, dtype=np.float32)
+        return np.einsum('ij,ij->i', normalized[:-1], normalized[1:])
+
+    @staticmethod
+    def topic_similarities(normalized: np.ndarray, topic_normalized: np.ndarray) -> np.ndarray:
+        """
+        Similarity of every sentence with the reference topic
+
+        Args:
+            normalized: Row-normalized sentence embeddings
+            topic_normalized: Row-normalized topic embedding, shape (1, dim) or (dim,)
+
+        Returns:
+            Array of length n
+        """
+        return normalized @ np.asarray(topic_normalized).reshape(-1)
@@ -0,0 +1,120 @@
+"""
+Compiled Jinja templates loaded from files
+"""
+
+import logging
+import os
+import threading
+from typing import Any, List, Optional
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+EMAIL_TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates", "email")
+
+
+class TemplateCompileError(RuntimeError):
+    """Raised by TemplateRegistry.preload when templates fail to compile"""
+
+
+class TemplateRegistry:
+    """
+    Renders templates from a directory, compiling each one once
+
+    Compiled templates stay in the environment's cache, so a render only
+    evaluates the template. With auto_reload a template whose file changed is
+    recompiled on its next use. The bytecode cache keeps compiled code on disk,
+    so a new process or worker skips parsing templates it has seen before.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        auto_reload: bool = True,
+        bytecode_cache_dir: Optional[str] = None,
+        use_bytecode_cache: bool = True,
+        cache_size: int = 400
+    ):
+        """
+        Initialize template registry
+
+        Args:
+            directory: Folder the templates are loaded from
+            auto_reload: Check file modification times and recompile changed templates
+            bytecode_cache_dir: Folder for compiled bytecode; None uses Jinja's default temp folder
+            use_bytecode_cache: Keep compiled templates on disk between processes
+            cache_size: Compiled templates kept in memory
+        """
+        self.directory = directory
+
+        bytecode_cache = None
+        if use_bytecode_cache:
+            try:
+                bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir or None)
+            except (OSError, RuntimeError) as e:
+                print(f"⚠️ Template bytecode cache disabled: {e}")
+
+        self.environment = Environment(
+            loader=FileSystemLoader(directory),
+            autoescape=select_autoescape(["html", "xml"]),
+            auto_reload=auto_reload,
+            bytecode_cache=bytecode_cache,
+            cache_size=cache_size
+        )
+
+    def render(self, name: str, **context: Any) -> str:
+        """
+        Render a template
+
+        Args:
+            name: File name relative to the template directory
+            **context: Template variables
+
+        Returns:
+            Rendered text
+        """
+        return self.environment.get_template(name).render(**context)
+
+    def preload(self) -> List[str]:
+        """
+        Compile every template now so syntax errors surface at startup
+
+        Returns:
+            Names of the compiled templates
+
+        Raises:
+            TemplateCompileError: If any template failed to compile (all are tried first)
+        """
+        loaded = []
+        failed = []
+        for name in self.environment.list_templates():
+            try:
+                self.environment.get_template(name)
+                loaded.append(name)
+            except Exception as e:
+                logger.error(f"Template {name} failed to compile: {e}")
+                failed.append(name)
+        if failed:
+            raise TemplateCompileError(f"Templates failed to compile: {', '.join(failed)}")
+        return loaded
+
+
+_email_templates: Optional[TemplateRegistry] = None
+_email_templates_lock = threading.Lock()
+
+
+def get_email_templates() -> TemplateRegistry:
+    """Return the process-wide email template registry, creating it from settings on first use"""
+    global _email_templates
+    with _email_templates_lock:
+        if _email_templates is None:
+            _email_templates = TemplateRegistry(
+                settings.EMAIL_TEMPLATE_DIR or EMAIL_TEMPLATE_DIR,
+                auto_reload=settings.EMAIL_TEMPLATE_AUTO_RELOAD,
+                bytecode_cache_dir=settings.EMAIL_TEMPLATE_BYTECODE_CACHE_DIR or None,
+                use_bytecode_cache=settings.EMAIL_TEMPLATE_BYTECODE_CACHE
+            )
+        return _email_templates
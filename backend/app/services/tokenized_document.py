@@ -0,0 +1,137 @@
+"""
+Shared tokenization of a text, computed once per request and reused by every analyzer
+"""
+
+import re
+from array import array
+from bisect import bisect_right
+from functools import cached_property
+from itertools import accumulate
+from typing import List, Tuple
+
+# Bump when tokenization changes analysis output (part of the result cache version)
+TOKENIZER_VERSION = "1"
+
+SENTENCE_DELIMITER = re.compile(r'[.!?]+')
+WORD = re.compile(r'\S+')
+NORMALIZED_WORD = re.compile(r'\w+')
+
+# (start, segment end, end): the segment is the piece re.split(r'[.!?]+') yields,
+# the span runs on to the end of its delimiter so that spans partition the text
+Span = Tuple[int, int, int]
+
+
+def split_sentence_spans(text: str) -> List[Span]:
+    """
+    Split text into sentence spans on runs of . ! ?
+
+    Args:
+        text: Input text
+
+    Returns:
+        List of (start, segment_end, end) tuples covering the whole text
+    """
+    spans = []
+    start = 0
+    for delimiter in SENTENCE_DELIMITER.finditer(text):
+        spans.append((start, delimiter.start(), delimiter.end()))
+        start = delimiter.end()
+    spans.append((start, len(text), len(text)))
+    return spans
+
+
+class TokenizedDocument:
+    """
+    Word, normalized-word and sentence spans of one text
+
+    Spans are flat arrays of (start, end) offsets into text, so analyzers only
+    slice the original string where they need the characters. Each layer is
+    built on first access and then shared by all analyzers of the request.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+
+    @cached_property
+    def lower(self) -> str:
+        """Lowercased text"""
+        return self.text.lower()
+
+    @cached_property
+    def word_spans(self) -> array:
+        """Flat (start, end) offsets of whitespace-separated words (what str.split() yields)"""
+        spans = array('l')
+        for match in WORD.finditer(self.text):
+            spans.append(match.start())
+            spans.append(match.end())
+        return spans
+
+    @property
+    def word_count(self) -> int:
+        return len(self.word_spans) // 2
+
+    def words(self) -> List[str]:
+        """Whitespace-separated words"""
+        text = self.text
+        spans = self.word_spans
+        return [text[spans[i]:spans[i + 1]] for i in range(0, len(spans), 2)]
+
+    @property
+    def avg_word_length(self) -> float:
+        spans = self.word_spans
+        if not spans:
+            return 0.0
+        total = sum(spans[i + 1] - spans[i] for i in range(0, len(spans), 2))
+        return total / self.word_count
+
+    @cached_property
+    def _normalized(self) -> Tuple[List[str], array]:
+        words: List[str] = []
+        spans = array('l')
+        lowered = self.lower
+
+        if len(lowered) == len(self.text):
+            for match in NORMALIZED_WORD.finditer(lowered):
+                words.append(match.group(0))
+                spans.append(match.start())
+                spans.append(match.end())
+            return words, spans
+
+        # Lowercasing expanded some characters (e.g. 'İ' -> 'i' + combining dot): map offsets back
+        ends = list(accumulate(len(char.lower()) for char in self.text))
+        for match in NORMALIZED_WORD.finditer(lowered):
+            words.append(match.group(0))
+            spans.append(bisect_right(ends, match.start()))
+            spans.append(bisect_right(ends, match.end() - 1) + 1)
+        return words, spans
+
+    @property
+    def normalized_words(self) -> List[str]:
+        """Lowercased words with punctuation removed (used for repetition analysis)"""
+        return self._normalized[0]
+
+    @property
+    def normalized_spans(self) -> array:
+        """Flat (start, end) offsets in text of each normalized word"""
+        return self._normalized[1]
+
+    @cached_property
+    def sentence_spans(self) -> List[Span]:
+        """Sentence spans (see split_sentence_spans)"""
+        return split_sentence_spans(self.text)
+
+    @cached_property
+    def sentence_count(self) -> int:
+        """Number of sentences that contain more than whitespace"""
+        text = self.text
+        return sum(1 for start, segment_end, _ in self.sentence_spans if text[start:segment_end].strip())
+
+    @cached_property
+    def semantic_sentences(self) -> List[str]:
+        """Stripped sentences longer than 10 characters (the ones compared semantically)"""
+        sentences = []
+        for start, segment_end, _ in self.sentence_spans:
+            sentence = self.text[start:segment_end].strip()
+            if len(sentence) > 10:
+                sentences.append(sentence)
+        return sentences
@@ -2,24 +2,49 @@
 File utility functions for handling different file formats
 """
 
+import codecs
+import hashlib
+import os
+import uuid
 from io import BytesIO
-from docx import Document
-from typing import Union
+from pathlib import Path
+from typing import List, Optional, Union
 
+UPLOAD_CHUNK_SIZE = 64 * 1024
 
-def extract_text_from_docx(file_content: bytes) -> str:
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload goes over the size limit while it is being read"""
+
+
+class IngestedUpload:
+    """An upload written to disk, with its size, digest and extracted text"""
+    
+    def __init__(self, path: Path, size: int, sha256: str, text: str, text_hash: Optional[str]):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256  # SHA-256 of the file bytes
+        self.text = text
+        # Key of the text in the texts table, when the file bytes are the text (.txt)
+        self.text_hash = text_hash
+
+
+def extract_text_from_docx(file_content: Union[bytes, str, Path]) -> str:
     """
     Extract text from .docx file content
     
     Args:
-        file_content: Raw bytes of the .docx file
+        file_content: Raw bytes of the .docx file, or the path of a saved one
         
     Returns:
         Extracted text as string
     """
+    # python-docx is only needed once a .docx file is actually uploaded
+    from docx import Document
+    
     try:
-        # Create BytesIO object from file content
-        docx_file = BytesIO(file_content)
+        # Read from memory only when given bytes
+        docx_file = BytesIO(file_content) if isinstance(file_content, bytes) else str(file_content)
         
         # Load the document
         doc = Document(docx_file)
@@ -39,18 +64,93 @@ def extract_text_from_docx(file_content: bytes) -> str:
         raise ValueError(f"Error extracting text from .docx file: {str(e)}")
 
 
-def validate_file_size(file_content: bytes, max_size: int) -> bool:
+def validate_file_size(file_content: Union[bytes, int], max_size: int) -> bool:
     """
     Validate file size
     
     Args:
-        file_content: File content in bytes
+        file_content: File content in bytes, or its size
         max_size: Maximum allowed size in bytes
         
     Returns:
         True if file size is within limits
     """
-    return len(file_content) <= max_size
+    size = file_content if isinstance(file_content, int) else len(file_content)
+    return size <= max_size
+
+
+async def ingest_upload(
+    upload,
+    directory: Union[str, Path],
+    max_size: int,
+    chunk_size: int = UPLOAD_CHUNK_SIZE
+) -> IngestedUpload:
+    """
+    Stream an uploaded .txt/.docx file to disk, hashing and decoding it chunk by chunk
+    
+    The upload is never held in memory as a whole: each chunk is counted,
+    hashed, written out and (for .txt) fed to an incremental UTF-8 decoder,
+    so only the decoded text remains once the file is read. Reading stops at
+    the first chunk that goes over max_size and the partial file is removed.
+    
+    Args:
+        upload: Starlette/FastAPI UploadFile (anything with filename and async read(size))
+        directory: Folder the file is saved in (created if missing)
+        max_size: Maximum allowed size in bytes
+        chunk_size: Bytes read per step
+        
+    Returns:
+        Saved file with its size, digest and text
+        
+    Raises:
+        UploadTooLargeError: If the upload is larger than max_size
+        ValueError: If a .txt file is not valid UTF-8 or a .docx cannot be read
+    """
+    # Multipart parsing already knows the size; refuse before reading anything
+    declared_size = getattr(upload, "size", None)
+    if declared_size is not None and not validate_file_size(declared_size, max_size):
+        raise UploadTooLargeError(f"File exceeds the maximum upload size of {max_size} bytes")
+    
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{uuid.uuid4()}{get_file_extension(upload.filename)}"
+    is_text = upload.filename.lower().endswith('.txt')
+    
+    digest = hashlib.sha256()
+    decoder = codecs.getincrementaldecoder('utf-8')() if is_text else None
+    text_parts: List[str] = []
+    size = 0
+    try:
+        with open(path, 'wb') as out:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if not validate_file_size(size, max_size):
+                    raise UploadTooLargeError(f"File exceeds the maximum upload size of {max_size} bytes")
+                digest.update(chunk)
+                out.write(chunk)
+                if decoder is not None:
+                    text_parts.append(decoder.decode(chunk))
+        
+        if decoder is not None:
+            text_parts.append(decoder.decode(b'', final=True))
+            text = ''.join(text_parts)
+            del text_parts[:]
+        else:
+            text = extract_text_from_docx(path)
+    except UnicodeDecodeError:
+        os.unlink(path)
+        raise ValueError("File is not valid UTF-8 text")
+    except BaseException:
+        if path.exists():
+            os.unlink(path)
+        raise
+    
+    sha256 = digest.hexdigest()
+    # UTF-8 decoding round-trips exactly, so the file digest is the digest of the text
+    return IngestedUpload(path, size, sha256, text, sha256 if is_text else None)
 
 
 def validate_file_type(filename: str, allowed_extensions: list) -> bool:
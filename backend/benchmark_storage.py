@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Benchmark compressed analysis storage against the previous Text/JSON columns
+
+Fills two SQLite databases with the same synthetic Turkish essays and
+analysis details, one with the old column types and one with the current
+analyses and texts tables, then compares file size and per-row read latency.
+
+Usage: python benchmark_storage.py [--rows 2000] [--reads 500]
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+import sqlalchemy as sa
+
+from app.db.models import Base
+
+SUBJECTS = [
+    "Günümüzde insanlar", "Toplumun büyük bir kısmı", "Gençler", "Bilim insanları",
+    "Öğretmenler", "Bu durum", "Teknolojinin gelişmesi", "İklim değişikliği",
+    "Eğitim sistemi", "Sosyal medya", "Şehirlerdeki hava kirliliği", "Ekonomik sorunlar",
+]
+MIDDLES = [
+    "her geçen gün daha fazla", "özellikle son yıllarda", "ne yazık ki", "bununla birlikte",
+    "büyük ölçüde", "çoğu zaman", "beklenenden hızlı bir şekilde", "ciddi biçimde",
+]
+ENDINGS = [
+    "hayatımızı etkilemektedir.", "önemli bir sorun haline gelmiştir.",
+    "yeni çözümler gerektirmektedir.", "göz ardı edilmemelidir.",
+    "toplumun geleceğini belirlemektedir.", "tartışılmaya devam etmektedir.",
+    "dikkatle incelenmesi gereken bir konudur.", "farklı bakış açıları doğurmaktadır.",
+]
+MESSAGES = [
+    ("Birden fazla boşluk kullanılmamalı", "MULTIPLE_SPACES", None),
+    ('"de" bağlacı ayrı yazılmalı', "DE_DA_SEPARATE", "de"),
+    ('Yazım hatası: "yalnış" → "yanlış"', "SPELLING_YANLIS", "yanlış"),
+    ('Türkçe karakter hatası: "cogu" → "çoğu"', "TURKISH_CHAR_COGU", "çoğu"),
+]
+
+
+def make_document(rnd: random.Random) -> dict:
+    """One analysis row with an essay of roughly 2-10k characters"""
+    sentences = [
+        f"{rnd.choice(SUBJECTS)} {rnd.choice(MIDDLES)} {rnd.choice(ENDINGS)}"
+        for _ in range(rnd.randint(30, 150))
+    ]
+    text = " ".join(sentences)
+    grammar_errors = []
+    for _ in range(rnd.randint(0, 15)):
+        message, rule_id, suggestion = rnd.choice(MESSAGES)
+        grammar_errors.append({
+            "message": message, "offset": rnd.randrange(len(text)), "length": rnd.randint(1, 8),
+            "rule_id": rule_id, "suggestion": suggestion,
+        })
+    repetition_errors = [
+        {
+            "word": word, "count": count,
+            "positions": sorted(rnd.sample(range(len(sentences) * 8), count)),
+            "suggestion": f'"{word}" kelimesini farklı kelimelerle değiştirin',
+        }
+        for word, count in (("önemli", rnd.randint(3, 12)), ("toplumun", rnd.randint(3, 12)))
+    ]
+    return {
+        "user_id": "benchmark-user",
+        "source_type": "text",
+        "text_excerpt": text[:200] + "...",
+        "full_text": text,
+        "reference_topic": None,
+        "overall_score": rnd.uniform(40, 100),
+        "grammar_score": rnd.uniform(40, 100),
+        "repetition_score": rnd.uniform(40, 100),
+        "semantic_score": rnd.uniform(40, 100),
+        "grammar_errors": grammar_errors or None,
+        "repetition_errors": repetition_errors,
+        "semantic_coherence": {
+            "has_issues": False, "issue_count": 0, "total_sentences": len(sentences),
+            "off_topic_sentences": [], "flow_disruptions": [],
+        },
+        "suggestions": ["Metninizde çok sayıda tekrar var. Çeşitliliği artırın."],
+        "processing_time": rnd.uniform(0.1, 2.0),
+        "created_at": datetime(2026, 1, 1),
+        "updated_at": datetime(2026, 1, 1),
+    }
+
+
+def legacy_metadata() -> sa.MetaData:
+    """The analyses table as it was before compression (Text and JSON columns, text inline)"""
+    metadata = sa.MetaData()
+    source = Base.metadata.tables["analyses"]
+    json_columns = ("grammar_errors", "repetition_errors", "semantic_coherence", "suggestions")
+    table = sa.Table(
+        "analyses",
+        metadata,
+        *[
+            sa.Column(
+                column.name,
+                sa.JSON() if column.name in json_columns else column.type,
+                primary_key=column.primary_key,
+                nullable=column.nullable
+            )
+            for column in source.columns
+            if column.name != "text_hash"
+        ],
+        sa.Column("full_text", sa.Text(), nullable=False),
+    )
+    for index in source.indexes:
+        if "text_hash" not in index.columns:
+            sa.Index(index.name, *[table.c[column.name] for column in index.columns])
+    return metadata
+
+
+def legacy_storage(metadata: sa.MetaData, rows: list) -> tuple:
+    """Rows per table and the single-analysis query of the old layout"""
+    table = metadata.tables["analyses"]
+    query = sa.select(table).where(table.c.id == sa.bindparam("row_id"))
+    return [(table, rows)], query
+
+
+def current_storage(metadata: sa.MetaData, rows: list) -> tuple:
+    """Rows per table and the single-analysis query of the texts + analyses layout"""
+    analyses, texts = metadata.tables["analyses"], metadata.tables["texts"]
+    text_rows = {}
+    analysis_rows = []
+    for row in rows:
+        row = dict(row)
+        text = row.pop("full_text")
+        row["text_hash"] = hashlib.sha256(text.encode("utf-8")).hexdigest()  # as TextRepository.hash_text
+        text_rows.setdefault(row["text_hash"], {"hash": row["text_hash"], "content": text, "ref_count": 0})
+        text_rows[row["text_hash"]]["ref_count"] += 1
+        analysis_rows.append(row)
+    query = (
+        sa.select(analyses, texts.c.content.label("full_text"))
+        .join(texts, texts.c.hash == analyses.c.text_hash)
+        .where(analyses.c.id == sa.bindparam("row_id"))
+    )
+    return [(texts, list(text_rows.values())), (analyses, analysis_rows)], query
+
+
+def run(label: str, metadata: sa.MetaData, storage, rows: list, read_ids: list, directory: str) -> dict:
+    path = os.path.join(directory, f"{label}.db")
+    engine = sa.create_engine(f"sqlite:///{path}")
+    metadata.create_all(engine)
+    inserts, query = storage(metadata, rows)
+
+    start = time.perf_counter()
+    with engine.begin() as connection:
+        for table, table_rows in inserts:
+            connection.execute(table.insert(), table_rows)
+    write_seconds = time.perf_counter() - start
+
+    with engine.connect() as connection:
+        connection.exec_driver_sql("VACUUM")
+
+    latencies = []
+    with engine.connect() as connection:
+        for row_id in read_ids:
+            start = time.perf_counter()
+            row = connection.execute(query, {"row_id": row_id}).one()
+            _ = (row.full_text, row.grammar_errors, row.repetition_errors)  # decoded on fetch
+            latencies.append((time.perf_counter() - start) * 1000)
+    engine.dispose()
+
+    return {
+        "label": label,
+        "size_mb": os.path.getsize(path) / (1024 * 1024),
+        "write_s": write_seconds,
+        "read_mean_ms": statistics.mean(latencies),
+        "read_p95_ms": sorted(latencies)[int(len(latencies) * 0.95) - 1],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--reads", type=int, default=500)
+    args = parser.parse_args()
+
+    rnd = random.Random(42)
+    rows = [{"id": f"{i:08d}", **make_document(rnd)} for i in range(args.rows)]
+    # Re-runs of the same essay share one stored text
+    for row in rows[::10]:
+        row["full_text"] = rows[0]["full_text"]
+    read_ids = [rnd.choice(rows)["id"] for _ in range(args.reads)]
+    raw_mb = sum(len(row["full_text"].encode("utf-8")) for row in rows) / (1024 * 1024)
+    print(f"📄 {args.rows} analyses, {raw_mb:.1f} MB of essay text")
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = [
+            run("uncompressed", legacy_metadata(), legacy_storage, rows, read_ids, directory),
+            run("compressed", Base.metadata, current_storage, rows, read_ids, directory),
+        ]
+
+    print(f"{'storage':<14}{'size MB':>10}{'insert s':>10}{'read ms':>10}{'p95 ms':>10}")
+    for result in results:
+        print(
+            f"{result['label']:<14}{result['size_mb']:>10.2f}{result['write_s']:>10.2f}"
+            f"{result['read_mean_ms']:>10.3f}{result['read_p95_ms']:>10.3f}"
+        )
+    before, after = results
+    print(f"📉 Table size: {after['size_mb'] / before['size_mb']:.1%} of uncompressed")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ import asyncio
 from app.db.session import async_session_factory
 from app.db.models import User
 from app.services.auth_service import AuthService
+from app.services.password_hasher import shutdown_password_hasher
 
 async def simple_test():
     """Simple test for user creation"""
@@ -17,7 +18,7 @@ async def simple_test():
             # Create user directly
             user = User(
                 email="test@example.com",
-                password_hash=AuthService.get_password_hash("test123"),
+                password_hash=await AuthService.get_password_hash("test123"),
                 first_name="Test",
                 last_name="User"
             )
@@ -35,6 +36,7 @@ async def simple_test():
 
 if __name__ == "__main__":
     success = asyncio.run(simple_test())
+    shutdown_password_hasher()
     if success:
         print("🎉 Test passed!")
     else:
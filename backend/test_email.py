@@ -10,7 +10,8 @@ import os
 # Add the app directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from app.services.email_service import EmailService
+from app.db.session import async_session_factory
+from app.services.auth_service import email_dispatcher, email_service
 from app.core.config import settings
 
 
@@ -25,25 +26,24 @@ async def test_email_sending():
     print(f"App URL: {settings.APP_URL}")
     print("=" * 30)
     
-    # Create email service
-    email_service = EmailService()
-    
     # Test email
     test_email = "test@example.com"
     test_name = "Test User"
     test_token = "test-verification-token-12345"
     
-    print("\n1. Testing welcome email...")
-    success = email_service.send_welcome_email(test_email, test_name, test_token)
-    print(f"Welcome email result: {'✅ Success' if success else '❌ Failed'}")
-    
-    print("\n2. Testing verification email...")
-    success = email_service.send_verification_email(test_email, test_name, test_token)
-    print(f"Verification email result: {'✅ Success' if success else '❌ Failed'}")
-    
-    print("\n3. Testing password reset email...")
-    success = email_service.send_password_reset_email(test_email, test_name, test_token)
-    print(f"Password reset email result: {'✅ Success' if success else '❌ Failed'}")
+    print("\n1. Queueing welcome, verification and password reset emails...")
+    async with async_session_factory() as db:
+        email_service.queue_welcome_email(db, test_email, test_name, test_token)
+        email_service.queue_verification_email(db, test_email, test_name, test_token)
+        email_service.queue_password_reset_email(db, test_email, test_name, test_token)
+        await db.commit()
+    
+    print("\n2. Delivering the queue...")
+    await email_dispatcher.drain()
+    email_dispatcher.shutdown()
+    stats = email_dispatcher.stats()
+    print(f"Sent: {stats['sent']}, retried: {stats['retried']}, failed: {stats['failed']}")
+    print(f"Result: {'✅ Success' if stats['sent'] == 3 else '❌ Failed'} (last error: {stats['last_error']})")
     
     print("\n=== Test Complete ===")
     
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Test queued email delivery against a local aiosmtpd server
+
+Runs without network access or SMTP credentials: every test starts an
+aiosmtpd server on localhost and an in-memory SQLite queue.
+
+Usage: python test_email_queue.py  (or pytest test_email_queue.py)
+"""
+
+import asyncio
+import email
+import os
+import socket
+import sys
+from datetime import datetime
+
+from aiosmtpd.controller import Controller
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+# Add the app directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.db.models import Base, OutboundEmail
+from app.services.email_dispatcher import EmailDispatcher, SMTPTransport
+from app.services.email_service import EmailService
+
+
+class RecordingHandler:
+    """aiosmtpd handler that keeps messages and can refuse recipients"""
+
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+        # recipient -> SMTP reply used instead of accepting it
+        self.replies = {}
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        reply = self.replies.get(address)
+        if reply:
+            return reply
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.sessions.add(id(session))
+        self.messages.append((envelope.rcpt_tos[0], envelope.content))
+        return "250 Message accepted for delivery"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def make_queue():
+    engine = create_async_engine(
+        "sqlite+aiosqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine, async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+
+
+def make_dispatcher(session_factory, port: int, **kwargs) -> EmailDispatcher:
+    transport = SMTPTransport(
+        "127.0.0.1", port, "noreply@noteguard.com", use_tls=False, timeout=5,
+        idle_seconds=kwargs.pop("idle_seconds", 60)
+    )
+    return EmailDispatcher(session_factory, transport, **kwargs)
+
+
+async def queue(session_factory, recipients):
+    email_service = EmailService()
+    async with session_factory() as db:
+        for index, recipient in enumerate(recipients):
+            email_service.queue_verification_email(db, recipient, "Test", f"token-{index}")
+        await db.commit()
+
+
+async def statuses(session_factory):
+    async with session_factory() as db:
+        result = await db.execute(select(OutboundEmail.to_email, OutboundEmail.status, OutboundEmail.attempts))
+        return {row.to_email: (row.status, row.attempts) for row in result}
+
+
+def run_with_server(test):
+    handler = RecordingHandler()
+    port = free_port()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    try:
+        asyncio.run(test(handler, port))
+    finally:
+        controller.stop()
+
+
+def test_batch_reuses_one_session():
+    async def scenario(handler, port):
+        engine, session_factory = await make_queue()
+        await queue(session_factory, [f"user{i}@example.com" for i in range(5)])
+        dispatcher = make_dispatcher(session_factory, port, batch_size=2)
+
+        assert await dispatcher.drain() == 5
+        dispatcher.shutdown()
+
+        assert len(handler.messages) == 5
+        assert dispatcher.batches == 3
+        assert dispatcher.transport.connections_opened == 1
+        assert len(handler.sessions) == 1
+        assert all(status == ("sent", 1) for status in (await statuses(session_factory)).values())
+        body = email.message_from_bytes(handler.messages[0][1]).get_payload()[0].get_payload(decode=True)
+        assert b"token-0" in body
+        await engine.dispose()
+
+    run_with_server(scenario)
+
+
+def test_idle_session_is_reopened():
+    async def scenario(handler, port):
+        engine, session_factory = await make_queue()
+        dispatcher = make_dispatcher(session_factory, port, idle_seconds=0)
+        for recipient in ("a@example.com", "b@example.com"):
+            await queue(session_factory, [recipient])
+            await asyncio.sleep(0.01)
+            assert await dispatcher.drain() == 1
+        dispatcher.shutdown()
+
+        assert dispatcher.transport.connections_opened == 2
+        assert len(handler.messages) == 2
+        await engine.dispose()
+
+    run_with_server(scenario)
+
+
+def test_transient_failure_is_retried_with_backoff():
+    async def scenario(handler, port):
+        engine, session_factory = await make_queue()
+        handler.replies = {
+            "later@example.com": "451 Try again later",
+            "nobody@example.com": "550 No such user",
+        }
+        await queue(session_factory, ["later@example.com", "nobody@example.com", "ok@example.com"])
+        dispatcher = make_dispatcher(session_factory, port, retry_base_seconds=60)
+
+        started = datetime.utcnow()
+        assert await dispatcher.drain() == 3
+        assert await statuses(session_factory) == {
+            "later@example.com": ("pending", 1),
+            "nobody@example.com": ("failed", 1),
+            "ok@example.com": ("sent", 1),
+        }
+        async with session_factory() as db:
+            retry_at = (await db.execute(
+                select(OutboundEmail.next_attempt_at).where(OutboundEmail.to_email == "later@example.com")
+            )).scalar_one()
+        assert (retry_at - started).total_seconds() >= 59
+
+        # Not due yet: nothing happens until the backoff has passed
+        assert await dispatcher.drain() == 0
+        handler.replies = {}
+        async with session_factory() as db:
+            await db.execute(update(OutboundEmail).values(next_attempt_at=datetime.utcnow()))
+            await db.commit()
+        assert await dispatcher.drain() == 1
+        dispatcher.shutdown()
+
+        assert (await statuses(session_factory))["later@example.com"] == ("sent", 2)
+        assert dispatcher.stats()["retried"] == 1
+        assert dispatcher.stats()["failed"] == 1
+        await engine.dispose()
+
+    run_with_server(scenario)
+
+
+def test_gives_up_after_max_attempts():
+    async def scenario(handler, port):
+        engine, session_factory = await make_queue()
+        handler.replies = {"later@example.com": "451 Try again later"}
+        await queue(session_factory, ["later@example.com"])
+        dispatcher = make_dispatcher(session_factory, port, max_attempts=2, retry_base_seconds=0)
+
+        assert await dispatcher.drain() == 2
+        dispatcher.shutdown()
+
+        assert await statuses(session_factory) == {"later@example.com": ("failed", 2)}
+        await engine.dispose()
+
+    run_with_server(scenario)
+
+
+def test_notify_delivers_in_background():
+    async def scenario(handler, port):
+        engine, session_factory = await make_queue()
+        dispatcher = make_dispatcher(session_factory, port, poll_interval=60)
+        await queue(session_factory, ["first@example.com"])
+        dispatcher.notify()
+
+        for _ in range(100):
+            if handler.messages:
+                break
+            await asyncio.sleep(0.05)
+        dispatcher.shutdown()
+
+        assert [recipient for recipient, _ in handler.messages] == ["first@example.com"]
+        await engine.dispose()
+
+    run_with_server(scenario)
+
+
+def test_server_down_keeps_email_queued():
+    async def scenario(handler, port):
+        engine, session_factory = await make_queue()
+        await queue(session_factory, ["user@example.com"])
+        dispatcher = make_dispatcher(session_factory, free_port())
+
+        assert await dispatcher.drain() == 1
+        dispatcher.shutdown()
+
+        assert await statuses(session_factory) == {"user@example.com": ("pending", 1)}
+        await engine.dispose()
+
+    run_with_server(scenario)
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
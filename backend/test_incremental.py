@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Test incremental re-analysis against full analyses of the same text
+
+Chains many random sentence edits through analyze_incremental (each edit
+starts from the state remembered for the previous one) and checks every
+response against analyze_text on the edited text. Sentence embeddings come
+from a deterministic word-hash encoder and sentiment is stubbed, so no model
+is downloaded.
+
+Usage: python test_incremental.py  (or pytest test_incremental.py)
+"""
+
+import asyncio
+import hashlib
+import os
+import random
+import sys
+import uuid
+from types import SimpleNamespace
+
+import numpy as np
+
+# Models run in this process; the result cache would hide full analyses
+os.environ["INFERENCE_POOL_MODE"] = "thread"
+os.environ["INFERENCE_RULES_MODE"] = "thread"
+os.environ["ANALYSIS_CACHE_ENABLED"] = "false"
+os.environ["EMBEDDING_STORE_DIR"] = ""
+
+# Add the app directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services import llm_service, semantic_service
+from app.services.analysis_service import AnalysisService
+from app.services.incremental_service import IncrementalAnalysisService
+
+SENTENCES = [
+    "Bugün hava çok güzel ve güneşliydi.",
+    "Herkez okula erken gitti ve derslere katıldı.",
+    "Öğretmen yapay zeka hakkında uzun bir konuşma yaptı.",
+    "Bu konu bence çok önemli , çünkü geleceği etkiliyor.",
+    "Öğrenciler yalnış cevaplar verse de öğrenmeye devam etti.",
+    "Kütüphanede kitap okudum ve notlar aldım.",
+    "Kütüphanede kitap okudum ve notlar aldım ve sonra eve döndüm.",
+    "Yapay zeka eğitimde kişisel öğrenme imkanları sunar.",
+    "Akşam arkadaşlarımla buluştum.",
+    "Futbol maçı çok heyecanlıydı ama biz kaybettik.",
+    "Yemek tarifleri internette kolayca bulunabilir.",
+    "Öğretmenlerin rolü tamamen ortadan kalkmıyacaktır.",
+    "Kısa cümle.",
+    "Teknoloji hızla gelişiyor ve hayatımızı değiştiriyor.",
+]
+
+
+class HashEncoder:
+    """Deterministic stand-in for SentenceTransformer: sum of per-word random vectors"""
+
+    dim = 32
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def encode(self, sentences, batch_size=32, **kwargs):
+        embeddings = np.zeros((len(sentences), self.dim), dtype=np.float32)
+        for row, sentence in enumerate(sentences):
+            for word in sentence.lower().split():
+                seed = int(hashlib.md5(word.encode("utf-8")).hexdigest()[:8], 16)
+                embeddings[row] += np.random.default_rng(seed).normal(size=self.dim)
+        return embeddings
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+
+def no_pipeline(*args, **kwargs):
+    raise RuntimeError("models are not loaded in tests")
+
+
+async def fixed_sentiment(text):
+    return {"sentiment": "neutral", "confidence": 0.5, "text": text[:200]}
+
+
+def make_services():
+    semantic_service.SentenceTransformer = HashEncoder
+    llm_service.pipeline = no_pipeline
+
+    analysis_service = AnalysisService()
+    analysis_service.result_cache = None
+    analysis_service.llm_service.analyze_sentiment = fixed_sentiment
+    return analysis_service, IncrementalAnalysisService(analysis_service)
+
+
+def edit(rng: random.Random, sentences: list) -> list:
+    """Apply one random sentence-level edit"""
+    sentences = list(sentences)
+    action = rng.choice(["replace", "insert", "delete", "change_word", "swap"])
+    if action == "insert" or len(sentences) < 3:
+        sentences.insert(rng.randrange(len(sentences) + 1), rng.choice(SENTENCES))
+    elif action == "replace":
+        sentences[rng.randrange(len(sentences))] = rng.choice(SENTENCES)
+    elif action == "delete":
+        del sentences[rng.randrange(len(sentences))]
+    elif action == "change_word":
+        index = rng.randrange(len(sentences))
+        words = sentences[index].split()
+        words[rng.randrange(len(words))] = rng.choice(["herkez", "yalnış", "güzel", "kitap", "okul"])
+        sentences[index] = " ".join(words)
+    else:
+        i, j = rng.randrange(len(sentences)), rng.randrange(len(sentences))
+        sentences[i], sentences[j] = sentences[j], sentences[i]
+    return sentences
+
+
+def comparable(response) -> dict:
+    """Response fields that must match, without timings"""
+    data = response.model_dump(mode="json")
+    data.pop("processing_time", None)
+    llm_analysis = data.get("result", {}).get("llm_analysis")
+    if llm_analysis:
+        llm_analysis.pop("analysis_timestamp", None)
+    return data
+
+
+async def run_chain(analysis_service, incremental_service, seed: int, edits: int, reference_topic):
+    rng = random.Random(seed)
+    sentences = [rng.choice(SENTENCES) for _ in range(6)]
+    text = " ".join(sentences)
+
+    full = await analysis_service.analyze_text(text, reference_topic)
+    assert full.success
+    previous = SimpleNamespace(
+        id=uuid.uuid4(),
+        full_text=text,
+        reference_topic=reference_topic,
+        grammar_errors=[error.model_dump() for error in full.result.grammar_errors]
+    )
+
+    for step in range(edits):
+        sentences = edit(rng, sentences)
+        text = " ".join(sentences)
+
+        response, state = await incremental_service.analyze_incremental(previous, text, reference_topic)
+        assert state is not None, f"seed {seed} step {step}: fell back to a full analysis"
+        expected = await analysis_service.analyze_text(text, reference_topic)
+        assert comparable(response) == comparable(expected), f"seed {seed} step {step}: {text!r}"
+
+        previous = SimpleNamespace(id=uuid.uuid4())
+        incremental_service.remember(previous.id, state)
+
+
+def test_chained_edits_match_full_analysis():
+    async def scenario():
+        analysis_service, incremental_service = make_services()
+        for seed in range(4):
+            await run_chain(analysis_service, incremental_service, seed, edits=40, reference_topic=None)
+
+    asyncio.run(scenario())
+
+
+def test_chained_edits_with_reference_topic():
+    async def scenario():
+        analysis_service, incremental_service = make_services()
+        for seed in range(4, 8):
+            await run_chain(analysis_service, incremental_service, seed, edits=40, reference_topic="yapay zeka eğitimi")
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test the suffix-array phrase search against straightforward n-gram scans
+
+repeated_phrases must report exactly what the previous Counter-based n-gram
+scan of RepetitionService reported (same phrases, positions and order), for
+the default 5-word cap as well as larger caps and no cap. With maximal=True
+it must report exactly the maximal repeats found by brute force.
+
+Usage: python test_phrase_index.py  (or pytest test_phrase_index.py)
+"""
+
+import os
+import random
+import sys
+from collections import Counter
+
+# Add the app directory to Python path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.phrase_index import lcp_array, repeated_phrases, suffix_array, to_word_ids
+
+WORDS = "bugün hava çok güzel ve okula gittim kitap okudum".split()
+
+
+def ngram_scan(words, min_length, max_length, min_count):
+    """The n-gram scan repeated_phrases replaced: (length, positions) per repeated phrase"""
+    found = []
+    longest = len(words) if max_length is None else max_length
+    for phrase_length in range(min_length, longest + 1):
+        if len(words) < phrase_length:
+            continue
+        ngrams = [(' '.join(words[i:i + phrase_length]), i) for i in range(len(words) - phrase_length + 1)]
+        phrase_counter = Counter(phrase for phrase, _ in ngrams)
+        for phrase, count in phrase_counter.items():
+            if count >= min_count:
+                found.append((phrase_length, [pos for p, pos in ngrams if p == phrase]))
+    return found
+
+
+def maximal_repeats(words, min_length, max_length, min_count):
+    """Brute-force maximal repeats, cut at max_length, ordered like repeated_phrases"""
+    n = len(words)
+    longest = n if max_length is None else max_length
+    found = []
+    for phrase_length in range(1, n):
+        positions_by_phrase = {}
+        for i in range(n - phrase_length + 1):
+            positions_by_phrase.setdefault(tuple(words[i:i + phrase_length]), []).append(i)
+        for positions in positions_by_phrase.values():
+            if len(positions) < min_count:
+                continue
+            # The start and end of the text count as a different word for every occurrence
+            before = [words[p - 1] if p > 0 else ('start', p) for p in positions]
+            after = [words[p + phrase_length] if p + phrase_length < n else ('end', p) for p in positions]
+            if len(set(before)) == 1 or len(set(after)) == 1:
+                continue
+            reported = min(phrase_length, longest)
+            if reported >= min_length:
+                found.append((reported, positions))
+    found.sort(key=lambda item: (item[0], item[1]))
+    return found
+
+
+def random_texts(seed, count=400):
+    rng = random.Random(seed)
+    for _ in range(count):
+        vocabulary = WORDS[:rng.randint(1, len(WORDS))]
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(0, 60))]
+        # Copy a stretch now and then so long repeats occur
+        if len(words) > 10 and rng.random() < 0.5:
+            start = rng.randrange(len(words) - 5)
+            stretch = words[start:start + rng.randint(3, 12)]
+            insert_at = rng.randrange(len(words))
+            words[insert_at:insert_at] = stretch
+        yield words
+
+
+def test_suffix_and_lcp_arrays():
+    for words in random_texts(1, 200):
+        ids = to_word_ids(words)
+        sa = suffix_array(ids)
+        assert sa == sorted(range(len(ids)), key=lambda i: ids[i:])
+        lcp = lcp_array(ids, sa)
+        for j in range(1, len(sa)):
+            a, b = ids[sa[j - 1]:], ids[sa[j]:]
+            common = 0
+            while common < min(len(a), len(b)) and a[common] == b[common]:
+                common += 1
+            assert lcp[j] == common
+
+
+def test_matches_ngram_scan_with_default_cap():
+    for words in random_texts(2):
+        for min_count in (2, 3, 5):
+            assert repeated_phrases(to_word_ids(words), 2, 5, min_count) == ngram_scan(words, 2, 5, min_count), words
+
+
+def test_matches_ngram_scan_with_larger_or_no_cap():
+    for words in random_texts(3):
+        for max_length in (1, 8, 20, None):
+            for min_count in (2, 3):
+                expected = ngram_scan(words, 2, max_length, min_count)
+                assert repeated_phrases(to_word_ids(words), 2, max_length, min_count) == expected, (words, max_length)
+
+
+def test_maximal_matches_brute_force():
+    for words in random_texts(4):
+        for max_length in (5, None):
+            for min_count in (2, 3):
+                expected = maximal_repeats(words, 2, max_length, min_count)
+                actual = repeated_phrases(to_word_ids(words), 2, max_length, min_count, maximal=True)
+                assert actual == expected, (words, max_length, min_count)
+
+
+def test_overlapping_occurrences_are_counted():
+    words = "ve ve ve ve".split()
+    assert repeated_phrases(to_word_ids(words), 2, 5, 2) == [(2, [0, 1, 2]), (3, [0, 1])]
+
+
+if __name__ == "__main__":
+    tests = [value for name, value in list(globals().items()) if name.startswith("test_")]
+    for test in tests:
+        test()
+        print(f"✅ {test.__name__}")
@@ -7,6 +7,7 @@ import asyncio
 import json
 from app.db.session import async_session_factory
 from app.services.auth_service import AuthService
+from app.services.password_hasher import shutdown_password_hasher
 
 async def test_registration():
     """Test user registration process"""
@@ -85,11 +86,11 @@ async def test_password_hashing():
         password = "testpassword123"
         
         # Test password hashing
-        hashed = AuthService.get_password_hash(password)
+        hashed = await AuthService.get_password_hash(password)
         print(f"✅ Password hashed successfully: {hashed[:20]}...")
         
         # Test password verification
-        is_valid = AuthService.verify_password(password, hashed)
+        is_valid, _ = await AuthService.verify_password(password, hashed)
         if is_valid:
             print("✅ Password verification successful!")
             return True
@@ -133,6 +134,7 @@ if __name__ == "__main__":
     
     # Test login
     login_success = asyncio.run(test_login())
+    shutdown_password_hasher()
     
     print("\n" + "=" * 50)
     if hash_success and reg_success and login_success:
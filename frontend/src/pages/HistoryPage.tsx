@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react'
+import React, { useState, useEffect, useRef } from 'react'
 import { Link } from 'react-router-dom'
 import { useAuth } from '../contexts/AuthContext'
 import apiService from '../services/apiService'
@@ -8,7 +8,6 @@ import { componentStyles, generateTailwindClasses } from '../utils/designSystem'
 interface Analysis {
   id: string
   text_excerpt: string
-  full_text: string
   overall_score: number
   grammar_score: number
   repetition_score: number
@@ -28,6 +27,9 @@ const HistoryPage: React.FC = () => {
   const [searchTerm, setSearchTerm] = useState('')
   const [sortBy, setSortBy] = useState<'date' | 'score'>('date')
   const [selectedAnalysis, setSelectedAnalysis] = useState<Analysis | null>(null)
+  const [selectedText, setSelectedText] = useState<string | null>(null)
+  const [isLoadingDetails, setIsLoadingDetails] = useState(false)
+  const openedAnalysisId = useRef<string | null>(null)
   const [showDeleteModal, setShowDeleteModal] = useState(false)
   const [deletingAnalysisId, setDeletingAnalysisId] = useState<string | null>(null)
 
@@ -50,8 +52,7 @@ const HistoryPage: React.FC = () => {
       // Transform API response to match our interface
       const transformedAnalyses: Analysis[] = response.analyses.map((analysis: any) => ({
         id: analysis.id,
-        text_excerpt: analysis.text_excerpt || analysis.full_text?.substring(0, 100) + '...',
-        full_text: analysis.full_text,
+        text_excerpt: analysis.text_excerpt,
         overall_score: analysis.overall_score,
         grammar_score: analysis.grammar_score,
         repetition_score: analysis.repetition_score,
@@ -100,8 +101,27 @@ const HistoryPage: React.FC = () => {
     }
   })
 
-  const handleViewDetails = (analysis: Analysis) => {
+  const handleViewDetails = async (analysis: Analysis) => {
     setSelectedAnalysis(analysis)
+    setSelectedText(null)
+    openedAnalysisId.current = analysis.id
+
+    // The list only carries summaries; the full text comes from the detail endpoint
+    try {
+      setIsLoadingDetails(true)
+      const details = await apiService.getAnalysisById(analysis.id)
+      // Ignore the response if another analysis was opened (or the modal closed) meanwhile
+      if (openedAnalysisId.current === analysis.id) {
+        setSelectedText(details.full_text)
+      }
+    } catch (error) {
+      console.error('Failed to fetch analysis details:', error)
+      setError('Analiz detayları yüklenirken bir hata oluştu. Lütfen tekrar deneyin.')
+    } finally {
+      if (openedAnalysisId.current === analysis.id) {
+        setIsLoadingDetails(false)
+      }
+    }
   }
 
 
@@ -160,6 +180,9 @@ const HistoryPage: React.FC = () => {
 
   const closeDetailsModal = () => {
     setSelectedAnalysis(null)
+    setSelectedText(null)
+    setIsLoadingDetails(false)
+    openedAnalysisId.current = null
   }
 
   if (isLoading) {
@@ -375,7 +398,7 @@ const HistoryPage: React.FC = () => {
                 <div>
                   <h4 className="font-medium text-gray-900 mb-2">Metin</h4>
                   <div className="bg-gray-50 p-3 rounded-md text-sm">
-                    {selectedAnalysis.full_text}
+                    {isLoadingDetails ? 'Yükleniyor...' : selectedText ?? selectedAnalysis.text_excerpt}
                   </div>
                 </div>
                 